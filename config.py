@@ -17,11 +17,43 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed"
 # Default files
 DEFAULT_CSV_FILE = RAW_DATA_DIR / "dados_bioimpedancia.csv"
 
+# Data loading settings
+# Motor do read_csv: 'c' (padrao) ou 'pyarrow' (multi-thread, requer pyarrow)
+CSV_ENGINE = 'c'
+
+# Modo compacto (opcional): float32 nas metricas e categoricas nas colunas de
+# texto, para historicos e grupos de pacientes grandes
+COMPACT_FRAMES = False
+
+# Storage settings
+# Armazenamento das medicoes: 'csv' (o proprio arquivo) ou 'sqlite' (banco
+# com o mesmo nome do CSV, criado a partir dele na primeira abertura)
+STORAGE_BACKEND = 'csv'
+
+# Tamanho do diario de edicoes/exclusoes do CSV que dispara a compactacao
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
 # Chart settings
 CHART_DPI = 300
 CHART_STYLE = 'seaborn-v0_8'
 CHART_PALETTE = "husl"
 
+# Presets de exportacao dos graficos: alvo -> DPI, formato e tamanho em
+# polegadas (None = tamanho da propria figura)
+EXPORT_PRESETS = {
+    'screen': {'label': 'Tela', 'dpi': 100, 'format': 'png', 'size': None},
+    'web': {'label': 'Web', 'dpi': 150, 'format': 'png', 'size': (10, 6)},
+    'print': {'label': 'Impressao', 'dpi': CHART_DPI, 'format': 'png', 'size': None},
+}
+DEFAULT_EXPORT_PRESET = 'print'
+
+# DPI da previa exibida enquanto o arquivo final e gerado
+PREVIEW_DPI = 60
+
+# Miniaturas da aba Dashboard: tamanho da figura (polegadas) e DPI
+THUMBNAIL_SIZE = (10, 6)
+THUMBNAIL_DPI = 20
+
 # GUI settings
 GUI_TITLE = "Analisador de Bioimpedância - Professional Edition"
 GUI_SIZE = "800x900"
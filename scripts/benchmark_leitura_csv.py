@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de leitura do CSV de bioimpedancia
+
+Compara o caminho antigo (read_csv + to_datetime sem formato + to_numeric
+coluna a coluna) com a leitura tipada em uma passada do measurement_schema.
+
+Uso: python scripts/benchmark_leitura_csv.py [numero_de_linhas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Adiciona o diretorio core ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'core'))
+
+import measurement_schema
+
+
+def generate_csv(path, rows):
+    """Gera um CSV sintetico no formato da balanca"""
+    rng = np.random.default_rng(42)
+    dates = pd.Timestamp('2000-01-01') + pd.to_timedelta(np.arange(rows) // 4, unit='D')
+    peso = 80 + rng.normal(0, 2, rows).cumsum() / 100
+    data = pd.DataFrame({
+        'data': dates.strftime('%Y-%m-%d'),
+        'peso': peso.round(2),
+        'imc': (peso / 2.93).round(1),
+        'Gordura/porcento': rng.uniform(20, 30, rows).round(1),
+        'Gordura/KG': rng.uniform(15, 25, rows).round(1),
+        'Massa Musucular/porcento': rng.uniform(33, 40, rows).round(1),
+        'Massa Muscular/KG': rng.uniform(28, 32, rows).round(1),
+        'Metabolismo': rng.uniform(1600, 1800, rows).round(1),
+        'Obesidade/porcento': rng.uniform(20, 30, rows).round(1),
+    })
+    data.to_csv(path, index=False)
+
+
+def read_legacy(path):
+    """Caminho antigo do BioimpedanceAnalyzer.load_data + prepare_data"""
+    data = pd.read_csv(path)
+    data['data'] = pd.to_datetime(data['data'])
+    for col in measurement_schema.NUMERIC_COLUMNS:
+        if col in data.columns:
+            data[col] = pd.to_numeric(data[col], errors='coerce')
+    return data
+
+
+def best_of(func, path, repeat=3):
+    """Menor tempo entre algumas execucoes"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'medicoes.csv')
+        print(f"📝 Gerando {rows:,} linhas...")
+        generate_csv(path, rows)
+        print(f"📦 Tamanho do arquivo: {os.path.getsize(path) / 1e6:.1f} MB")
+
+        results = [
+            ('legado (to_numeric por coluna)', best_of(read_legacy, path)),
+            ('esquema, motor c', best_of(lambda p: measurement_schema.read_measurements(p, engine='c'), path)),
+        ]
+        if measurement_schema.pyarrow_available():
+            results.append(('esquema, motor pyarrow',
+                            best_of(lambda p: measurement_schema.read_measurements(p, engine='pyarrow'), path)))
+        else:
+            print("ℹ️ pyarrow nao instalado: motor pyarrow ignorado")
+
+        baseline = results[0][1]
+        print()
+        for name, elapsed in results:
+            print(f"{name:<32} {elapsed:8.3f} s   ({baseline / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,17 @@ import os
 # Adiciona o diretorio core ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
 
-from bioimpedance_analyzer import BioimpedanceAnalyzer
+from bioimpedance_analyzer import BioimpedanceAnalyzer, analyze_cohort
 
 def main():
     print("🏥 Analisador de Dados de Bioimpedancia")
     print("=" * 50)
     
+    # Diretorio ou glob com um CSV por paciente: carrega todos em paralelo
+    if len(sys.argv) > 1 and (os.path.isdir(sys.argv[1]) or any(c in sys.argv[1] for c in '*?[')):
+        analyze_cohort(sys.argv[1])
+        return
+    
     # Procura por arquivos CSV na pasta data/raw
     import glob
     # Caminho para o arquivo de dados (relativo ao diretório do projeto)
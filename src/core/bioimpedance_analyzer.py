@@ -7,31 +7,133 @@ Especializado para dados de balanca de bioimpedância
 
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
 import seaborn as sns
 from datetime import datetime
 import os
 import sys
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
+# Adiciona a raiz do projeto ao path (config.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import config
+import chart_export
+import chart_specs
+import cohort_loader
+import columnar_archive
+import downsampling
+import figure_pool
+import html_dashboard
+import measurement_journal
+import measurement_schema
+import measurement_store
+import render_cache
+import streaming_summary
+
 # Configuracao do estilo dos graficos
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+plt.style.use(config.CHART_STYLE)
+sns.set_palette(config.CHART_PALETTE)
+
+# Pasta padrao dos graficos exportados (relativa ao diretorio de execucao)
+DEFAULT_OUTPUT_DIR = os.path.join('..', 'data', 'exports')
+
+# Graficos do relatorio: nome -> (metodo, arquivo, metricas consumidas)
+CHARTS = {
+    'evolucao_peso': ('create_weight_evolution', 'evolucao_peso.png', ['weight']),
+    'composicao_corporal': ('create_body_composition', 'composicao_corporal.png', ['fat_pct', 'muscle_pct']),
+    'analise_imc': ('create_imc_analysis', 'analise_imc.png', ['bmi']),
+    'analise_metabolismo': ('create_metabolism_analysis', 'analise_metabolismo.png', ['bmr']),
+    'dashboard_completo': ('create_comprehensive_dashboard', 'dashboard_completo.png',
+                           ['weight', 'bmi', 'fat_pct', 'muscle_pct']),
+}
+
+# Metricas do relatorio resumo: (titulo, metrica, formato, unidade)
+SUMMARY_METRICS = [
+    ('PESO', 'weight', '.1f', ' kg'),
+    ('IMC', 'bmi', '.1f', ''),
+    ('GORDURA', 'fat_pct', '.1f', '%'),
+    ('MASSA MUSCULAR', 'muscle_pct', '.1f', '%'),
+    ('METABOLISMO', 'bmr', '.0f', ' kcal/dia'),
+]
+
+# Nome do relatorio PDF de cada paciente (identificador do arquivo de dados)
+REPORT_PDF = 'relatorio_{}.pdf'
+
+# Nome do dashboard HTML interativo de cada paciente
+REPORT_HTML = 'dashboard_{}.html'
 
 class BioimpedanceAnalyzer:
-    def __init__(self, data_file):
+    def __init__(self, data_file, use_cache=True, streaming=False,
+                 chunksize=streaming_summary.DEFAULT_CHUNKSIZE, store=None, data=None,
+                 archive=None, compact=False, output_dir=None, headless=False,
+                 export_preset=None):
         """
         Inicializa o analisador com o arquivo de dados de bioimpedância
         
         Args:
             data_file (str): Caminho para o arquivo de dados (CSV)
+            use_cache (bool): Usa o cache binario e o cache de renderizacao
+                dos graficos em data/processed
+            streaming (bool): Le o arquivo em blocos, sem manter tudo em memoria
+            chunksize (int): Linhas por bloco no modo streaming
+            store (MeasurementStore): Le as medicoes deste armazenamento
+                (ex.: SQLite) em vez do arquivo CSV
+            data (pd.DataFrame): Medicoes ja carregadas (ex.: por
+                cohort_loader.load_patients); load_data nao rele o arquivo
+            archive (ColumnarArchive): Arquivo colunar ja aberto. Se data_file
+                for um diretorio .cols, ele e aberto em load_data
+            compact (bool): Converte os dados para os tipos compactos do
+                esquema (float32, categoricas) apos o carregamento
+            output_dir (str): Pasta dos graficos (padrao: DEFAULT_OUTPUT_DIR)
+            headless (bool): Modo sem janelas: usa o backend Agg, nunca chama
+                plt.show() e fecha cada figura logo apos salvar
+            export_preset (str): Preset de config.EXPORT_PRESETS dos graficos
+                salvos (padrao: config.DEFAULT_EXPORT_PRESET)
         """
         self.data_file = data_file
-        self.data = None
+        self.use_cache = use_cache
+        self.streaming = streaming
+        self.chunksize = chunksize
+        self.store = store
+        self.archive = archive
+        self.compact = compact
+        self.output_dir = output_dir or DEFAULT_OUTPUT_DIR
+        self.headless = headless
+        self.pdf = None  # PdfPages aberto durante generate_pdf_report
+        self.figures = figure_pool.default_pool()  # Figuras reaproveitadas entre graficos
+        self.export_preset = export_preset or config.DEFAULT_EXPORT_PRESET
+        self.export_settings = chart_export.export_preset(self.export_preset)
+        if headless:
+            plt.switch_backend('Agg')
+        self.data = data
+        self.preloaded = data is not None
+        self.summary = None
+        self.columns = None
+        if self.preloaded:
+            self.resolve_columns()
         
     def load_data(self):
-        """Carrega os dados do arquivo CSV"""
+        """Carrega os dados do arquivo CSV (ja tipados, via cache)"""
+        if self.preloaded:
+            print(f"✅ Dados de bioimpedância já carregados: {len(self.data)} medições")
+            return True
+        
+        if self.archive is not None or columnar_archive.is_archive(self.data_file):
+            return self.load_data_archive()
+        
+        if self.streaming:
+            return self.load_data_streaming()
+        
         try:
-            self.data = pd.read_csv(self.data_file)
+            store = self.store or measurement_store.CsvMeasurementStore(self.data_file, use_cache=self.use_cache)
+            self.data = store.load_frame()
+            if self.compact:
+                self.compact_data()
+            self.resolve_columns()
             
             print(f"✅ Dados de bioimpedância carregados com sucesso!")
             print(f"📊 Total de medições: {len(self.data)}")
@@ -43,43 +145,118 @@ class BioimpedanceAnalyzer:
             print(f"❌ Erro ao carregar dados: {e}")
             return False
     
+    def compact_data(self):
+        """Converte self.data para os tipos compactos e informa a memoria economizada"""
+        self.data, before, after = measurement_schema.compact_types(self.data)
+        print(f"🗜️ Modo compacto: {measurement_schema.format_memory(before, after)}")
+    
+    def resolve_columns(self):
+        """Mapeia as metricas para as colunas do arquivo (uma vez por carregamento)"""
+        self.columns = measurement_schema.resolve_columns(self.data.columns)
+        return self.columns
+    
+    def load_data_archive(self):
+        """
+        Abre o arquivo colunar sem ler as colunas: self.data aponta para os
+        arrays mapeados em memoria e as paginas sao lidas sob demanda
+        """
+        try:
+            if self.archive is None:
+                self.archive = columnar_archive.open_archive(self.data_file)
+            self.data = self.archive.to_frame()
+            self.resolve_columns()
+            
+            print(f"✅ Arquivo colunar aberto: {self.archive.path}")
+            print(f"📊 Total de medições: {len(self.archive)}")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao abrir arquivo colunar: {e}")
+            return False
+    
+    def load_data_streaming(self):
+        """
+        Le o CSV em blocos: o resumo e calculado de forma incremental e
+        self.data recebe apenas a serie reduzida usada nos graficos
+        """
+        try:
+            self.summary, self.data = streaming_summary.stream_measurements(
+                self.data_file, chunksize=self.chunksize,
+                journal=measurement_journal.MeasurementJournal(self.data_file))
+            self.resolve_columns()
+            
+            print(f"✅ Dados de bioimpedância lidos em blocos de {self.chunksize} linhas")
+            print(f"📊 Total de medições: {self.summary.count}")
+            print(f"📉 Pontos mantidos para os graficos: {len(self.data)}")
+            
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao carregar dados: {e}")
+            return False
+    
     def prepare_data(self):
         """Prepara os dados para analise"""
         if self.data is None:
             print("❌ Nenhum dado carregado. Execute load_data() primeiro.")
             return False
         
-        # Converte a coluna de data para datetime
-        if 'data' in self.data.columns:
+        # Converte a coluna de data para datetime (load_data ja entrega tipado)
+        if 'data' in self.data.columns and not pd.api.types.is_datetime64_any_dtype(self.data['data']):
             self.data['data'] = pd.to_datetime(self.data['data'])
             print(f"📅 Coluna de data convertida: {self.data['data'].dtype}")
         
         # Converte colunas numericas
-        numeric_columns = ['peso', 'imc', 'Gordura/porcento', 'Gordura/%', 'Gordura/KG', 
-                          'Massa Musucular/porcento', 'Massa Musucular/%', 'Massa Muscular/KG', 
-                          'Metabolismo', 'Obesidade/porcento', 'Obesidade/%']
-        
-        for col in numeric_columns:
-            if col in self.data.columns:
+        for col in measurement_schema.NUMERIC_COLUMNS:
+            if col in self.data.columns and not pd.api.types.is_numeric_dtype(self.data[col]):
                 self.data[col] = pd.to_numeric(self.data[col], errors='coerce')
                 print(f"🔢 Coluna numerica convertida: {col}")
         
         return True
     
+    def chart_path(self, chart):
+        """Arquivo de saida de um grafico (extensao do formato do preset)"""
+        return os.path.join(self.output_dir, chart_export.with_format(CHARTS[chart][1], self.export_preset))
+    
+    def _save_figure(self, filename):
+        """Salva a figura atual na pasta de saida e a exibe (ou fecha, no modo headless)"""
+        if self.pdf is not None:
+            # Relatorio PDF: a figura vira uma pagina do arquivo unico
+            fig = plt.gcf()
+            self.pdf.savefig(fig, bbox_inches='tight')
+            self.figures.release(fig)
+            return f"{self.pdf_path}, pagina {self.pdf.get_pagecount()}"
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, chart_export.with_format(filename, self.export_preset))
+        if os.path.lexists(path):
+            # Pode ser um link fisico para o cache de renderizacao
+            os.remove(path)
+        fig = plt.gcf()
+        chart_export.save_figure(fig, path, self.export_preset)
+        if not self.headless:
+            plt.show()
+        self.figures.release(fig)
+        return path
+    
+    def chart_spec(self):
+        """Series preparadas dos graficos (compartilhadas com as interfaces)"""
+        return chart_specs.dataset_spec(self.data, self.columns, self.archive)
+    
     def create_weight_evolution(self):
         """Cria grafico de evolucao do peso"""
-        if self.data is None or 'peso' not in self.data.columns:
+        peso = self.chart_spec().series('weight') if self.data is not None else None
+        if peso is None:
             print("❌ Dados de peso não encontrados.")
             return
         
-        clean_data = self.data.dropna(subset=['data', 'peso'])
-        
-        if len(clean_data) == 0:
+        if len(peso) == 0:
             print("❌ Nenhum dado valido encontrado.")
             return
         
-        plt.figure(figsize=(14, 8))
-        plt.plot(clean_data['data'], clean_data['peso'], 
+        self.figures.acquire(figsize=(14, 8))
+        downsampling.plot_series(plt.gca(), peso.dates, peso.values, dpi=self.export_settings['dpi'],
                 marker='o', linewidth=3, markersize=8, color='#2E86AB')
         
         plt.title('Evolucao do Peso Corporal', fontsize=18, fontweight='bold', pad=20)
@@ -89,27 +266,20 @@ class BioimpedanceAnalyzer:
         plt.xticks(rotation=45)
         
         # Adiciona estatisticas
-        min_weight = clean_data['peso'].min()
-        max_weight = clean_data['peso'].max()
-        current_weight = clean_data['peso'].iloc[-1]
-        first_weight = clean_data['peso'].iloc[0]
-        change = current_weight - first_weight
-        
-        stats_text = f'Peso inicial: {first_weight:.1f} kg\n'
-        stats_text += f'Peso atual: {current_weight:.1f} kg\n'
-        stats_text += f'Mudanca: {change:+.1f} kg\n'
-        stats_text += f'Peso minimo: {min_weight:.1f} kg\n'
-        stats_text += f'Peso maximo: {max_weight:.1f} kg'
+        stats_text = f'Peso inicial: {peso.first:.1f} kg\n'
+        stats_text += f'Peso atual: {peso.last:.1f} kg\n'
+        stats_text += f'Mudanca: {peso.change:+.1f} kg\n'
+        stats_text += f'Peso minimo: {peso.min:.1f} kg\n'
+        stats_text += f'Peso maximo: {peso.max:.1f} kg'
         
         plt.text(0.02, 0.98, stats_text, transform=plt.gca().transAxes, 
                 verticalalignment='top', fontsize=11,
                 bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
         
         plt.tight_layout()
-        plt.savefig('../data/exports/evolucao_peso.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        path = self._save_figure('evolucao_peso.png')
         
-        print("📈 Grafico de evolucao do peso salvo como 'data/evolucao_peso.png'")
+        print(f"📈 Grafico de evolucao do peso salvo como '{path}'")
     
     def create_body_composition(self):
         """Cria grafico de composicao corporal"""
@@ -117,30 +287,23 @@ class BioimpedanceAnalyzer:
             print("❌ Nenhum dado carregado.")
             return
         
-        # Verifica se as colunas necessarias existem
-        gordura_col = None
-        massa_col = None
-        
-        for col in self.data.columns:
-            if 'Gordura' in col and ('%' in col or 'porcento' in col):
-                gordura_col = col
-            elif 'Massa Musucular' in col and ('%' in col or 'porcento' in col):
-                massa_col = col
+        spec = self.chart_spec()
+        gordura = spec.series('fat_pct')
+        massa = spec.series('muscle_pct')
         
-        if not gordura_col or not massa_col:
+        if gordura is None or massa is None:
             print("❌ Colunas de composicao corporal não encontradas.")
             return
         
-        clean_data = self.data.dropna(subset=['data', gordura_col, massa_col])
-        
-        if len(clean_data) == 0:
+        if len(gordura) == 0 or len(massa) == 0:
             print("❌ Nenhum dado valido encontrado.")
             return
         
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 12))
+        fig = self.figures.acquire(figsize=(14, 12))
+        ax1, ax2 = fig.subplots(2, 1)
         
         # Grafico de percentual de gordura
-        ax1.plot(clean_data['data'], clean_data[gordura_col], 
+        downsampling.plot_series(ax1, gordura.dates, gordura.values, dpi=self.export_settings['dpi'],
                 marker='o', linewidth=3, markersize=8, color='#E74C3C', label='Gordura (%)')
         ax1.set_title('Evolucao do Percentual de Gordura', fontsize=16, fontweight='bold')
         ax1.set_ylabel('Gordura (%)', fontsize=12)
@@ -148,7 +311,7 @@ class BioimpedanceAnalyzer:
         ax1.legend()
         
         # Grafico de percentual de massa muscular
-        ax2.plot(clean_data['data'], clean_data[massa_col], 
+        downsampling.plot_series(ax2, massa.dates, massa.values, dpi=self.export_settings['dpi'],
                 marker='s', linewidth=3, markersize=8, color='#27AE60', label='Massa Muscular (%)')
         ax2.set_title('Evolucao do Percentual de Massa Muscular', fontsize=16, fontweight='bold')
         ax2.set_xlabel('Data', fontsize=12)
@@ -158,32 +321,28 @@ class BioimpedanceAnalyzer:
         
         plt.xticks(rotation=45)
         plt.tight_layout()
-        plt.savefig('../data/exports/composicao_corporal.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        path = self._save_figure('composicao_corporal.png')
         
-        print("💪 Grafico de composicao corporal salvo como 'data/composicao_corporal.png'")
+        print(f"💪 Grafico de composicao corporal salvo como '{path}'")
     
     def create_imc_analysis(self):
         """Cria analise do IMC"""
-        if self.data is None or 'imc' not in self.data.columns:
+        imc = self.chart_spec().series('bmi') if self.data is not None else None
+        if imc is None:
             print("❌ Dados de IMC não encontrados.")
             return
         
-        clean_data = self.data.dropna(subset=['data', 'imc'])
-        
-        if len(clean_data) == 0:
+        if len(imc) == 0:
             print("❌ Nenhum dado valido encontrado.")
             return
         
-        plt.figure(figsize=(14, 8))
-        plt.plot(clean_data['data'], clean_data['imc'], 
+        self.figures.acquire(figsize=(14, 8))
+        downsampling.plot_series(plt.gca(), imc.dates, imc.values, dpi=self.export_settings['dpi'],
                 marker='o', linewidth=3, markersize=8, color='#8E44AD')
         
         # Adiciona linhas de referencia do IMC
-        plt.axhline(y=18.5, color='green', linestyle='--', alpha=0.7, label='Abaixo do peso')
-        plt.axhline(y=25, color='yellow', linestyle='--', alpha=0.7, label='Peso normal')
-        plt.axhline(y=30, color='orange', linestyle='--', alpha=0.7, label='Sobrepeso')
-        plt.axhline(y=35, color='red', linestyle='--', alpha=0.7, label='Obesidade')
+        for value, label, color in chart_specs.BMI_BANDS:
+            plt.axhline(y=value, color=color, linestyle='--', alpha=0.7, label=label)
         
         plt.title('Evolucao do Indice de Massa Corporal (IMC)', fontsize=18, fontweight='bold', pad=20)
         plt.xlabel('Data', fontsize=14)
@@ -193,49 +352,33 @@ class BioimpedanceAnalyzer:
         plt.xticks(rotation=45)
         
         # Adiciona estatisticas
-        current_imc = clean_data['imc'].iloc[-1]
-        first_imc = clean_data['imc'].iloc[0]
-        imc_change = current_imc - first_imc
-        
-        # Classifica o IMC atual
-        if current_imc < 18.5:
-            classification = "Abaixo do peso"
-        elif current_imc < 25:
-            classification = "Peso normal"
-        elif current_imc < 30:
-            classification = "Sobrepeso"
-        else:
-            classification = "Obesidade"
-        
-        stats_text = f'IMC inicial: {first_imc:.1f}\n'
-        stats_text += f'IMC atual: {current_imc:.1f}\n'
-        stats_text += f'Mudanca: {imc_change:+.1f}\n'
-        stats_text += f'Classificacao: {classification}'
+        stats_text = f'IMC inicial: {imc.first:.1f}\n'
+        stats_text += f'IMC atual: {imc.last:.1f}\n'
+        stats_text += f'Mudanca: {imc.change:+.1f}\n'
+        stats_text += f'Classificacao: {chart_specs.bmi_classification(imc.last)}'
         
         plt.text(0.02, 0.98, stats_text, transform=plt.gca().transAxes, 
                 verticalalignment='top', fontsize=11,
                 bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.8))
         
         plt.tight_layout()
-        plt.savefig('../data/exports/analise_imc.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        path = self._save_figure('analise_imc.png')
         
-        print("📊 Analise de IMC salva como 'data/analise_imc.png'")
+        print(f"📊 Analise de IMC salva como '{path}'")
     
     def create_metabolism_analysis(self):
         """Cria analise do metabolismo"""
-        if self.data is None or 'Metabolismo' not in self.data.columns:
+        metab = self.chart_spec().series('bmr') if self.data is not None else None
+        if metab is None:
             print("❌ Dados de metabolismo não encontrados.")
             return
         
-        clean_data = self.data.dropna(subset=['data', 'Metabolismo'])
-        
-        if len(clean_data) == 0:
+        if len(metab) == 0:
             print("❌ Nenhum dado valido encontrado.")
             return
         
-        plt.figure(figsize=(14, 8))
-        plt.plot(clean_data['data'], clean_data['Metabolismo'], 
+        self.figures.acquire(figsize=(14, 8))
+        downsampling.plot_series(plt.gca(), metab.dates, metab.values, dpi=self.export_settings['dpi'],
                 marker='o', linewidth=3, markersize=8, color='#F39C12')
         
         plt.title('Evolucao do Metabolismo Basal', fontsize=18, fontweight='bold', pad=20)
@@ -245,23 +388,18 @@ class BioimpedanceAnalyzer:
         plt.xticks(rotation=45)
         
         # Adiciona estatisticas
-        current_metabolism = clean_data['Metabolismo'].iloc[-1]
-        first_metabolism = clean_data['Metabolismo'].iloc[0]
-        metabolism_change = current_metabolism - first_metabolism
-        
-        stats_text = f'Metabolismo inicial: {first_metabolism:.0f} kcal/dia\n'
-        stats_text += f'Metabolismo atual: {current_metabolism:.0f} kcal/dia\n'
-        stats_text += f'Mudanca: {metabolism_change:+.0f} kcal/dia'
+        stats_text = f'Metabolismo inicial: {metab.first:.0f} kcal/dia\n'
+        stats_text += f'Metabolismo atual: {metab.last:.0f} kcal/dia\n'
+        stats_text += f'Mudanca: {metab.change:+.0f} kcal/dia'
         
         plt.text(0.02, 0.98, stats_text, transform=plt.gca().transAxes, 
                 verticalalignment='top', fontsize=11,
                 bbox=dict(boxstyle='round', facecolor='orange', alpha=0.8))
         
         plt.tight_layout()
-        plt.savefig('../data/exports/analise_metabolismo.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        path = self._save_figure('analise_metabolismo.png')
         
-        print("❌? Analise de metabolismo salva como 'data/analise_metabolismo.png'")
+        print(f"❌? Analise de metabolismo salva como '{path}'")
     
     def create_comprehensive_dashboard(self):
         """Cria dashboard completo com todos os indicadores"""
@@ -269,53 +407,28 @@ class BioimpedanceAnalyzer:
             print("❌ Nenhum dado carregado.")
             return
         
-        clean_data = self.data.dropna(subset=['data'])
-        
-        if len(clean_data) == 0:
+        if self.data['data'].isna().all():
             print("❌ Nenhum dado valido encontrado.")
             return
         
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
-        
-        # Peso
-        if 'peso' in clean_data.columns:
-            ax1.plot(clean_data['data'], clean_data['peso'], 
-                    marker='o', linewidth=2, markersize=6, color='#2E86AB')
-            ax1.set_title('Peso (kg)', fontweight='bold')
-            ax1.grid(True, alpha=0.3)
-        
-        # IMC
-        if 'imc' in clean_data.columns:
-            ax2.plot(clean_data['data'], clean_data['imc'], 
-                    marker='s', linewidth=2, markersize=6, color='#8E44AD')
-            ax2.set_title('IMC', fontweight='bold')
-            ax2.grid(True, alpha=0.3)
-        
-        # Gordura
-        gordura_col = None
-        for col in clean_data.columns:
-            if 'Gordura' in col and ('%' in col or 'porcento' in col):
-                gordura_col = col
-                break
-        
-        if gordura_col:
-            ax3.plot(clean_data['data'], clean_data[gordura_col], 
-                    marker='^', linewidth=2, markersize=6, color='#E74C3C')
-            ax3.set_title('Gordura (%)', fontweight='bold')
-            ax3.grid(True, alpha=0.3)
-        
-        # Massa Muscular
-        massa_col = None
-        for col in clean_data.columns:
-            if 'Massa Musucular' in col and ('%' in col or 'porcento' in col):
-                massa_col = col
-                break
-        
-        if massa_col:
-            ax4.plot(clean_data['data'], clean_data[massa_col], 
-                    marker='d', linewidth=2, markersize=6, color='#27AE60')
-            ax4.set_title('Massa Muscular (%)', fontweight='bold')
-            ax4.grid(True, alpha=0.3)
+        fig = self.figures.acquire(figsize=(16, 12))
+        (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
+        
+        # Series preparadas (as mesmas dos graficos individuais)
+        spec = self.chart_spec()
+        panels = [
+            (ax1, spec.series('weight'), 'o', '#2E86AB', 'Peso (kg)'),
+            (ax2, spec.series('bmi'), 's', '#8E44AD', 'IMC'),
+            (ax3, spec.series('fat_pct'), '^', '#E74C3C', 'Gordura (%)'),
+            (ax4, spec.series('muscle_pct'), 'd', '#27AE60', 'Massa Muscular (%)'),
+        ]
+        for ax, series, marker, color, title in panels:
+            if series is None:
+                continue
+            downsampling.plot_series(ax, series.dates, series.values, dpi=self.export_settings['dpi'],
+                    marker=marker, linewidth=2, markersize=6, color=color)
+            ax.set_title(title, fontweight='bold')
+            ax.grid(True, alpha=0.3)
         
         # Ajusta os eixos x
         for ax in [ax1, ax2, ax3, ax4]:
@@ -323,85 +436,255 @@ class BioimpedanceAnalyzer:
         
         plt.suptitle('Dashboard de Composicao Corporal', fontsize=20, fontweight='bold', y=0.98)
         plt.tight_layout()
-        plt.savefig('../data/exports/dashboard_completo.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        path = self._save_figure('dashboard_completo.png')
         
-        print("❌? Dashboard completo salvo como 'data/dashboard_completo.png'")
+        print(f"❌? Dashboard completo salvo como '{path}'")
     
-    def generate_summary_report(self):
-        """Gera relatorio resumo dos dados"""
+    def summary_sections(self):
+        """
+        Conteudo do relatorio resumo (usado no terminal e na pagina do PDF)
+        
+        Returns:
+            tuple: (periodo, total de medicoes, [(titulo, [linhas])]) ou None
+        """
         if self.data is None:
             print("❌ Nenhum dado carregado.")
+            return None
+        
+        if self.summary is not None:
+            # Modo streaming: resumo ja acumulado durante a leitura
+            if self.summary.count == 0:
+                print("❌ Nenhum dado valido encontrado.")
+                return None
+            first, latest, total = self.summary.first, self.summary.last, self.summary.count
+        else:
+            # Linhas com data, pela coluna de data apenas (sem copiar as demais,
+            # que no arquivo colunar ficam mapeadas em disco)
+            valid = self.data['data'].notna().to_numpy()
+            total = int(valid.sum())
+            
+            if total == 0:
+                print("❌ Nenhum dado valido encontrado.")
+                return None
+            
+            # Primeira e ultima linha, so com as colunas do resumo (acessar a
+            # linha inteira do DataFrame consolidaria todas as colunas na memoria)
+            used = ['data'] + [self.columns[metric] for _, metric, _, _ in SUMMARY_METRICS
+                               if self.columns[metric]]
+            first_row = int(valid.argmax())
+            last_row = len(valid) - 1 - int(valid[::-1].argmax())
+            latest = {col: self.data[col].iloc[last_row] for col in used}
+            first = {col: self.data[col].iloc[first_row] for col in used}
+        
+        period = f"{first['data'].strftime('%d/%m/%Y')} a {latest['data'].strftime('%d/%m/%Y')}"
+        
+        sections = []
+        for title, metric, fmt, unit in SUMMARY_METRICS:
+            # Colunas resolvidas no carregamento
+            col = self.columns[metric]
+            lines = []
+            if col:
+                change = latest[col] - first[col]
+                lines = [f"Inicial: {first[col]:{fmt}}{unit}",
+                         f"Atual: {latest[col]:{fmt}}{unit}",
+                         f"Mudanca: {change:+{fmt}}{unit}"]
+            sections.append((title, lines))
+        
+        return period, total, sections
+    
+    def generate_summary_report(self):
+        """Gera relatorio resumo dos dados"""
+        report = self.summary_sections()
+        if report is None:
             return
-        
-        clean_data = self.data.dropna(subset=['data'])
-        
-        if len(clean_data) == 0:
-            print("❌ Nenhum dado valido encontrado.")
-            return
+        period, total, sections = report
         
         print("\n" + "="*70)
         print("❌? RELATORIO DE COMPOSICAO CORPORAL")
         print("="*70)
         
-        # Dados mais recentes
-        latest = clean_data.iloc[-1]
-        first = clean_data.iloc[0]
-        
-        print(f"\n?? Periodo: {first['data'].strftime('%d/%m/%Y')} a {latest['data'].strftime('%d/%m/%Y')}")
-        print(f"❌? Total de medições: {len(clean_data)}")
-        
-        print(f"\n?? PESO:")
-        if 'peso' in clean_data.columns:
-            peso_change = latest['peso'] - first['peso']
-            print(f"   ? Inicial: {first['peso']:.1f} kg")
-            print(f"   ? Atual: {latest['peso']:.1f} kg")
-            print(f"   ? Mudanca: {peso_change:+.1f} kg")
-        
-        print(f"\n?? IMC:")
-        if 'imc' in clean_data.columns:
-            imc_change = latest['imc'] - first['imc']
-            print(f"   ? Inicial: {first['imc']:.1f}")
-            print(f"   ? Atual: {latest['imc']:.1f}")
-            print(f"   ? Mudanca: {imc_change:+.1f}")
-        
-        print(f"\n?? GORDURA:")
-        gordura_col = None
-        for col in clean_data.columns:
-            if 'Gordura' in col and ('%' in col or 'porcento' in col):
-                gordura_col = col
-                break
-        
-        if gordura_col:
-            gordura_change = latest[gordura_col] - first[gordura_col]
-            print(f"   ? Inicial: {first[gordura_col]:.1f}%")
-            print(f"   ? Atual: {latest[gordura_col]:.1f}%")
-            print(f"   ? Mudanca: {gordura_change:+.1f}%")
-        
-        print(f"\n?? MASSA MUSCULAR:")
-        massa_col = None
-        for col in clean_data.columns:
-            if 'Massa Musucular' in col and ('%' in col or 'porcento' in col):
-                massa_col = col
-                break
-        
-        if massa_col:
-            massa_change = latest[massa_col] - first[massa_col]
-            print(f"   ? Inicial: {first[massa_col]:.1f}%")
-            print(f"   ? Atual: {latest[massa_col]:.1f}%")
-            print(f"   ? Mudanca: {massa_change:+.1f}%")
-        
-        print(f"\n?? METABOLISMO:")
-        if 'Metabolismo' in clean_data.columns:
-            metab_change = latest['Metabolismo'] - first['Metabolismo']
-            print(f"   ? Inicial: {first['Metabolismo']:.0f} kcal/dia")
-            print(f"   ? Atual: {latest['Metabolismo']:.0f} kcal/dia")
-            print(f"   ? Mudanca: {metab_change:+.0f} kcal/dia")
+        print(f"\n?? Periodo: {period}")
+        print(f"❌? Total de medições: {total}")
+        
+        for title, lines in sections:
+            print(f"\n?? {title}:")
+            for line in lines:
+                print(f"   ? {line}")
         
         print("\n" + "="*70)
     
-    def generate_report(self):
-        """Gera relatorio completo com todos os graficos"""
+    def create_summary_page(self):
+        """Pagina A4 com o relatorio resumo (primeira pagina do PDF)"""
+        report = self.summary_sections()
+        if report is None:
+            return None
+        period, total, sections = report
+        
+        fig = self.figures.acquire(figsize=(8.27, 11.69))
+        fig.text(0.08, 0.94, 'Relatorio de Composicao Corporal', fontsize=20, fontweight='bold')
+        fig.text(0.08, 0.91, os.path.basename(os.path.normpath(self.data_file)), fontsize=11, color='gray')
+        fig.text(0.08, 0.87, f'Periodo: {period}', fontsize=12)
+        fig.text(0.08, 0.845, f'Total de medicoes: {total}', fontsize=12)
+        
+        y = 0.79
+        for title, lines in sections:
+            fig.text(0.08, y, title, fontsize=13, fontweight='bold', color='#2E86AB')
+            y -= 0.03
+            for line in lines or ['Dados nao disponiveis']:
+                fig.text(0.11, y, line, fontsize=11)
+                y -= 0.025
+            y -= 0.02
+        return fig
+    
+    def render_chart(self, method):
+        """Executa um create_*; a figura volta ao pool mesmo se o grafico falhar"""
+        try:
+            getattr(self, method)()
+        finally:
+            self.figures.release_all()
+    
+    def chart_columns(self, chart):
+        """Colunas consumidas por um grafico"""
+        metrics = CHARTS[chart][2]
+        return ['data'] + [self.columns[m] for m in metrics if self.columns.get(m)]
+    
+    def chart_data(self, chart):
+        """Apenas as colunas consumidas por um grafico (enviadas aos processos)"""
+        return self.data[self.chart_columns(chart)]
+    
+    def render_charts(self, parallel=False, workers=None):
+        """
+        Gera os graficos do relatorio
+        
+        Com use_cache, os graficos cujas colunas e configuracoes nao mudaram
+        sao reaproveitados do cache de renderizacao em vez de redesenhados.
+        
+        Args:
+            parallel (bool): Renderiza cada grafico em um processo do pool
+                (os processos sempre usam o modo headless)
+            workers (int): Processos do pool (padrao: um por grafico, ate o numero de CPUs)
+        
+        Returns:
+            dict: grafico -> tempo de renderizacao em segundos
+        """
+        timings = {}
+        keys = {}
+        pending = []
+        
+        settings = render_cache.render_settings(self.export_settings)
+        for chart in CHARTS:
+            if self.use_cache:
+                start = time.perf_counter()
+                # Colunas avulsas, sem montar (e copiar) um DataFrame com elas
+                columns = {name: self.data[name] for name in self.chart_columns(chart)}
+                keys[chart] = render_cache.chart_key(chart, columns, settings)
+                cached = render_cache.lookup(keys[chart], self.export_settings['format'])
+                if cached:
+                    path = render_cache.materialize(cached, self.chart_path(chart))
+                    timings[chart] = time.perf_counter() - start
+                    print(f"♻️ {chart}: reaproveitado do cache de renderizacao ('{path}')")
+                    continue
+            pending.append(chart)
+        
+        if not parallel:
+            for chart in pending:
+                start = time.perf_counter()
+                self.render_chart(CHARTS[chart][0])
+                timings[chart] = time.perf_counter() - start
+        elif pending:
+            workers = workers or min(len(pending), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {chart: executor.submit(_render_chart, chart, self.data_file,
+                                                  self.chart_data(chart), self.output_dir,
+                                                  self.export_preset)
+                           for chart in pending}
+                for chart, future in futures.items():
+                    timings[chart] = future.result()
+        
+        for chart in pending:
+            path = self.chart_path(chart)
+            if chart in keys and os.path.exists(path):
+                render_cache.store(keys[chart], path)
+        
+        return {chart: timings[chart] for chart in CHARTS if chart in timings}
+    
+    def pdf_report_path(self):
+        """Caminho padrao do relatorio PDF (um arquivo por paciente)"""
+        patient = cohort_loader.patient_id(os.path.normpath(self.data_file))
+        return os.path.join(self.output_dir, REPORT_PDF.format(patient))
+    
+    def generate_pdf_report(self, path=None):
+        """
+        Gera o relatorio em um unico PDF: pagina de resumo e um grafico por pagina
+        
+        Tudo e feito em uma passada, no mesmo processo: estilo, fontes e
+        metadados sao configurados uma vez para todas as paginas, e as
+        fontes sao incorporadas uma unica vez no arquivo.
+        
+        Args:
+            path (str): Arquivo de saida (padrao: pdf_report_path())
+        
+        Returns:
+            str: Caminho do PDF, ou None sem dados validos
+        """
+        summary_page = self.create_summary_page()
+        if summary_page is None:
+            return None
+        
+        self.pdf_path = path or self.pdf_report_path()
+        os.makedirs(os.path.dirname(self.pdf_path) or '.', exist_ok=True)
+        metadata = {'Title': 'Relatorio de Composicao Corporal',
+                    'Subject': os.path.basename(os.path.normpath(self.data_file))}
+        
+        with PdfPages(self.pdf_path, metadata=metadata) as pdf:
+            self.pdf = pdf
+            try:
+                pdf.savefig(summary_page)
+                self.figures.release(summary_page)
+                for method, _, _ in CHARTS.values():
+                    self.render_chart(method)
+            finally:
+                self.pdf = None
+        
+        return self.pdf_path
+    
+    def html_dashboard_path(self):
+        """Caminho padrao do dashboard HTML (um arquivo por paciente)"""
+        patient = cohort_loader.patient_id(os.path.normpath(self.data_file))
+        return os.path.join(self.output_dir, REPORT_HTML.format(patient))
+    
+    def generate_html_dashboard(self, path=None):
+        """
+        Gera o dashboard completo como um unico arquivo HTML interativo
+        
+        As series vao embutidas no arquivo e sao desenhadas no navegador,
+        com zoom e arraste, sem renderizar nenhuma imagem aqui.
+        
+        Args:
+            path (str): Arquivo de saida (padrao: html_dashboard_path())
+        
+        Returns:
+            str: Caminho do HTML, ou None sem dados validos
+        """
+        if self.data is None or self.data['data'].isna().all():
+            print("❌ Nenhum dado valido encontrado.")
+            return None
+        
+        patient = cohort_loader.patient_id(os.path.normpath(self.data_file))
+        return html_dashboard.write_dashboard(
+            self.data, self.columns, path or self.html_dashboard_path(),
+            title=f"Dashboard de Composicao Corporal - {patient}", archive=self.archive)
+    
+    def generate_report(self, parallel=False, workers=None, pdf=False, html=False):
+        """
+        Gera relatorio completo com todos os graficos
+        
+        Args:
+            parallel (bool): Renderiza os graficos em paralelo (pool de processos)
+            workers (int): Processos do pool no modo paralelo
+            pdf (bool): Gera um unico PDF (resumo + graficos) em vez dos arquivos separados
+            html (bool): Gera tambem o dashboard HTML interativo
+        """
         print("❌? Iniciando analise de dados de bioimpedância...")
         print("=" * 60)
         
@@ -418,23 +701,151 @@ class BioimpedanceAnalyzer:
         print("\n?? Gerando graficos...")
         print("-" * 40)
         
-        self.create_weight_evolution()
-        self.create_body_composition()
-        self.create_imc_analysis()
-        self.create_metabolism_analysis()
-        self.create_comprehensive_dashboard()
+        if html:
+            path = self.generate_html_dashboard()
+            if path:
+                print(f"🌐 Dashboard interativo salvo como '{path}'")
+        
+        if pdf:
+            start = time.perf_counter()
+            path = self.generate_pdf_report()
+            if path:
+                print(f"\n📄 Relatorio PDF salvo como '{path}' ({time.perf_counter() - start:.2f} s)")
+            print("=" * 60)
+            return
         
-        print("\n? Analise concluida! Todos os graficos foram salvos na pasta 'data/'")
+        start = time.perf_counter()
+        timings = self.render_charts(parallel=parallel, workers=workers)
+        elapsed = time.perf_counter() - start
+        
+        print("\n⏱️ Tempo por grafico:")
+        for chart, seconds in timings.items():
+            print(f"   {chart:<22} {seconds:6.2f} s")
+        print(f"   {'total (parede)':<22} {elapsed:6.2f} s")
+        print(f"🧮 {self.figures.format_stats()}")
+        
+        print(f"\n? Analise concluida! Todos os graficos foram salvos na pasta '{self.output_dir}'")
         print("=" * 60)
 
+def _render_chart(chart, data_file, data, output_dir, export_preset=None):
+    """Renderiza um grafico em um processo do pool; retorna o tempo gasto"""
+    start = time.perf_counter()
+    analyzer = BioimpedanceAnalyzer(data_file, data=data, output_dir=output_dir, headless=True,
+                                    export_preset=export_preset)
+    analyzer.render_chart(CHARTS[chart][0])
+    return time.perf_counter() - start
+
+def analyze_cohort(source, workers=None, use_cache=True, compact=False, pdf=False, output_dir=None,
+                   html=False):
+    """
+    Carrega todos os pacientes de um diretorio (ou glob) em paralelo e
+    imprime a visao geral e o relatorio resumo de cada um
+
+    Com pdf=True, gera tambem o relatorio PDF de cada paciente (um arquivo
+    por paciente, em output_dir); com html=True, o dashboard HTML interativo
+    de cada paciente
+
+    Returns:
+        PatientCohort: Medicoes por paciente
+    """
+    cohort = cohort_loader.load_patients(source, workers=workers, use_cache=use_cache, compact=compact)
+    
+    if len(cohort) == 0 and not cohort.errors:
+        print(f"❌ Nenhum arquivo CSV encontrado em: {source}")
+        return cohort
+    
+    print(f"✅ {len(cohort)} pacientes carregados em {cohort.elapsed:.2f} s "
+          f"({cohort.total_measurements()} medições)")
+    for patient, error in cohort.errors.items():
+        print(f"❌ Erro ao carregar {patient}: {error}")
+    for patient, original in cohort.renamed.items():
+        print(f"⚠️ Identificador duplicado '{original}': {cohort.files[patient]} carregado como '{patient}'")
+    if compact:
+        print(f"🗜️ Modo compacto: {measurement_schema.format_memory(cohort.memory_before, cohort.memory_after)}")
+    
+    print("\n" + "="*70)
+    print(f"{'Paciente':<30} {'Medições':>10} {'Peso inicial':>13} {'Peso atual':>11}")
+    print("-"*70)
+    for patient, data in cohort.items():
+        peso_col = measurement_schema.resolve_columns(data.columns)['weight']
+        peso = data[peso_col].dropna() if peso_col else pd.Series(dtype=float)
+        first = f"{peso.iloc[0]:.1f}" if len(peso) else '-'
+        latest = f"{peso.iloc[-1]:.1f}" if len(peso) else '-'
+        print(f"{patient:<30} {len(data):>10} {first:>13} {latest:>11}")
+    print("="*70)
+    
+    for patient, data in cohort.items():
+        print(f"\n👤 Paciente: {patient}")
+        analyzer = BioimpedanceAnalyzer(cohort.files[patient], data=data, output_dir=output_dir,
+                                        headless=pdf)
+        if analyzer.prepare_data():
+            analyzer.generate_summary_report()
+            if pdf:
+                path = analyzer.generate_pdf_report(
+                    os.path.join(analyzer.output_dir, REPORT_PDF.format(patient)))
+                if path:
+                    print(f"📄 Relatorio PDF salvo como '{path}'")
+            if html:
+                path = analyzer.generate_html_dashboard(
+                    os.path.join(analyzer.output_dir, REPORT_HTML.format(patient)))
+                if path:
+                    print(f"🌐 Dashboard interativo salvo como '{path}'")
+    
+    if pdf:
+        print(f"\n🧮 {figure_pool.default_pool().format_stats()}")
+    
+    return cohort
+
+def parse_args(argv=None):
+    """Le os argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(description="Analisador de Bioimpedancia - Composicao Corporal")
+    parser.add_argument('data_file', nargs='?', help="Arquivo CSV com as medicoes")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Le o arquivo em blocos (para arquivos maiores que a memoria)")
+    parser.add_argument('--chunksize', type=int, default=streaming_summary.DEFAULT_CHUNKSIZE,
+                        help="Linhas por bloco no modo streaming")
+    parser.add_argument('--sem-cache', dest='use_cache', action='store_false',
+                        help="Nao usa o cache binario nem o cache de renderizacao em data/processed")
+    parser.add_argument('--compacto', action='store_true',
+                        help="Usa tipos compactos em memoria (float32, categoricas)")
+    parser.add_argument('--colunar', action='store_true',
+                        help="Converte o CSV para o arquivo colunar (.cols) e analisa a partir dele")
+    parser.add_argument('--pacientes', metavar='DIRETORIO_OU_GLOB',
+                        help="Analisa todos os CSVs (um por paciente) de um diretorio ou glob")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processos usados para carregar os pacientes ou renderizar os graficos "
+                             "(padrao: numero de CPUs)")
+    parser.add_argument('--headless', action='store_true',
+                        help="Sem janelas: backend Agg, sem plt.show() e figuras fechadas apos salvar")
+    parser.add_argument('--paralelo', action='store_true',
+                        help="Renderiza os graficos do relatorio em paralelo (pool de processos)")
+    parser.add_argument('--preset', choices=list(config.EXPORT_PRESETS), default=None,
+                        help=f"Preset de exportacao dos graficos (DPI, formato e tamanho; "
+                             f"padrao: {config.DEFAULT_EXPORT_PRESET})")
+    parser.add_argument('--pdf', action='store_true',
+                        help="Gera um unico PDF por paciente (resumo + graficos) em vez dos arquivos separados")
+    parser.add_argument('--html', action='store_true',
+                        help="Gera tambem o dashboard interativo em um unico arquivo HTML (sem rede)")
+    parser.add_argument('--saida', default=None,
+                        help=f"Pasta dos graficos exportados (padrao: {DEFAULT_OUTPUT_DIR})")
+    return parser.parse_args(argv)
+
 def main():
     """Funcao principal"""
+    args = parse_args()
+    
     print("❌? Analisador de Bioimpedancia - Composicao Corporal")
     print("=" * 60)
     
+    if args.pacientes:
+        analyze_cohort(args.pacientes, workers=args.workers, use_cache=args.use_cache,
+                       compact=args.compacto, pdf=args.pdf, output_dir=args.saida,
+                       html=args.html)
+        return
+    
     # Verifica se o arquivo foi especificado
-    if len(sys.argv) > 1:
-        data_file = sys.argv[1]
+    if args.data_file:
+        data_file = args.data_file
     else:
         # Procura por arquivos CSV na pasta data
         import glob
@@ -465,9 +876,20 @@ def main():
         print(f"❌ Arquivo não encontrado: {data_file}")
         return
     
+    if args.colunar and not columnar_archive.is_archive(data_file):
+        archive_path = columnar_archive.archive_path_for(data_file)
+        if not columnar_archive.is_archive(archive_path):
+            print(f"🗄️ Gerando arquivo colunar: {archive_path}")
+            columnar_archive.build_archive(data_file, archive_path, chunksize=args.chunksize)
+        data_file = archive_path
+    
     # Cria o analisador e gera o relatorio
-    analyzer = BioimpedanceAnalyzer(data_file)
-    analyzer.generate_report()
+    analyzer = BioimpedanceAnalyzer(data_file, use_cache=args.use_cache,
+                                    streaming=args.streaming, chunksize=args.chunksize,
+                                    compact=args.compacto, output_dir=args.saida,
+                                    headless=args.headless, export_preset=args.preset)
+    analyzer.generate_report(parallel=args.paralelo, workers=args.workers, pdf=args.pdf,
+                             html=args.html)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportacao de graficos pelos presets de config.EXPORT_PRESETS
+A previa em baixa resolucao e gerada na hora; o arquivo final pode ser
+renderizado em segundo plano, a partir de uma copia da figura.
+"""
+
+import io
+import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Adiciona a raiz do projeto ao path (config.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import config
+
+# Um unico thread: as exportacoes em segundo plano sao feitas em ordem
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chart-export')
+
+
+def export_preset(name=None):
+    """Preset de exportacao (padrao: config.DEFAULT_EXPORT_PRESET)"""
+    name = name or config.DEFAULT_EXPORT_PRESET
+    if name not in config.EXPORT_PRESETS:
+        raise ValueError(f"Preset de exportacao desconhecido: {name}")
+    return config.EXPORT_PRESETS[name]
+
+
+def export_path(path, preset=None):
+    """Caminho com a extensao do formato do preset (se nao tiver extensao)"""
+    if os.path.splitext(path)[1]:
+        return path
+    return f"{path}.{export_preset(preset)['format']}"
+
+
+def with_format(filename, preset=None):
+    """Troca a extensao do arquivo pela do formato do preset"""
+    return f"{os.path.splitext(filename)[0]}.{export_preset(preset)['format']}"
+
+
+def save_figure(fig, path, preset=None):
+    """
+    Salva a figura com o DPI, o formato e o tamanho do preset
+
+    O tamanho do preset e aplicado a propria figura (use copy_figure antes
+    se ela continuar sendo exibida).
+
+    Returns:
+        str: Caminho salvo
+    """
+    settings = export_preset(preset)
+    path = export_path(path, preset)
+    if settings['size']:
+        fig.set_size_inches(*settings['size'])
+    # O formato vem da extensao; sem ela, do preset
+    file_format = os.path.splitext(path)[1][1:].lower() or settings['format']
+    fig.savefig(path, dpi=settings['dpi'], format=file_format, bbox_inches='tight')
+    return path
+
+
+def render_preview(fig, dpi=None):
+    """PNG em baixa resolucao da figura, em memoria (bytes)"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, dpi=dpi or config.PREVIEW_DPI, format='png', bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def copy_figure(fig):
+    """Copia independente da figura (sem o canvas da interface)"""
+    return pickle.loads(pickle.dumps(fig))
+
+
+def export_in_background(fig, path, preset=None):
+    """
+    Renderiza o arquivo final em segundo plano
+
+    A figura e copiada antes, entao a interface pode continuar desenhando a
+    original enquanto a exportacao roda.
+
+    Returns:
+        concurrent.futures.Future: Resultado de save_figure (caminho salvo)
+    """
+    copy = copy_figure(fig)
+    return _executor.submit(save_figure, copy, path, preset)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dados preparados dos graficos, compartilhados pelo analisador e pelas interfaces
+Para cada conjunto de dados (o mesmo DataFrame), as series validas de cada
+metrica e suas estatisticas sao calculadas uma vez e reaproveitadas por
+quem desenhar o grafico: exportacao em arquivo ou canvas da interface.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+# Faixas de referencia do IMC: (limite, rotulo, cor)
+BMI_BANDS = [
+    (18.5, 'Abaixo do peso', 'green'),
+    (25, 'Peso normal', 'yellow'),
+    (30, 'Sobrepeso', 'orange'),
+    (35, 'Obesidade', 'red'),
+]
+
+
+def bmi_classification(value):
+    """Classificacao do IMC"""
+    if value < 18.5:
+        return "Abaixo do peso"
+    elif value < 25:
+        return "Peso normal"
+    elif value < 30:
+        return "Sobrepeso"
+    return "Obesidade"
+
+
+class MetricSeries:
+    """
+    Serie de uma metrica pronta para desenho: datas e valores validos (sem
+    ausentes, na ordem do arquivo) e as estatisticas usadas nas anotacoes
+    """
+
+    def __init__(self, metric, column, dates, values):
+        self.metric = metric
+        self.column = column
+        self.dates = dates
+        self.values = values
+        if len(values):
+            self.first = values[0]
+            self.last = values[-1]
+            self.min = values.min()
+            self.max = values.max()
+            self.change = self.last - self.first
+        else:
+            self.first = self.last = self.min = self.max = self.change = None
+
+    def __len__(self):
+        return len(self.values)
+
+
+class DatasetSpec:
+    """
+    Series preparadas de um conjunto de dados, calculadas sob demanda e
+    guardadas por metrica
+
+    Guarda apenas uma referencia fraca ao DataFrame, para nao prende-lo na
+    memoria depois que ele for substituido. Pode ser usado por varios
+    threads (ex.: miniaturas da interface em segundo plano).
+    """
+
+    def __init__(self, data, columns, archive=None):
+        self._data = weakref.ref(data)
+        self.columns = dict(columns)
+        self.archive = archive
+        self.rows = len(data)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def series(self, metric):
+        """MetricSeries da metrica, ou None se a coluna nao existir"""
+        with self._lock:
+            if metric not in self._series:
+                self._series[metric] = self._build_series(metric)
+            return self._series[metric]
+
+    def _build_series(self, metric):
+        column = self.columns.get(metric)
+        if not column:
+            return None
+        if self.archive is not None and column in self.archive:
+            # Fatias direto dos arrays mapeados, sem montar um DataFrame
+            dates, values = self.archive.valid('data', column)
+            return MetricSeries(metric, column, dates, values)
+
+        data = self._data()
+        if data is None:
+            raise RuntimeError("Os dados desta especificacao nao existem mais")
+        dates = data['data'].to_numpy()
+        values = data[column].to_numpy(dtype='float64', na_value=np.nan)
+        valid = ~np.isnan(values)
+        if dates.dtype.kind == 'M':
+            valid &= ~np.isnat(dates)
+        if not valid.all():
+            dates, values = dates[valid], values[valid]
+        return MetricSeries(metric, column, dates, values)
+
+
+# id(DataFrame) -> (referencia fraca, DatasetSpec)
+_specs = {}
+# Reentrante: _forget pode rodar pelo coletor de lixo com o lock ja tomado
+_specs_lock = threading.RLock()
+
+
+def _forget(key, ref):
+    with _specs_lock:
+        entry = _specs.get(key)
+        if entry is not None and entry[0] is ref:
+            del _specs[key]
+
+
+def dataset_spec(data, columns, archive=None):
+    """
+    DatasetSpec compartilhado do DataFrame
+
+    O mesmo DataFrame (com as mesmas colunas e arquivo colunar) devolve
+    sempre a mesma especificacao, entao as series ja calculadas para a tela
+    sao reaproveitadas na exportacao e vice-versa. Um DataFrame novo (dados
+    recarregados) gera uma nova especificacao; a antiga sai do cache quando
+    o DataFrame e liberado.
+    """
+    key = id(data)
+    with _specs_lock:
+        entry = _specs.get(key)
+        if entry is not None:
+            ref, spec = entry
+            if (ref() is data and spec.archive is archive and spec.rows == len(data)
+                    and spec.columns == columns):
+                return spec
+
+        spec = DatasetSpec(data, columns, archive)
+        ref = weakref.ref(data, lambda ref, key=key: _forget(key, ref))
+        _specs[key] = (ref, spec)
+        return spec
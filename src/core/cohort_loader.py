@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Carregamento de varios pacientes (um CSV por paciente)
+Os arquivos de um diretorio (ou glob) sao lidos e preparados em paralelo,
+em um pool de processos
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import compressed_io
+import measurement_schema
+import measurement_store
+
+
+def find_patient_files(source):
+    """
+    Lista os CSVs de pacientes
+
+    Args:
+        source (str): Diretorio (todos os *.csv, inclusive comprimidos),
+            padrao glob ou um arquivo
+
+    Returns:
+        list: Caminhos em ordem alfabetica
+    """
+    if os.path.isdir(source):
+        patterns = [os.path.join(source, '*.csv')]
+        patterns += [os.path.join(source, '*.csv' + ext) for ext in compressed_io.COMPRESSION_EXTENSIONS]
+    else:
+        patterns = [source]
+    files = {path for pattern in patterns for path in glob.glob(pattern)}
+    return sorted(path for path in files if os.path.isfile(path))
+
+
+def patient_id(csv_file):
+    """Identificador do paciente: nome do arquivo sem extensao (nem compressao)"""
+    name = os.path.basename(csv_file)
+    if compressed_io.compression_from_extension(name):
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[0]
+
+
+def unique_patient_id(csv_file, taken):
+    """
+    Identificador ainda nao usado para o arquivo
+
+    Se outro arquivo ja tem o mesmo identificador (ex.: paciente.csv e
+    paciente.csv.gz, ou o mesmo nome em pastas diferentes de um glob),
+    acrescenta o nome do arquivo e, se preciso, um numero.
+    """
+    patient = patient_id(csv_file)
+    if patient not in taken:
+        return patient
+    unique = f"{patient} ({os.path.basename(csv_file)})"
+    number = 2
+    while unique in taken:
+        unique = f"{patient} ({os.path.basename(csv_file)}, {number})"
+        number += 1
+    return unique
+
+
+def _load_patient(csv_file, use_cache, compact=False):
+    """
+    Carrega um paciente (executado nos processos do pool)
+
+    Returns:
+        tuple: (DataFrame, bytes antes, bytes depois do modo compacto)
+    """
+    store = measurement_store.CsvMeasurementStore(csv_file, use_cache=use_cache)
+    data = store.load_frame()
+    if compact:
+        return measurement_schema.compact_types(data)
+    size = int(data.memory_usage(deep=True).sum())
+    return data, size, size
+
+
+class PatientCohort:
+    """
+    Medicoes de varios pacientes, indexadas pelo identificador do paciente
+
+    Funciona como um dicionario somente leitura (paciente -> DataFrame).
+    files guarda o CSV de cada paciente e errors as falhas de leitura.
+    renamed guarda os identificadores duplicados que foram renomeados
+    (identificador unico -> identificador original).
+    """
+
+    def __init__(self):
+        self.frames = {}
+        self.files = {}
+        self.errors = {}
+        self.renamed = {}
+        self.elapsed = 0.0
+        self.memory_before = 0
+        self.memory_after = 0
+
+    def __getitem__(self, patient):
+        return self.frames[patient]
+
+    def __contains__(self, patient):
+        return patient in self.frames
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def items(self):
+        return self.frames.items()
+
+    def patients(self):
+        """Identificadores dos pacientes carregados, em ordem"""
+        return list(self.frames)
+
+    def total_measurements(self):
+        return sum(len(data) for data in self.frames.values())
+
+
+def load_patients(source, workers=None, use_cache=True, compact=False):
+    """
+    Carrega e prepara todos os pacientes de um diretorio ou glob
+
+    Args:
+        source (str): Diretorio, padrao glob ou arquivo CSV
+        workers (int): Processos do pool (padrao: numero de CPUs).
+            Com 1 processo (ou 1 arquivo) a leitura e feita no processo atual.
+        use_cache (bool): Usa o cache binario em data/processed
+        compact (bool): Converte cada paciente para os tipos compactos do
+            esquema (dentro dos processos do pool)
+
+    Returns:
+        PatientCohort: Medicoes por paciente. Arquivos com o mesmo
+            identificador nao se sobrescrevem: o identificador dos seguintes
+            recebe o nome do arquivo (ver PatientCohort.renamed)
+    """
+    files = find_patient_files(source)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+
+    cohort = PatientCohort()
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = []
+        for csv_file in files:
+            try:
+                results.append((csv_file, _load_patient(csv_file, use_cache, compact), None))
+            except Exception as e:
+                results.append((csv_file, None, e))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(csv_file, executor.submit(_load_patient, csv_file, use_cache, compact))
+                       for csv_file in files]
+            results = []
+            for csv_file, future in futures:
+                try:
+                    results.append((csv_file, future.result(), None))
+                except Exception as e:
+                    results.append((csv_file, None, e))
+
+    for csv_file, result, error in results:
+        patient = unique_patient_id(csv_file, cohort.files)
+        if patient != patient_id(csv_file):
+            cohort.renamed[patient] = patient_id(csv_file)
+        cohort.files[patient] = csv_file
+        if error is not None:
+            cohort.errors[patient] = error
+        else:
+            data, before, after = result
+            cohort.frames[patient] = data
+            cohort.memory_before += before
+            cohort.memory_after += after
+
+    cohort.elapsed = time.perf_counter() - start
+    return cohort
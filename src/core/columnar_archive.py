@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arquivo colunar de medicoes, aberto por mapeamento em memoria
+Cada coluna e um arquivo binario de largura fixa (float64, datetime64[s])
+e um header.json descreve linhas, tipos e o CSV de origem. Abrir o arquivo
+so le o cabecalho: as paginas das colunas sao carregadas pelo sistema
+operacional quando usadas (e compartilhadas entre processos).
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import measurement_journal
+import measurement_schema
+import streaming_summary
+
+ARCHIVE_SUFFIX = '.cols'
+HEADER_FILE = 'header.json'
+FORMAT_VERSION = 1
+
+# Tipo de cada coluna no arquivo (a data com resolucao de segundos)
+DATE_DTYPE = 'datetime64[s]'
+
+
+def archive_path_for(csv_file):
+    """Arquivo colunar correspondente a um CSV (mesmo diretorio e nome)"""
+    return os.path.splitext(csv_file)[0] + ARCHIVE_SUFFIX
+
+
+def is_archive(path):
+    """Verifica se o caminho e um arquivo colunar"""
+    return os.path.isfile(os.path.join(path, HEADER_FILE))
+
+
+def _column_dtype(name):
+    if name == measurement_schema.DATE_COLUMN:
+        return DATE_DTYPE
+    return measurement_schema.COLUMN_DTYPES.get(measurement_schema.canonical_name(name), 'float64')
+
+
+def _source_state(csv_file):
+    stat = os.stat(csv_file)
+    journal_file = csv_file + '.journal'
+    journal_size = os.path.getsize(journal_file) if os.path.exists(journal_file) else 0
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'journal_size': journal_size}
+
+
+def build_archive(csv_file, path=None, chunksize=streaming_summary.DEFAULT_CHUNKSIZE):
+    """
+    Converte um CSV (com o diario aplicado) para o formato colunar
+
+    O CSV e lido em blocos e cada bloco e anexado aos arquivos das colunas,
+    entao historicos maiores que a memoria tambem podem ser convertidos.
+
+    Returns:
+        str: Caminho do arquivo colunar
+    """
+    path = path or archive_path_for(csv_file)
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    state = _source_state(csv_file)
+    columns = measurement_schema.read_header(csv_file)
+    entries = [{'name': name, 'dtype': _column_dtype(name), 'file': f'{i:02d}.bin'}
+               for i, name in enumerate(columns)]
+
+    journal = measurement_journal.MeasurementJournal(csv_file)
+    files = {entry['name']: open(os.path.join(tmp_path, entry['file']), 'wb') for entry in entries}
+    rows = 0
+    try:
+        for chunk in streaming_summary.iter_chunks(csv_file, chunksize, journal):
+            for entry in entries:
+                values = chunk[entry['name']].to_numpy(dtype=entry['dtype'])
+                values.tofile(files[entry['name']])
+            rows += len(chunk)
+    finally:
+        for file in files.values():
+            file.close()
+
+    header = {
+        'version': FORMAT_VERSION,
+        'rows': rows,
+        'columns': entries,
+        'source': os.path.abspath(csv_file),
+        'source_state': state,
+    }
+    with open(os.path.join(tmp_path, HEADER_FILE), 'w', encoding='utf-8') as file:
+        json.dump(header, file, ensure_ascii=False, indent=2)
+
+    # Troca o arquivo antigo pelo novo
+    if os.path.exists(path):
+        old_path = path + '.old'
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, path)
+
+    return path
+
+
+class ColumnarArchive:
+    """
+    Arquivo colunar aberto sob demanda
+
+    Cada coluna e um numpy.memmap somente leitura, criado no primeiro
+    acesso. Fatias das colunas nao copiam dados ate serem usadas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE), 'r', encoding='utf-8') as file:
+            self.header = json.load(file)
+        if self.header.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Versao de arquivo colunar nao suportada: {self.header.get('version')}")
+        self.rows = self.header['rows']
+        self._entries = {entry['name']: entry for entry in self.header['columns']}
+        self._arrays = {}
+
+    @property
+    def columns(self):
+        return list(self._entries)
+
+    @property
+    def source(self):
+        """CSV de origem"""
+        return self.header.get('source')
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column(self, name):
+        """Coluna inteira como memmap (sem leitura do disco)"""
+        array = self._arrays.get(name)
+        if array is None:
+            entry = self._entries[name]
+            if self.rows == 0:
+                array = np.empty(0, dtype=entry['dtype'])
+            else:
+                array = np.memmap(os.path.join(self.path, entry['file']), dtype=entry['dtype'],
+                                  mode='r', shape=(self.rows,))
+            self._arrays[name] = array
+        return array
+
+    def valid(self, *names, start=0, stop=None):
+        """
+        Fatias das colunas sem as linhas com valores ausentes
+
+        Returns:
+            list: Um array por coluna, na ordem pedida
+        """
+        arrays = [self.column(name)[start:stop] for name in names]
+        mask = np.ones(len(arrays[0]), dtype=bool)
+        for array in arrays:
+            mask &= ~np.isnat(array) if array.dtype.kind == 'M' else ~np.isnan(array)
+        if mask.all():
+            return arrays
+        return [array[mask] for array in arrays]
+
+    def to_frame(self, columns=None):
+        """DataFrame que aponta para os arrays mapeados (sem copia)"""
+        columns = columns or self.columns
+        return pd.DataFrame({name: self.column(name) for name in columns}, copy=False)
+
+    def is_stale(self):
+        """Indica se o CSV de origem (ou seu diario) mudou desde a conversao"""
+        source = self.source
+        if not source or not os.path.exists(source):
+            return False
+        return _source_state(source) != self.header.get('source_state')
+
+
+def open_archive(path, refresh=True):
+    """
+    Abre um arquivo colunar, reconstruindo-o se o CSV de origem mudou
+
+    Args:
+        path (str): Caminho do arquivo colunar (.cols)
+        refresh (bool): Reconstroi a partir do CSV de origem se estiver desatualizado
+    """
+    archive = ColumnarArchive(path)
+    if refresh and archive.is_stale():
+        build_archive(archive.source, path)
+        archive = ColumnarArchive(path)
+    return archive
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura e escrita transparente de arquivos de medicoes comprimidos
+A compressao (gzip, bz2, xz, zstd) e detectada pela extensao ou pelos
+primeiros bytes do arquivo; a descompressao e feita em fluxo
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+# Extensao -> compressao
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+}
+
+# Assinatura (primeiros bytes) -> compressao
+COMPRESSION_MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\xfd7zXZ\x00': 'xz',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+}
+
+# Tipos de arquivo aceitos nos dialogos de abertura das interfaces
+FILE_TYPES = [
+    ("CSV files", "*.csv"),
+    ("CSV comprimido", "*.csv.gz *.csv.bz2 *.csv.xz *.csv.zst"),
+    ("All files", "*.*"),
+]
+
+# Opcoes do dialogo de exportacao (a extensao escolhe a compressao)
+EXPORT_FILE_TYPES = [
+    ("CSV files", "*.csv"),
+    ("CSV gzip", "*.csv.gz"),
+    ("CSV xz", "*.csv.xz"),
+    ("CSV bz2", "*.csv.bz2"),
+    ("CSV zstd", "*.csv.zst"),
+    ("All files", "*.*"),
+]
+
+
+def zstd_available():
+    """Verifica se o pacote zstandard esta instalado"""
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def compression_from_extension(path):
+    """Compressao indicada pela extensao (ou None)"""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(str(path))[1].lower())
+
+
+def detect_compression(path):
+    """
+    Detecta a compressao de um arquivo pela extensao ou pelos primeiros bytes
+
+    Returns:
+        str: 'gzip', 'bz2', 'xz', 'zstd' ou None (texto puro)
+    """
+    compression = compression_from_extension(path)
+    if compression is not None:
+        return compression
+
+    if not isinstance(path, (str, os.PathLike)) or not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as file:
+        head = file.read(6)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def is_compressed(path):
+    return detect_compression(path) is not None
+
+
+def open_binary(path, mode='rb', compression=None):
+    """
+    Abre o arquivo em modo binario, descomprimindo/comprimindo em fluxo
+
+    Args:
+        path (str): Caminho do arquivo
+        mode (str): 'rb', 'wb' ou 'ab'
+        compression (str): Compressao (padrao: detectada)
+    """
+    if compression is None:
+        compression = compression_from_extension(path) if 'w' in mode else detect_compression(path)
+
+    if compression is None:
+        return open(path, mode)
+    if compression == 'gzip':
+        return gzip.open(path, mode)
+    if compression == 'bz2':
+        return bz2.open(path, mode)
+    if compression == 'xz':
+        return lzma.open(path, mode)
+    if compression == 'zstd':
+        if not zstd_available():
+            raise ImportError("Arquivos .zst requerem o pacote zstandard (pip install zstandard)")
+        import zstandard
+        return zstandard.open(path, mode)
+    raise ValueError(f"Compressao desconhecida: {compression}")
+
+
+def open_text(path, mode='r', compression=None):
+    """Abre o arquivo em modo texto (UTF-8, newline='' para o modulo csv)"""
+    binary = open_binary(path, mode[0] + 'b', compression)
+    return io.TextIOWrapper(binary, encoding='utf-8', newline='')
+
+
+def read_csv_compression(csv_file):
+    """Valor do parametro compression do pd.read_csv para a origem"""
+    if hasattr(csv_file, 'read'):
+        return None
+    return detect_compression(csv_file)
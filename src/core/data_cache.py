@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache binario dos dados de bioimpedancia ja processados
+Guarda o DataFrame tipado em data/processed para evitar reprocessar o CSV
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adiciona a raiz do projeto ao path (config.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import config
+import measurement_schema
+
+# Versao do formato do cache (incrementar ao mudar a estrutura do arquivo)
+CACHE_VERSION = 1
+
+
+def cache_path_for(csv_file):
+    """Retorna o caminho do arquivo de cache para um CSV"""
+    source = os.path.abspath(csv_file)
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+    name = os.path.basename(source).split('.')[0]
+    return os.path.join(config.PROCESSED_DATA_DIR, f"{name}-{digest}.npz")
+
+
+def file_hash(path, block_size=1 << 20):
+    """Calcula o hash do conteudo do arquivo em blocos"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_key(csv_file):
+    """Identificacao do arquivo de origem: caminho, tamanho e mtime"""
+    stat = os.stat(csv_file)
+    return {
+        'source': os.path.abspath(csv_file),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+
+
+def _read_cache(cache_file, key):
+    """Le o cache se ele corresponder ao arquivo de origem, senao None"""
+    with np.load(cache_file, allow_pickle=False) as archive:
+        meta = json.loads(str(archive['__meta__']))
+        if meta.get('version') != CACHE_VERSION or meta['source'] != key['source']:
+            return None
+
+        if meta['size'] != key['size']:
+            return None
+
+        if meta['mtime_ns'] != key['mtime_ns']:
+            # O mtime mudou (ex.: copia ou touch): confirma pelo conteudo
+            if meta['hash'] != file_hash(key['source']):
+                return None
+            meta['mtime_ns'] = key['mtime_ns']
+            touched = True
+        else:
+            touched = False
+
+        columns = {}
+        for i, (col, kind) in enumerate(zip(meta['columns'], meta['kinds'])):
+            values = archive[f'col_{i}']
+            if kind == 'object':
+                mask = archive[f'mask_{i}']
+                values = values.astype(object)
+                values[mask] = np.nan
+            columns[col] = values
+
+    data = pd.DataFrame(columns, columns=meta['columns'])
+
+    if touched:
+        # Atualiza o mtime para que a proxima leitura use o caminho rapido
+        _write_cache(cache_file, data, meta)
+
+    return data
+
+
+def _write_cache(cache_file, data, meta):
+    """Grava o DataFrame tipado no arquivo .npz"""
+    arrays = {}
+    kinds = []
+    for i, col in enumerate(data.columns):
+        series = data[col]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            arrays[f'col_{i}'] = series.to_numpy()
+            kinds.append(str(series.dtype))
+        else:
+            mask = series.isna().to_numpy()
+            arrays[f'col_{i}'] = series.fillna('').astype(str).to_numpy(dtype=str)
+            arrays[f'mask_{i}'] = mask
+            kinds.append('object')
+
+    meta = dict(meta, version=CACHE_VERSION, columns=list(data.columns), kinds=kinds)
+    arrays['__meta__'] = np.array(json.dumps(meta))
+
+    # Grava em arquivo temporario e renomeia para nao deixar cache corrompido
+    tmp_file = cache_file + '.tmp.npz'
+    np.savez(tmp_file, **arrays)
+    os.replace(tmp_file, cache_file)
+
+
+def load_measurements(csv_file, use_cache=True):
+    """
+    Carrega o CSV ja tipado, usando o cache binario quando valido
+
+    Args:
+        csv_file (str): Caminho para o arquivo CSV
+        use_cache (bool): Se False, sempre le e converte o CSV
+
+    Returns:
+        pd.DataFrame: Dados com a coluna 'data' em datetime e metricas numericas
+    """
+    if not use_cache:
+        return measurement_schema.read_measurements(csv_file, engine=config.CSV_ENGINE)
+
+    key = _source_key(csv_file)
+    cache_file = cache_path_for(csv_file)
+
+    if os.path.exists(cache_file):
+        try:
+            data = _read_cache(cache_file, key)
+            if data is not None:
+                return data
+        except Exception:
+            # Cache ilegivel: descarta e reconstroi
+            invalidate(csv_file)
+
+    data = measurement_schema.read_measurements(csv_file, engine=config.CSV_ENGINE)
+
+    try:
+        # Recalcula a chave caso o arquivo tenha mudado durante a leitura
+        meta = dict(_source_key(csv_file), hash=file_hash(csv_file))
+        if meta['size'] == key['size'] and meta['mtime_ns'] == key['mtime_ns']:
+            _write_cache(cache_file, data, meta)
+    except OSError:
+        # Sem permissao de escrita: segue sem cache
+        pass
+
+    return data
+
+
+def invalidate(csv_file):
+    """Remove a entrada de cache de um CSV (chamar apos qualquer escrita)"""
+    try:
+        os.remove(cache_path_for(csv_file))
+    except FileNotFoundError:
+        pass
+
+
+def format_value(value):
+    """Formata um valor tipado como texto no estilo do CSV"""
+    if pd.isna(value):
+        return ''
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(measurement_schema.DATE_FORMAT)
+    if isinstance(value, (float, np.floating)):
+        return np.format_float_positional(value, trim='-')
+    return str(value)
+
+
+def frame_to_records(data):
+    """Converte o DataFrame tipado em linhas de texto (como csv.DictReader)"""
+    columns = list(data.columns)
+    return [
+        {col: format_value(value) for col, value in zip(columns, row)}
+        for row in data.itertuples(index=False, name=None)
+    ]
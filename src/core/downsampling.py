@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reducao visual de series longas antes do desenho
+Uma serie com mais pontos que a largura do eixo em pixels e reduzida por
+LTTB (Largest-Triangle-Three-Buckets) ou por min/max em cada coluna de
+pixels, entao o tempo de desenho depende da resolucao e nao do historico.
+"""
+
+import weakref
+
+import matplotlib.dates as mdates
+import numpy as np
+
+# Metodo padrao: 'lttb' (preserva a forma) ou 'minmax' (preserva picos)
+DEFAULT_METHOD = 'lttb'
+
+# Pontos mantidos por pixel de largura do eixo
+LTTB_POINTS_PER_PIXEL = 1
+MINMAX_POINTS_PER_PIXEL = 2
+
+
+def axis_width_pixels(ax, dpi=None):
+    """Largura do eixo em pixels na resolucao de saida (padrao: DPI da figura)"""
+    fig = ax.get_figure()
+    dpi = dpi or fig.dpi
+    return max(1, int(ax.get_position().width * fig.get_figwidth() * dpi))
+
+
+def _as_float(x):
+    """Eixo x como float64 (datas em nanossegundos)"""
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        return x.astype('datetime64[ns]').astype('int64').astype('float64')
+    return x.astype('float64')
+
+
+def _valid_mask(x, y):
+    mask = ~np.isnan(y)
+    if x.dtype.kind == 'M':
+        mask &= ~np.isnat(x)
+    elif x.dtype.kind == 'f':
+        mask &= ~np.isnan(x)
+    return mask
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices escolhidos pelo Largest-Triangle-Three-Buckets
+
+    Mantem o primeiro e o ultimo ponto e, em cada balde intermediario, o
+    ponto que forma o maior triangulo com o ponto anterior escolhido e a
+    media do proximo balde.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+
+        bucket_x = x[start:stop]
+        bucket_y = y[start:stop]
+        area = np.abs((x[previous] - next_x) * (bucket_y - y[previous])
+                      - (x[previous] - bucket_x) * (next_y - y[previous]))
+        previous = start + int(area.argmax())
+        indices[i + 1] = previous
+
+    return indices
+
+
+def minmax_indices(x, y, buckets):
+    """
+    Indices do minimo e do maximo de cada balde de largura igual em x
+    (um balde por coluna de pixels), mais o primeiro e o ultimo ponto
+    """
+    n = len(y)
+    if 2 * buckets >= n or buckets < 1:
+        return np.arange(n)
+
+    span = x[-1] - x[0]
+    if span <= 0 or np.any(np.diff(x) < 0):
+        # x constante ou fora de ordem: baldes pelo indice
+        bucket = np.arange(n) * buckets // n
+    else:
+        bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+
+    # Ordena por (balde, valor): o primeiro de cada balde e o minimo, o ultimo o maximo
+    order = np.lexsort((y, bucket))
+    sorted_buckets = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    stops = np.r_[starts[1:], n] - 1
+
+    indices = np.concatenate(([0, n - 1], order[starts], order[stops]))
+    return np.unique(indices)
+
+
+def downsample(x, y, width, method=DEFAULT_METHOD):
+    """
+    Reduz a serie para a largura do eixo
+
+    Args:
+        x: Datas ou valores do eixo x (na ordem de desenho)
+        y: Valores da serie
+        width (int): Largura do eixo em pixels
+        method (str): 'lttb' ou 'minmax'
+
+    Returns:
+        tuple: (x, y) reduzidos, nos tipos originais (sem valores ausentes).
+            Series que ja cabem na largura sao devolvidas sem alteracao.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype='float64')
+    limit = width * (MINMAX_POINTS_PER_PIXEL if method == 'minmax' else LTTB_POINTS_PER_PIXEL)
+    if len(y) <= limit:
+        return x, y
+
+    mask = _valid_mask(x, y)
+    if not mask.all():
+        x, y = x[mask], y[mask]
+    x_values = _as_float(x)
+
+    if method == 'minmax':
+        indices = minmax_indices(x_values, y, width)
+    elif method == 'lttb':
+        indices = lttb_indices(x_values, y, limit)
+    else:
+        raise ValueError(f"Metodo de reducao desconhecido: {method}")
+    return x[indices], y[indices]
+
+
+def is_sparse(count, ax, markersize):
+    """Indica se ha espaco para desenhar um marcador por ponto sem sobreposicao"""
+    width_points = ax.get_position().width * ax.get_figure().get_figwidth() * 72
+    return count <= 1 or width_points / count >= markersize
+
+
+def series_for_axis(ax, x, y, dpi=None, method=DEFAULT_METHOD, markersize=8):
+    """
+    Serie reduzida para a largura do eixo
+
+    Returns:
+        tuple: (x, y, esparsa) - esparsa indica se cabem marcadores
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    count = len(y)
+    x, y = downsample(x, y, axis_width_pixels(ax, dpi), method)
+    return x, y, is_sparse(count, ax, markersize)
+
+
+def visible_range(positions, lo, hi):
+    """
+    Trecho [inicio, fim) de positions (ordenado) entre lo e hi, por busca
+    binaria, com um ponto vizinho de cada lado para a linha chegar as bordas
+    """
+    start = max(0, int(np.searchsorted(positions, lo, side='left')) - 1)
+    stop = min(len(positions), int(np.searchsorted(positions, hi, side='right')) + 1)
+    return start, stop
+
+
+# Linha -> VisibleRange (some junto com a linha)
+_visible_ranges = weakref.WeakKeyDictionary()
+
+
+class VisibleRange:
+    """
+    Nivel de detalhe de uma linha conforme o zoom
+
+    A cada mudanca dos limites de x (zoom, arraste, voltar ao inicio), o
+    trecho visivel e localizado na serie por busca binaria e reduzido para a
+    largura do eixo: o detalhe completo (e os marcadores) so aparece quando
+    o trecho visivel cabe na largura. Series fora de ordem de data nao sao
+    reamostradas (ficam como em plot_series).
+    """
+
+    def __init__(self, line, x, y, marker='o', dpi=None, method=DEFAULT_METHOD):
+        self._line = weakref.ref(line)
+        self.marker = marker
+        self.dpi = dpi
+        self.method = method
+        self.set_series(x, y)
+        _visible_ranges[line] = self
+        line.axes.callbacks.connect('xlim_changed', self.on_xlim_changed)
+
+    def set_series(self, x, y):
+        """Troca a serie completa (dados recarregados)"""
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        positions = mdates.date2num(self.x) if self.x.dtype.kind == 'M' else self.x.astype('float64')
+        self.positions = positions if np.all(np.diff(positions) >= 0) else None
+
+    def on_xlim_changed(self, ax):
+        line = self._line()
+        if line is None or self.positions is None:
+            return
+        start, stop = visible_range(self.positions, *ax.get_xlim())
+        x, y, sparse = series_for_axis(ax, self.x[start:stop], self.y[start:stop],
+                                       self.dpi, self.method, line.get_markersize())
+        line.set_data(x, y)
+        line.set_marker(self.marker if sparse else 'None')
+
+
+def reset_view(ax):
+    """
+    Volta o eixo a mostrar a serie inteira: reativa o autoscale (desligado
+    pelo zoom/arraste da barra de navegacao) e recalcula os limites com os
+    dados atuais. As linhas com VisibleRange sao reamostradas para o novo
+    trecho visivel.
+    """
+    ax.set_autoscale_on(True)
+    ax.relim()
+    ax.autoscale_view()
+
+
+def plot_series(ax, x, y, dpi=None, method=DEFAULT_METHOD, marker='o', markersize=8,
+                level_of_detail=False, **kwargs):
+    """
+    ax.plot com reducao para a largura do eixo e marcadores so em series esparsas
+
+    Args:
+        ax: Eixo do matplotlib
+        x, y: Serie completa
+        dpi (int): Resolucao de saida (padrao: DPI da figura)
+        method (str): 'lttb' ou 'minmax'
+        level_of_detail (bool): Reamostra o trecho visivel a cada zoom
+            (VisibleRange), para graficos interativos
+        marker, markersize, **kwargs: Repassados para ax.plot
+    """
+    shown_x, shown_y, sparse = series_for_axis(ax, x, y, dpi, method, markersize)
+    lines = ax.plot(shown_x, shown_y, marker=marker if sparse else None, markersize=markersize, **kwargs)
+    if level_of_detail:
+        VisibleRange(lines[0], x, y, marker, dpi, method)
+    return lines
+
+
+def update_series(line, x, y, marker='o', dpi=None, method=DEFAULT_METHOD):
+    """
+    Troca os dados de uma linha ja desenhada (set_data), com a mesma reducao
+    de plot_series. Os limites do eixo devem ser recalculados depois
+    (reset_view).
+    """
+    tracked = _visible_ranges.get(line)
+    if tracked is not None:
+        tracked.set_series(x, y)
+    x, y, sparse = series_for_axis(line.axes, x, y, dpi, method, line.get_markersize())
+    line.set_data(x, y)
+    line.set_marker(marker if sparse else 'None')
+    return line
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool limitado de figuras do pyplot para processos de longa duracao
+As figuras sao limpas e reaproveitadas em vez de criadas a cada grafico,
+entao um lote com milhares de pacientes usa memoria constante.
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+
+import matplotlib.pyplot as plt
+
+# Figuras mantidas no pool (um grafico usa uma figura por vez)
+DEFAULT_MAX_FIGURES = 2
+
+
+def process_memory():
+    """Memoria residente do processo em bytes (None se indisponivel)"""
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Sem /proc: usa o pico (maxrss), em bytes no macOS e em KB nos demais
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class FigurePool:
+    """
+    Figuras do pyplot reaproveitadas entre graficos
+
+    acquire() devolve uma figura limpa (e a torna a figura atual do pyplot,
+    para plt.gca()/plt.text); release() a limpa e devolve ao pool. Figuras
+    alem do limite sao fechadas ao serem liberadas.
+    """
+
+    def __init__(self, max_figures=DEFAULT_MAX_FIGURES):
+        self.max_figures = max_figures
+        self._free = []
+        self._in_use = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, figsize=None):
+        """Figura limpa com o tamanho pedido, ja ativa no pyplot"""
+        fig = None
+        while self._free:
+            candidate = self._free.pop()
+            # A janela pode ter sido fechada pelo usuario (plt.show)
+            if plt.fignum_exists(candidate.number):
+                fig = candidate
+                break
+
+        if fig is None:
+            fig = plt.figure(figsize=figsize)
+            self.created += 1
+        else:
+            plt.figure(fig.number)
+            if figsize is not None:
+                fig.set_size_inches(figsize, forward=True)
+            self.reused += 1
+
+        self._in_use.append(fig)
+        return fig
+
+    def release(self, fig):
+        """Limpa a figura e a devolve ao pool (ou a fecha, se o pool estiver cheio)"""
+        if fig in self._in_use:
+            self._in_use.remove(fig)
+        if fig in self._free:
+            return
+
+        if len(self._free) < self.max_figures and plt.fignum_exists(fig.number):
+            fig.clear()
+            self._free.append(fig)
+        else:
+            plt.close(fig)
+
+    def release_all(self):
+        """Libera as figuras ainda em uso (ex.: grafico interrompido por erro)"""
+        for fig in list(self._in_use):
+            self.release(fig)
+
+    def close(self):
+        """Fecha todas as figuras do pool"""
+        self.release_all()
+        for fig in self._free:
+            plt.close(fig)
+        self._free = []
+
+    @contextmanager
+    def figure(self, figsize=None):
+        """with pool.figure(...) as fig: garante a liberacao da figura"""
+        fig = self.acquire(figsize)
+        try:
+            yield fig
+        finally:
+            self.release(fig)
+
+    def stats(self):
+        """Figuras vivas no pyplot, estado do pool e memoria do processo"""
+        return {
+            'live_figures': len(plt.get_fignums()),
+            'pooled': len(self._free),
+            'in_use': len(self._in_use),
+            'created': self.created,
+            'reused': self.reused,
+            'memory': process_memory(),
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        memory = f"{stats['memory'] / 1024 / 1024:.1f} MB" if stats['memory'] else '-'
+        return (f"{stats['live_figures']} figuras abertas ({stats['created']} criadas, "
+                f"{stats['reused']} reaproveitadas), memoria: {memory}")
+
+
+_default_pool = None
+
+
+def default_pool():
+    """Pool compartilhado pelo processo"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = FigurePool()
+    return _default_pool
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dashboard interativo em um unico arquivo HTML
+As medicoes vao embutidas de forma compacta (datas como deltas Int32 e
+valores Float32, em base64) e um pequeno renderizador em JavaScript desenha
+os mesmos paineis do dashboard completo em <canvas>, com zoom e arraste,
+sem acesso a rede.
+"""
+
+import base64
+import html
+import json
+import os
+
+import numpy as np
+
+import chart_specs
+
+# Paineis do dashboard: (metrica, titulo, unidade, cor) - os mesmos de
+# BioimpedanceAnalyzer.create_comprehensive_dashboard
+DASHBOARD_PANELS = [
+    ('weight', 'Peso (kg)', 'kg', '#2E86AB'),
+    ('bmi', 'IMC', '', '#8E44AD'),
+    ('fat_pct', 'Gordura (%)', '%', '#E74C3C'),
+    ('muscle_pct', 'Massa Muscular (%)', '%', '#27AE60'),
+]
+
+
+def _b64(array):
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def encode_dates(dates):
+    """
+    Datas em formato compacto: segundos desde 1970, o primeiro em 'start' e
+    os demais como diferencas Int32 (little-endian)
+    """
+    seconds = np.asarray(dates).astype('datetime64[s]').astype('int64')
+    deltas = np.diff(seconds, prepend=seconds[:1])
+    return {'start': int(seconds[0]), 'count': len(seconds), 'deltas': _b64(deltas.astype('<i4'))}
+
+
+def dashboard_payload(spec, title):
+    """
+    Dados embutidos no HTML: paineis com os valores (Float32) e as
+    estatisticas, e os eixos de datas, compartilhados entre os paineis
+    com as mesmas datas (metricas sem valores ausentes)
+
+    O renderizador busca o trecho visivel por busca binaria, entao cada
+    serie vai em ordem crescente de data (ordenacao estavel: medicoes do
+    mesmo instante mantem a ordem do arquivo).
+    """
+    panels = []
+    axes = []
+    encoded = []
+    for metric, panel_title, unit, color in DASHBOARD_PANELS:
+        series = spec.series(metric)
+        if series is None or len(series) == 0:
+            continue
+        dates = np.asarray(series.dates)
+        values = np.asarray(series.values)
+        if np.any(dates[1:] < dates[:-1]):
+            order = np.argsort(dates, kind='stable')
+            dates, values = dates[order], values[order]
+        for index, known in enumerate(axes):
+            if known is dates or np.array_equal(known, dates):
+                break
+        else:
+            index = len(axes)
+            axes.append(dates)
+            encoded.append(encode_dates(dates))
+        panels.append({'title': panel_title, 'unit': unit, 'color': color,
+                       'first': float(series.first), 'last': float(series.last),
+                       'change': float(series.change), 'axis': index,
+                       'values': _b64(values.astype('<f4'))})
+    return {'title': title, 'axes': encoded, 'panels': panels}
+
+
+def write_dashboard(data, columns, path, title='Dashboard de Composicao Corporal', archive=None):
+    """
+    Grava o dashboard interativo em um unico arquivo HTML
+
+    Args:
+        data (pd.DataFrame): Medicoes tipadas
+        columns (dict): Metrica -> coluna (measurement_schema.resolve_columns)
+        path (str): Arquivo .html de saida
+        title (str): Titulo da pagina
+        archive (ColumnarArchive): Arquivo colunar dos dados, se houver
+
+    Returns:
+        str: Caminho gravado
+    """
+    spec = chart_specs.dataset_spec(data, columns, archive)
+    payload = json.dumps(dashboard_payload(spec, title), separators=(',', ':'))
+    # '</' nao pode aparecer dentro do <script>
+    payload = payload.replace('</', '<\\/')
+
+    page = _TEMPLATE.replace('__TITLE__', html.escape(title)).replace('__DATA__', payload)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write(page)
+    os.replace(tmp_path, path)
+    return path
+
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+body { font-family: sans-serif; margin: 0; padding: 16px; background: #F8F9FA; color: #2C3E50; }
+h1 { font-size: 22px; margin: 0 0 4px; }
+#ajuda { font-size: 12px; color: #7F8C8D; margin-bottom: 12px; }
+#grade { display: grid; grid-template-columns: repeat(auto-fit, minmax(420px, 1fr)); gap: 12px; }
+.painel { background: #FFF; border-radius: 8px; padding: 8px 8px 4px; box-shadow: 0 1px 3px rgba(0,0,0,.1); }
+.painel h2 { font-size: 15px; margin: 2px 4px 0; }
+.painel .resumo { font-size: 12px; color: #7F8C8D; margin: 0 4px 4px; min-height: 15px; }
+canvas { width: 100%; height: 280px; display: block; cursor: crosshair; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div id="ajuda">Roda do mouse: zoom &middot; arrastar: mover &middot; duplo clique: restaurar</div>
+<div id="grade"></div>
+<script id="dados" type="application/json">__DATA__</script>
+<script>
+(function () {
+  'use strict';
+  var DATA = JSON.parse(document.getElementById('dados').textContent);
+  var PAD = {left: 52, right: 12, top: 10, bottom: 28};
+
+  function decode(b64, Type) {
+    var bin = atob(b64), bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+
+  function fmtDate(ms) {
+    var d = new Date(ms);
+    return ('0' + d.getUTCDate()).slice(-2) + '/' + ('0' + (d.getUTCMonth() + 1)).slice(-2) + '/' + d.getUTCFullYear();
+  }
+
+  function fmt(v) { return Math.abs(v) >= 100 ? v.toFixed(0) : v.toFixed(1); }
+
+  function niceTicks(lo, hi, n) {
+    var step = Math.pow(10, Math.floor(Math.log10((hi - lo) / n || 1)));
+    var err = (hi - lo) / n / step;
+    step *= err >= 5 ? 10 : err >= 2 ? 5 : err >= 1 ? 2 : 1;
+    var ticks = [];
+    for (var v = Math.ceil(lo / step) * step; v <= hi + 1e-9; v += step) ticks.push(v);
+    return ticks;
+  }
+
+  // Primeiro indice com t[i] >= x
+  function lowerBound(t, x) {
+    var lo = 0, hi = t.length;
+    while (lo < hi) { var mid = (lo + hi) >> 1; if (t[mid] < x) lo = mid + 1; else hi = mid; }
+    return lo;
+  }
+
+  // Datas em milissegundos, reconstruidas a partir das diferencas
+  var axes = DATA.axes.map(function (a) {
+    var deltas = decode(a.deltas, Int32Array), t = new Float64Array(a.count), acc = a.start;
+    for (var i = 0; i < a.count; i++) { acc += deltas[i]; t[i] = acc * 1000; }
+    return t;
+  });
+
+  var panels = DATA.panels.map(function (p) {
+    p.t = axes[p.axis];
+    p.v = decode(p.values, Float32Array);
+    p.count = p.v.length;
+    return p;
+  });
+
+  var full = [Infinity, -Infinity];
+  panels.forEach(function (p) {
+    if (p.count) { full[0] = Math.min(full[0], p.t[0]); full[1] = Math.max(full[1], p.t[p.count - 1]); }
+  });
+  if (full[0] === full[1]) { full[0] -= 86400000; full[1] += 86400000; }
+  var view = full.slice();
+
+  var grid = document.getElementById('grade');
+  panels.forEach(function (p) {
+    var box = document.createElement('div');
+    box.className = 'painel';
+    box.innerHTML = '<h2></h2><div class="resumo"></div>';
+    box.querySelector('h2').textContent = p.title;
+    p.summary = box.querySelector('.resumo');
+    p.defaultSummary = 'Inicial: ' + fmt(p.first) + ' ' + p.unit + ' \\u00b7 Atual: ' + fmt(p.last) + ' ' + p.unit +
+      ' \\u00b7 Mudan\\u00e7a: ' + (p.change >= 0 ? '+' : '') + fmt(p.change) + ' ' + p.unit;
+    p.summary.textContent = p.defaultSummary;
+    p.canvas = document.createElement('canvas');
+    box.appendChild(p.canvas);
+    grid.appendChild(box);
+    attach(p);
+  });
+
+  function draw(p, hover) {
+    var c = p.canvas, ratio = window.devicePixelRatio || 1;
+    var w = c.clientWidth, h = c.clientHeight;
+    if (c.width !== Math.round(w * ratio)) { c.width = Math.round(w * ratio); c.height = Math.round(h * ratio); }
+    var ctx = c.getContext('2d');
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, w, h);
+    var pw = w - PAD.left - PAD.right, ph = h - PAD.top - PAD.bottom;
+
+    // Pontos visiveis (mais um de cada lado, para a linha chegar na borda)
+    var i0 = Math.max(0, lowerBound(p.t, view[0]) - 1), i1 = Math.min(p.count, lowerBound(p.t, view[1]) + 1);
+    var lo = Infinity, hi = -Infinity;
+    for (var i = i0; i < i1; i++) { if (p.v[i] < lo) lo = p.v[i]; if (p.v[i] > hi) hi = p.v[i]; }
+    if (!isFinite(lo)) { lo = 0; hi = 1; }
+    var margin = (hi - lo) * 0.08 || 1; lo -= margin; hi += margin;
+
+    function X(t) { return PAD.left + (t - view[0]) / (view[1] - view[0]) * pw; }
+    function Y(v) { return PAD.top + (hi - v) / (hi - lo) * ph; }
+
+    // Grade e eixos
+    ctx.font = '11px sans-serif';
+    ctx.strokeStyle = '#ECF0F1'; ctx.fillStyle = '#7F8C8D'; ctx.lineWidth = 1;
+    ctx.textAlign = 'right'; ctx.textBaseline = 'middle';
+    niceTicks(lo, hi, 5).forEach(function (v) {
+      var y = Math.round(Y(v)) + 0.5;
+      ctx.beginPath(); ctx.moveTo(PAD.left, y); ctx.lineTo(PAD.left + pw, y); ctx.stroke();
+      ctx.fillText(fmt(v), PAD.left - 6, y);
+    });
+    ctx.textAlign = 'center'; ctx.textBaseline = 'top';
+    var labels = Math.max(2, Math.floor(pw / 110));
+    for (var k = 0; k <= labels; k++) {
+      var tt = view[0] + (view[1] - view[0]) * k / labels, x = Math.round(X(tt)) + 0.5;
+      ctx.beginPath(); ctx.moveTo(x, PAD.top); ctx.lineTo(x, PAD.top + ph); ctx.stroke();
+      ctx.fillText(fmtDate(tt), Math.min(Math.max(x, PAD.left + 30), PAD.left + pw - 30), PAD.top + ph + 6);
+    }
+
+    ctx.save();
+    ctx.beginPath(); ctx.rect(PAD.left, PAD.top, pw, ph); ctx.clip();
+    ctx.strokeStyle = p.color; ctx.fillStyle = p.color; ctx.lineWidth = 2; ctx.lineJoin = 'round';
+    ctx.beginPath();
+    var count = i1 - i0;
+    if (count > pw * 2) {
+      // Serie densa: minimo e maximo de cada coluna de pixels
+      var col = -1, mn = 0, mx = 0, first = true;
+      for (var j = i0; j < i1; j++) {
+        var cx = Math.floor(X(p.t[j]));
+        if (cx !== col) {
+          if (col >= 0) { ctx.lineTo(col, Y(mn)); ctx.lineTo(col, Y(mx)); }
+          col = cx; mn = mx = p.v[j];
+          if (first) { ctx.moveTo(cx, Y(p.v[j])); first = false; }
+        } else { if (p.v[j] < mn) mn = p.v[j]; if (p.v[j] > mx) mx = p.v[j]; }
+      }
+      if (col >= 0) { ctx.lineTo(col, Y(mn)); ctx.lineTo(col, Y(mx)); }
+      ctx.stroke();
+    } else {
+      for (var m = i0; m < i1; m++) { if (m === i0) ctx.moveTo(X(p.t[m]), Y(p.v[m])); else ctx.lineTo(X(p.t[m]), Y(p.v[m])); }
+      ctx.stroke();
+      // Marcadores so quando os pontos estao espacados
+      if (count <= 1 || pw / count >= 8) {
+        for (var n = i0; n < i1; n++) { ctx.beginPath(); ctx.arc(X(p.t[n]), Y(p.v[n]), 3, 0, 2 * Math.PI); ctx.fill(); }
+      }
+    }
+    if (hover !== undefined) {
+      var hx = X(p.t[hover]), hy = Y(p.v[hover]);
+      ctx.strokeStyle = '#95A5A6'; ctx.lineWidth = 1;
+      ctx.beginPath(); ctx.moveTo(hx, PAD.top); ctx.lineTo(hx, PAD.top + ph); ctx.stroke();
+      ctx.fillStyle = '#FFF'; ctx.strokeStyle = p.color; ctx.lineWidth = 2;
+      ctx.beginPath(); ctx.arc(hx, hy, 4.5, 0, 2 * Math.PI); ctx.fill(); ctx.stroke();
+    }
+    ctx.restore();
+    p.toTime = function (px) { return view[0] + (px - PAD.left) / pw * (view[1] - view[0]); };
+  }
+
+  function drawAll() { panels.forEach(function (p) { draw(p); }); }
+
+  function attach(p) {
+    var c = p.canvas, drag = null;
+    c.addEventListener('wheel', function (e) {
+      e.preventDefault();
+      var at = p.toTime(e.offsetX), scale = e.deltaY > 0 ? 1.25 : 0.8;
+      var span = Math.min(full[1] - full[0], Math.max(3600000, (view[1] - view[0]) * scale));
+      var left = at - (at - view[0]) / (view[1] - view[0]) * span;
+      view = [Math.max(full[0], left), 0];
+      view[1] = Math.min(full[1], view[0] + span);
+      view[0] = view[1] - span;
+      drawAll();
+    }, {passive: false});
+    c.addEventListener('mousedown', function (e) { drag = {x: e.offsetX, view: view.slice()}; });
+    window.addEventListener('mouseup', function () { drag = null; });
+    c.addEventListener('mousemove', function (e) {
+      if (drag) {
+        var span = drag.view[1] - drag.view[0];
+        var shift = (drag.x - e.offsetX) / (c.clientWidth - PAD.left - PAD.right) * span;
+        var start = Math.min(Math.max(full[0], drag.view[0] + shift), full[1] - span);
+        view = [start, start + span];
+        drawAll();
+        return;
+      }
+      if (!p.count) return;
+      var i = Math.min(lowerBound(p.t, p.toTime(e.offsetX)), p.count - 1);
+      if (i > 0 && p.toTime(e.offsetX) - p.t[i - 1] < p.t[i] - p.toTime(e.offsetX)) i--;
+      p.summary.textContent = fmtDate(p.t[i]) + ': ' + fmt(p.v[i]) + ' ' + p.unit;
+      draw(p, i);
+    });
+    c.addEventListener('mouseleave', function () { p.summary.textContent = p.defaultSummary; draw(p); });
+    c.addEventListener('dblclick', function () { view = full.slice(); drawAll(); });
+  }
+
+  window.addEventListener('resize', drawAll);
+  drawAll();
+})();
+</script>
+</body>
+</html>
+"""
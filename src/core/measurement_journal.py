@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Diario de alteracoes do CSV de medicoes
+Edicoes e exclusoes sao anexadas a um arquivo ao lado do CSV base, em vez
+de reescrever o arquivo inteiro; os leitores aplicam o diario ao carregar
+"""
+
+import json
+import os
+
+import pandas as pd
+
+import measurement_schema
+
+
+class MeasurementJournal:
+    """
+    Diario de alteracoes (uma entrada JSON por linha) de um CSV base
+
+    As chaves sao as posicoes das linhas no CSV base (0 = primeira medicao).
+    Elas so mudam quando o diario e compactado em um novo arquivo base.
+    """
+
+    SUFFIX = '.journal'
+
+    def __init__(self, csv_file):
+        self.csv_file = csv_file
+        self.path = csv_file + self.SUFFIX
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def size(self):
+        """Tamanho do diario em bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def _append(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def record_update(self, key, record):
+        """Registra a substituicao da linha key"""
+        self._append({'op': 'update', 'key': int(key), 'record': record})
+
+    def record_delete(self, key):
+        """Registra a exclusao da linha key"""
+        self._append({'op': 'delete', 'key': int(key)})
+
+    def entries(self, limit=None):
+        """Le as entradas do diario (as primeiras limit, se informado)"""
+        if not self.exists():
+            return []
+        entries = []
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if limit is not None and len(entries) >= limit:
+                    break
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+        return entries
+
+    def read_from(self, offset=0):
+        """
+        Le as entradas completas a partir de um deslocamento em bytes
+
+        Returns:
+            tuple: (entradas, deslocamento apos a ultima linha completa)
+        """
+        if not self.exists():
+            return [], 0
+        with open(self.path, 'rb') as file:
+            file.seek(offset)
+            content = file.read()
+        end = content.rfind(b'\n') + 1
+        entries = [json.loads(line) for line in content[:end].decode('utf-8').splitlines() if line.strip()]
+        return entries, offset + end
+
+    def write_entries(self, entries):
+        """Substitui o conteudo do diario (usado na compactacao)"""
+        if not entries:
+            self.clear()
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            for entry in entries:
+                file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def deleted_keys(self, entries=None):
+        """Chaves cujo estado final no diario e excluida"""
+        if entries is None:
+            entries = self.entries()
+        final = {}
+        for entry in entries:
+            final[entry['key']] = entry['op']
+        return {key for key, op in final.items() if op == 'delete'}
+
+    def apply(self, data, entries=None):
+        """
+        Aplica o diario a um DataFrame indexado pelas chaves do CSV base
+
+        Funciona tambem com um bloco parcial (modo streaming): entradas de
+        chaves fora do bloco sao ignoradas.
+        """
+        if entries is None:
+            entries = self.entries()
+        if not entries:
+            return data
+
+        # Estado final de cada chave: registro novo ou None (excluida)
+        final = {}
+        for entry in entries:
+            final[entry['key']] = entry.get('record') if entry['op'] == 'update' else None
+
+        present = [key for key in final if key in data.index]
+        if not present:
+            return data
+
+        updates = {key: final[key] for key in present if final[key] is not None}
+        deleted = [key for key in present if final[key] is None]
+
+        if updates:
+            changed = pd.DataFrame.from_dict(updates, orient='index')
+            changed = changed.rename(columns=measurement_schema.canonical_name)
+            columns = [col for col in data.columns if measurement_schema.canonical_name(col) in changed.columns]
+            changed = changed[[measurement_schema.canonical_name(col) for col in columns]]
+            changed.columns = columns
+            changed = measurement_schema.coerce_types(changed)
+            data = data.copy()
+            for col in columns:
+                data.loc[changed.index, col] = changed[col].astype(data[col].dtype)
+
+        if deleted:
+            data = data.drop(index=deleted)
+
+        return data
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Esquema declarado dos arquivos de medicoes de bioimpedancia
+Tipos, formato de data e nomes alternativos aceitos para cada coluna
+"""
+
+import pandas as pd
+
+import compressed_io
+
+# Coluna de data e formato usado pela balanca / pela entrada de dados
+DATE_COLUMN = 'data'
+DATE_FORMAT = '%Y-%m-%d'
+
+# Tipos das colunas numericas (nomes canonicos, como gravados pelas interfaces)
+COLUMN_DTYPES = {
+    'peso': 'float64',
+    'imc': 'float64',
+    'Gordura/porcento': 'float64',
+    'Gordura/KG': 'float64',
+    'Massa Musucular/porcento': 'float64',
+    'Massa Muscular/KG': 'float64',
+    'Metabolismo': 'float64',
+    'Obesidade/porcento': 'float64',
+}
+
+# Colunas gravadas pelas interfaces, na ordem do arquivo
+FIELD_NAMES = [DATE_COLUMN] + list(COLUMN_DTYPES)
+
+# Nomes alternativos encontrados em exportacoes antigas -> nome canonico
+COLUMN_ALIASES = {
+    'Gordura/%': 'Gordura/porcento',
+    'Massa Musucular/%': 'Massa Musucular/porcento',
+    'Massa Muscular/%': 'Massa Musucular/porcento',
+    'Massa Muscular/porcento': 'Massa Musucular/porcento',
+    'Obesidade/%': 'Obesidade/porcento',
+}
+
+# Todas as colunas numericas aceitas (canonicas e alternativas)
+NUMERIC_COLUMNS = list(COLUMN_DTYPES) + list(COLUMN_ALIASES)
+
+# Motor padrao do read_csv ('c' ou 'pyarrow')
+DEFAULT_ENGINE = 'c'
+
+# Tipos do modo compacto: as leituras da balanca tem no maximo uma casa
+# decimal, entao float32 (7 digitos significativos) preserva os valores
+COMPACT_DTYPES = {col: 'float32' for col in COLUMN_DTYPES}
+
+# Resolucao das datas no modo compacto (a menor suportada pelo pandas)
+COMPACT_DATE_DTYPE = 'datetime64[s]'
+
+# Colunas de texto (aparelho, paciente...) com ate esta fracao de valores
+# distintos viram categoricas no modo compacto
+CATEGORY_MAX_RATIO = 0.5
+
+# Metricas logicas -> nome canonico da coluna
+METRIC_COLUMNS = {
+    'weight': 'peso',
+    'bmi': 'imc',
+    'fat_pct': 'Gordura/porcento',
+    'fat_kg': 'Gordura/KG',
+    'muscle_pct': 'Massa Musucular/porcento',
+    'muscle_kg': 'Massa Muscular/KG',
+    'bmr': 'Metabolismo',
+    'obesity_pct': 'Obesidade/porcento',
+}
+
+# Regras para variantes fora de COLUMN_ALIASES: (metrica, termos, unidades)
+METRIC_PATTERNS = [
+    ('fat_pct', ('gordura',), ('%', 'porcento')),
+    ('fat_kg', ('gordura',), ('kg',)),
+    ('muscle_pct', ('massa musucular', 'massa muscular'), ('%', 'porcento')),
+    ('muscle_kg', ('massa musucular', 'massa muscular'), ('kg',)),
+    ('obesity_pct', ('obesidade',), ('%', 'porcento')),
+]
+
+
+def canonical_name(column):
+    """Retorna o nome canonico de uma coluna (ou o proprio nome)"""
+    return COLUMN_ALIASES.get(column, column)
+
+
+def resolve_columns(columns):
+    """
+    Mapeia cada metrica logica para a coluna fisica do arquivo
+
+    Feito uma vez no carregamento; graficos e relatorios consultam o
+    resultado em vez de procurar as colunas pelo nome.
+
+    Returns:
+        dict: metrica (chave de METRIC_COLUMNS) -> coluna, ou None se ausente
+    """
+    by_canonical = {}
+    for col in columns:
+        by_canonical.setdefault(canonical_name(col), col)
+
+    resolved = {metric: by_canonical.get(name) for metric, name in METRIC_COLUMNS.items()}
+
+    # Variantes desconhecidas (ex.: 'Gordura (%)'): primeira coluna compativel
+    used = set(resolved.values())
+    for metric, terms, units in METRIC_PATTERNS:
+        if resolved[metric] is not None:
+            continue
+        for col in columns:
+            name = str(col).lower()
+            if col not in used and any(t in name for t in terms) and any(u in name for u in units):
+                resolved[metric] = col
+                used.add(col)
+                break
+
+    return resolved
+
+
+def dtypes_for(columns):
+    """Monta o mapa de tipos para as colunas presentes no arquivo"""
+    dtypes = {}
+    for col in columns:
+        dtype = COLUMN_DTYPES.get(canonical_name(col))
+        if dtype is not None:
+            dtypes[col] = dtype
+    return dtypes
+
+
+def pyarrow_available():
+    """Verifica se o pyarrow esta instalado"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def read_header(csv_file):
+    """Le apenas o cabecalho do CSV"""
+    compression = compressed_io.read_csv_compression(csv_file)
+    columns = list(pd.read_csv(csv_file, nrows=0, compression=compression).columns)
+    _rewind(csv_file)
+    return columns
+
+
+def _rewind(csv_file):
+    """Volta ao inicio quando a origem e um arquivo aberto (ex.: BytesIO)"""
+    if hasattr(csv_file, 'seek'):
+        csv_file.seek(0)
+
+
+def coerce_types(data):
+    """Converte coluna a coluna (caminho lento, para arquivos com valores invalidos)"""
+    if DATE_COLUMN in data.columns and not pd.api.types.is_datetime64_any_dtype(data[DATE_COLUMN]):
+        data[DATE_COLUMN] = pd.to_datetime(data[DATE_COLUMN])
+
+    for col, dtype in dtypes_for(data.columns).items():
+        if data[col].dtype != dtype:
+            data[col] = pd.to_numeric(data[col], errors='coerce').astype(dtype)
+
+    return data
+
+
+def compact_types(data):
+    """
+    Converte um DataFrame para os tipos compactos do esquema
+
+    Returns:
+        tuple: (DataFrame compacto, bytes antes, bytes depois), medidos com
+        memory_usage(deep=True)
+    """
+    before = int(data.memory_usage(deep=True).sum())
+
+    columns = {}
+    for col in data.columns:
+        series = data[col]
+        dtype = COMPACT_DTYPES.get(canonical_name(col))
+        if dtype is not None:
+            series = series.astype(dtype)
+        elif col == DATE_COLUMN and pd.api.types.is_datetime64_any_dtype(series):
+            series = series.astype(COMPACT_DATE_DTYPE)
+        elif (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)) \
+                and len(series) and series.nunique() <= CATEGORY_MAX_RATIO * len(series):
+            series = series.astype('category')
+        columns[col] = series
+
+    compact = pd.DataFrame(columns, index=data.index)
+    after = int(compact.memory_usage(deep=True).sum())
+    return compact, before, after
+
+
+def format_memory(before, after):
+    """Texto com a memoria antes/depois do modo compacto"""
+    saved = 1 - after / before if before else 0
+    unit, scale = ('MB', 1e6) if before >= 1e6 else ('KB', 1e3)
+    return f"{before / scale:.2f} {unit} -> {after / scale:.2f} {unit} ({saved:.0%} a menos)"
+
+
+def _read_pyarrow(csv_file, columns):
+    """Leitura multi-thread com pyarrow.csv, tipos declarados na conversao"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    column_types = {col: pa.from_numpy_dtype(dtype) for col, dtype in dtypes_for(columns).items()}
+    if DATE_COLUMN in columns:
+        column_types[DATE_COLUMN] = pa.timestamp('s')
+
+    convert_options = pa_csv.ConvertOptions(column_types=column_types,
+                                            timestamp_parsers=[DATE_FORMAT])
+    if compressed_io.read_csv_compression(csv_file):
+        # Descompressao em fluxo (o pyarrow so reconhece a extensao)
+        with compressed_io.open_binary(csv_file, 'rb') as source:
+            table = pa_csv.read_csv(source, convert_options=convert_options)
+    else:
+        table = pa_csv.read_csv(csv_file, convert_options=convert_options)
+    return table.to_pandas()
+
+
+def read_measurements(csv_file, engine=None):
+    """
+    Le o CSV aplicando o esquema em uma unica passada
+
+    Tipos e datas sao convertidos durante a leitura (dtype/parse_dates/
+    date_format), sem colunas intermediarias de texto. Se o arquivo tiver
+    valores invalidos, cai para a conversao coluna a coluna com
+    errors='coerce' (mesmo comportamento de antes).
+
+    Args:
+        csv_file (str): Caminho para o arquivo CSV
+        engine (str): 'c' ou 'pyarrow' (multi-thread, se instalado)
+
+    Arquivos comprimidos (gzip, bz2, xz, zstd) sao descomprimidos em fluxo.
+
+    Returns:
+        pd.DataFrame: Dados tipados
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine == 'pyarrow' and not pyarrow_available():
+        engine = 'c'
+
+    columns = read_header(csv_file)
+    compression = compressed_io.read_csv_compression(csv_file)
+
+    try:
+        if engine == 'pyarrow':
+            data = _read_pyarrow(csv_file, columns)
+        else:
+            parse_dates = [DATE_COLUMN] if DATE_COLUMN in columns else False
+            data = pd.read_csv(csv_file, dtype=dtypes_for(columns), compression=compression,
+                               parse_dates=parse_dates, date_format=DATE_FORMAT)
+    except Exception:
+        # Valores invalidos no arquivo: conversao tolerante, coluna a coluna
+        _rewind(csv_file)
+        data = pd.read_csv(csv_file, compression=compression)
+
+    return coerce_types(data)
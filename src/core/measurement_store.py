@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento das medicoes de bioimpedancia
+Interface comum com implementacoes em CSV (padrao) e SQLite
+"""
+
+import abc
+import csv
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+
+import pandas as pd
+
+# Adiciona a raiz do projeto ao path (config.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import compressed_io
+import config
+import data_cache
+import measurement_journal
+import measurement_schema
+import tail_reader
+
+FIELD_NAMES = measurement_schema.FIELD_NAMES
+
+
+class MeasurementStore(abc.ABC):
+    """
+    Interface comum dos armazenamentos de medicoes
+
+    As linhas sao identificadas por uma chave inteira, que e o indice do
+    DataFrame devolvido por load_frame() (posicao no CSV, id no SQLite).
+    Os registros recebidos sao dicionarios coluna -> texto, como os
+    formularios das interfaces produzem.
+
+    Os metodos abstratos sao obrigatorios: um armazenamento incompleto
+    falha ao ser criado, e nao no meio de uma edicao.
+    """
+
+    @abc.abstractmethod
+    def exists(self):
+        """Indica se ha dados gravados"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load_frame(self):
+        """Retorna todas as medicoes tipadas"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def add(self, record):
+        """Adiciona uma medicao"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update(self, key, record):
+        """Substitui a medicao identificada por key"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def remove(self, key):
+        """Remove a medicao identificada por key"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self):
+        """Remove todas as medicoes, mantendo a estrutura"""
+        raise NotImplementedError
+
+    def count(self):
+        """Numero de medicoes"""
+        return len(self.load_frame())
+
+    def tail(self, n=1):
+        """Ultimas n medicoes, na ordem de gravacao"""
+        return self.load_frame().tail(n)
+
+    def last_records(self, n=1):
+        """Ultimas n medicoes como registros de texto (para as interfaces)"""
+        return data_cache.frame_to_records(self.tail(n))
+
+    def query_range(self, start=None, end=None):
+        """Medicoes com data entre start e end (inclusive)"""
+        data = self.load_frame()
+        dates = data[measurement_schema.DATE_COLUMN]
+        mask = pd.Series(True, index=data.index)
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates <= pd.Timestamp(end)
+        return data[mask]
+
+    def import_csv(self, csv_file):
+        """Adiciona as medicoes de um CSV no formato das interfaces"""
+        data = measurement_schema.read_measurements(csv_file)
+        for record in data_cache.frame_to_records(data):
+            self.add(_canonical_record(record))
+
+    def export_csv(self, csv_file):
+        """
+        Grava todas as medicoes em um CSV no formato das interfaces
+
+        Extensoes .gz, .bz2, .xz e .zst geram o arquivo comprimido.
+        """
+        data = self.load_frame()
+        with compressed_io.open_text(csv_file, 'w') as file:
+            writer = csv.DictWriter(file, fieldnames=list(data.columns))
+            writer.writeheader()
+            writer.writerows(data_cache.frame_to_records(data))
+
+
+class CsvMeasurementStore(MeasurementStore):
+    """
+    Armazenamento no proprio arquivo CSV
+
+    Novas medicoes sao anexadas ao CSV. Edicoes e exclusoes vao para o
+    diario ao lado do arquivo (MeasurementJournal), entao nao dependem do
+    tamanho do historico. Quando o diario passa de
+    config.JOURNAL_COMPACT_BYTES, uma thread gera um novo CSV base com as
+    alteracoes aplicadas; a troca dos arquivos acontece no proximo
+    load_frame(), que e quando as chaves das linhas sao renumeradas.
+
+    Arquivos comprimidos (.csv.gz etc.) sao sempre relidos por completo,
+    novas medicoes viram um novo bloco comprimido no final do arquivo e o
+    diario nao e compactado.
+    """
+
+    # Tamanho maximo do cabecalho e do trecho final usado como assinatura
+    HEADER_LIMIT = 64 * 1024
+    TAIL_SIGNATURE = 256
+
+    def __init__(self, csv_file, use_cache=True, compact_bytes=None):
+        self.csv_file = csv_file
+        self.use_cache = use_cache
+        self.compact_bytes = compact_bytes or config.JOURNAL_COMPACT_BYTES
+        self.journal = measurement_journal.MeasurementJournal(csv_file)
+        self.compression = compressed_io.detect_compression(csv_file)
+        self._lock = threading.RLock()
+        self._compaction = None
+        self._compacted = None
+        self._reset_state()
+
+    def _reset_state(self):
+        """Esquece o ultimo carregamento (o proximo sera completo)"""
+        self._frame = None
+        self._file_state = None
+        self._base_rows = 0
+        self._journal_offset = 0
+        self._added = set()
+        self._removed = set()
+
+    def exists(self):
+        return os.path.exists(self.csv_file)
+
+    def _read_file_state(self):
+        """Tamanho, mtime e assinaturas do cabecalho e do final do CSV"""
+        stat = os.stat(self.csv_file)
+        with open(self.csv_file, 'rb') as file:
+            header = file.readline(self.HEADER_LIMIT)
+            file.seek(max(0, stat.st_size - self.TAIL_SIGNATURE))
+            tail = file.read(self.TAIL_SIGNATURE)
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'header': header,
+            'tail': tail,
+        }
+
+    def load_frame(self):
+        """
+        Retorna as medicoes com o diario aplicado
+
+        Depois do primeiro carregamento, apenas os bytes anexados ao CSV e
+        as entradas novas do diario sao lidos. O arquivo e relido por
+        completo se foi truncado ou reescrito (tamanho menor, cabecalho ou
+        final anterior diferentes, ou mtime alterado sem crescer).
+
+        O DataFrame devolvido e compartilhado entre as chamadas e nao deve
+        ser alterado no lugar.
+        """
+        with self._lock:
+            self._finish_compaction()
+            if self._frame is None or self.compression or not self._load_incremental():
+                self._load_full()
+            self._added = set()
+            self._removed = set()
+            return self._frame
+
+    def _load_full(self):
+        self._file_state = self._read_file_state()
+        data = data_cache.load_measurements(self.csv_file, use_cache=self.use_cache)
+        self._base_rows = len(data)
+        entries, self._journal_offset = self.journal.read_from(0)
+        self._frame = self.journal.apply(data, entries)
+
+    def _load_incremental(self):
+        """Le so o que mudou desde o ultimo carregamento; False se nao for possivel"""
+        old = self._file_state
+        try:
+            stat = os.stat(self.csv_file)
+        except FileNotFoundError:
+            return False
+
+        if stat.st_size < old['size']:
+            return False
+        if stat.st_size == old['size'] and stat.st_mtime_ns != old['mtime_ns']:
+            return False
+
+        if stat.st_size > old['size']:
+            with open(self.csv_file, 'rb') as file:
+                header = file.readline(self.HEADER_LIMIT)
+                file.seek(max(0, old['size'] - len(old['tail'])))
+                tail = file.read(len(old['tail']))
+                appended = file.read(stat.st_size - old['size'])
+            if header != old['header'] or tail != old['tail'] or not tail.endswith(b'\n'):
+                return False
+
+            # Ignora uma linha final incompleta (gravacao em andamento)
+            appended = appended[:appended.rfind(b'\n') + 1]
+            if appended:
+                # Analisa apenas as linhas novas, com o cabecalho original
+                new_rows = measurement_schema.read_measurements(io.BytesIO(header + appended))
+                new_rows.index = pd.RangeIndex(self._base_rows, self._base_rows + len(new_rows))
+                self._base_rows += len(new_rows)
+                self._frame = pd.concat([self._frame, new_rows])
+
+                size = old['size'] + len(appended)
+                self._file_state = {
+                    'size': size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'header': header,
+                    'tail': (old['tail'] + appended)[-self.TAIL_SIGNATURE:],
+                }
+
+        if self.journal.size() < self._journal_offset:
+            # Diario reescrito (compactacao por outro processo)
+            return False
+        entries, self._journal_offset = self.journal.read_from(self._journal_offset)
+        if entries:
+            self._frame = self.journal.apply(self._frame, entries)
+
+        return True
+
+    def count(self):
+        """
+        Numero de medicoes; sem carregamento anterior, so conta as linhas
+        (ainda assim le o arquivo inteiro: evite em caminhos rapidos)
+        """
+        with self._lock:
+            if self._frame is not None or self._compacted is not None or self.compression:
+                return len(self.load_frame())
+            return tail_reader.count_rows(self.csv_file) - len(self.journal.deleted_keys())
+
+    def last_records(self, n=1):
+        """
+        Ultimas n medicoes, lendo o CSV de tras para frente
+
+        Sem carregamento anterior, le apenas os ultimos blocos do arquivo.
+        Se houver diario, as linhas sao contadas para obter as chaves
+        (posicoes) e aplicar as alteracoes.
+        """
+        with self._lock:
+            if self._frame is not None or self._compacted is not None or self.compression:
+                return super().last_records(n)
+
+            entries = self.journal.entries()
+            if entries:
+                deleted = self.journal.deleted_keys(entries)
+                total = tail_reader.count_rows(self.csv_file)
+                data = tail_reader.read_tail(self.csv_file, n + len(deleted))
+                data.index = pd.RangeIndex(total - len(data), total)
+                data = self.journal.apply(data, entries).tail(n)
+            else:
+                data = tail_reader.read_tail(self.csv_file, n)
+            return data_cache.frame_to_records(data)
+
+    def _check_key(self, key):
+        """Valida a chave contra o ultimo carregamento (sem reler o arquivo)"""
+        if self._frame is None:
+            self.load_frame()
+        known = key in self._frame.index or key in self._added
+        if not known or key in self._removed:
+            raise IndexError("Índice de linha inválido")
+
+    def add(self, record):
+        with self._lock:
+            file_exists = os.path.exists(self.csv_file)
+            with compressed_io.open_text(self.csv_file, 'a', self.compression) as file:
+                writer = csv.DictWriter(file, fieldnames=record.keys())
+                if not file_exists:
+                    writer.writeheader()
+                writer.writerow(record)
+            data_cache.invalidate(self.csv_file)
+
+            if self._frame is not None:
+                self._added.add(self._base_rows + len(self._added))
+
+    def update(self, key, record):
+        with self._lock:
+            self._check_key(key)
+            self.journal.record_update(key, record)
+        self._maybe_compact()
+
+    def remove(self, key):
+        with self._lock:
+            self._check_key(key)
+            self.journal.record_delete(key)
+            self._removed.add(key)
+        self._maybe_compact()
+
+    def clear(self):
+        self._wait_compaction()
+        with self._lock:
+            if self._compacted is not None:
+                os.remove(self._compacted['tmp_file'])
+                self._compacted = None
+            with compressed_io.open_text(self.csv_file, 'w', self.compression) as file:
+                writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+                writer.writeheader()
+            self.journal.clear()
+            data_cache.invalidate(self.csv_file)
+            self._reset_state()
+
+    # Compactacao do diario
+
+    def _maybe_compact(self):
+        """Inicia a compactacao em segundo plano se o diario estiver grande"""
+        with self._lock:
+            if self._compaction is not None or self._compacted is not None:
+                return
+            if self.compression or self.journal.size() < self.compact_bytes:
+                return
+            self._compaction = threading.Thread(target=self._compact_worker, daemon=True)
+            self._compaction.start()
+
+    def _wait_compaction(self):
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def compact(self):
+        """Compacta o diario imediatamente (bloqueante)"""
+        self._wait_compaction()
+        with self._lock:
+            if self.compression or not self.journal.exists():
+                return
+            self._compact_worker()
+            self._finish_compaction()
+
+    def _compact_worker(self):
+        """Gera o novo CSV base a partir de um instantaneo do base + diario"""
+        try:
+            with self._lock:
+                base_size = os.path.getsize(self.csv_file)
+                entries = self.journal.entries()
+
+            # Le apenas os bytes do instantaneo (anexos posteriores ficam de fora)
+            with open(self.csv_file, 'rb') as file:
+                snapshot = file.read(base_size)
+            data = measurement_schema.read_measurements(io.BytesIO(snapshot))
+            base_rows = len(data)
+            data = self.journal.apply(data, entries)
+
+            tmp_file = self.csv_file + '.compact.tmp'
+            with open(tmp_file, 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=list(data.columns))
+                writer.writeheader()
+                writer.writerows(data_cache.frame_to_records(data))
+
+            # Chave antiga -> chave no novo arquivo
+            key_map = {int(old): new for new, old in enumerate(data.index)}
+
+            with self._lock:
+                self._compacted = {
+                    'tmp_file': tmp_file,
+                    'base_size': base_size,
+                    'base_rows': base_rows,
+                    'entries': len(entries),
+                    'key_map': key_map,
+                    'deleted': base_rows - len(data),
+                }
+        finally:
+            self._compaction = None
+
+    def _finish_compaction(self):
+        """Troca o CSV base pelo compactado, preservando alteracoes posteriores"""
+        compacted = self._compacted
+        if compacted is None:
+            return
+        self._compacted = None
+
+        key_map = compacted['key_map']
+        base_rows = compacted['base_rows']
+
+        def new_key(key):
+            if key < base_rows:
+                return key_map[key]
+            return key - compacted['deleted']
+
+        # Linhas anexadas ao base durante a compactacao
+        with open(self.csv_file, 'rb') as source, open(compacted['tmp_file'], 'ab') as target:
+            source.seek(compacted['base_size'])
+            shutil.copyfileobj(source, target)
+
+        # Entradas do diario gravadas durante a compactacao
+        pending = self.journal.entries()[compacted['entries']:]
+        for entry in pending:
+            entry['key'] = new_key(entry['key'])
+
+        os.replace(compacted['tmp_file'], self.csv_file)
+        self.journal.write_entries(pending)
+        data_cache.invalidate(self.csv_file)
+        self._reset_state()
+
+
+class SqliteMeasurementStore(MeasurementStore):
+    """
+    Armazenamento em SQLite, tabela indexada por id e por data
+
+    Insercoes, edicoes e exclusoes alteram uma unica linha (O(log n)) e as
+    consultas por periodo usam o indice da coluna de data.
+    """
+
+    TABLE = 'medicoes'
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ', '.join(f'"{col}" REAL' for col in FIELD_NAMES[1:])
+        with self.conn:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.TABLE} ('
+                f'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                f'"{measurement_schema.DATE_COLUMN}" TEXT NOT NULL, {columns})')
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_data '
+                f'ON {self.TABLE} ("{measurement_schema.DATE_COLUMN}")')
+
+    def _values(self, record):
+        """Converte o registro de texto em valores para o SQLite"""
+        record = _canonical_record(record)
+        values = [record.get(measurement_schema.DATE_COLUMN, '')]
+        for col in FIELD_NAMES[1:]:
+            value = record.get(col, '')
+            values.append(float(value) if value not in ('', None) else None)
+        return values
+
+    def _query_frame(self, where='', params=(), order='id', limit=None):
+        sql = f'SELECT * FROM {self.TABLE} {where} ORDER BY {order}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        data = pd.read_sql_query(sql, self.conn, params=params, index_col='id')
+        data.index.name = None
+        return measurement_schema.coerce_types(data)
+
+    def exists(self):
+        return self.count() > 0
+
+    def load_frame(self):
+        return self._query_frame()
+
+    def add(self, record):
+        placeholders = ', '.join('?' for _ in FIELD_NAMES)
+        columns = ', '.join(f'"{col}"' for col in FIELD_NAMES)
+        with self.conn:
+            cursor = self.conn.execute(
+                f'INSERT INTO {self.TABLE} ({columns}) VALUES ({placeholders})',
+                self._values(record))
+        return cursor.lastrowid
+
+    def update(self, key, record):
+        assignments = ', '.join(f'"{col}" = ?' for col in FIELD_NAMES)
+        with self.conn:
+            cursor = self.conn.execute(
+                f'UPDATE {self.TABLE} SET {assignments} WHERE id = ?',
+                self._values(record) + [int(key)])
+        if cursor.rowcount == 0:
+            raise IndexError("Índice de linha inválido")
+
+    def remove(self, key):
+        with self.conn:
+            cursor = self.conn.execute(f'DELETE FROM {self.TABLE} WHERE id = ?', (int(key),))
+        if cursor.rowcount == 0:
+            raise IndexError("Índice de linha inválido")
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute(f'DELETE FROM {self.TABLE}')
+
+    def count(self):
+        return self.conn.execute(f'SELECT COUNT(*) FROM {self.TABLE}').fetchone()[0]
+
+    def tail(self, n=1):
+        return self._query_frame(order='id DESC', limit=n).iloc[::-1]
+
+    def query_range(self, start=None, end=None):
+        conditions, params = [], []
+        date_col = f'"{measurement_schema.DATE_COLUMN}"'
+        if start is not None:
+            conditions.append(f'{date_col} >= ?')
+            params.append(pd.Timestamp(start).strftime(measurement_schema.DATE_FORMAT))
+        if end is not None:
+            conditions.append(f'{date_col} <= ?')
+            params.append(pd.Timestamp(end).strftime(measurement_schema.DATE_FORMAT))
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return self._query_frame(where, params, order=f'{date_col}, id')
+
+    def import_csv(self, csv_file):
+        data = measurement_schema.read_measurements(csv_file)
+        rows = [self._values(record) for record in data_cache.frame_to_records(data)]
+        placeholders = ', '.join('?' for _ in FIELD_NAMES)
+        columns = ', '.join(f'"{col}"' for col in FIELD_NAMES)
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT INTO {self.TABLE} ({columns}) VALUES ({placeholders})', rows)
+
+    def close(self):
+        self.conn.close()
+
+
+def _canonical_record(record):
+    """Renomeia colunas alternativas (ex.: 'Gordura/%') para o nome canonico"""
+    return {measurement_schema.canonical_name(col): value for col, value in record.items()}
+
+
+def sqlite_path_for(csv_file):
+    """Banco SQLite correspondente a um CSV (mesmo diretorio e nome)"""
+    base = os.path.splitext(csv_file)[0]
+    return base + '.db'
+
+
+def open_store(csv_file, backend=None):
+    """
+    Abre o armazenamento configurado para um arquivo de medicoes
+
+    Args:
+        csv_file (str): Caminho do CSV de medicoes
+        backend (str): 'csv' ou 'sqlite' (padrao: config.STORAGE_BACKEND)
+
+    Returns:
+        MeasurementStore: Armazenamento aberto. No SQLite, um banco novo e
+        preenchido com as medicoes do CSV, se ele existir.
+    """
+    backend = backend or config.STORAGE_BACKEND
+
+    if backend == 'sqlite':
+        db_file = sqlite_path_for(csv_file)
+        is_new = not os.path.exists(db_file)
+        store = SqliteMeasurementStore(db_file)
+        if is_new and os.path.exists(csv_file):
+            store.import_csv(csv_file)
+        return store
+
+    if backend == 'csv':
+        return CsvMeasurementStore(csv_file)
+
+    raise ValueError(f"Armazenamento desconhecido: {backend}")
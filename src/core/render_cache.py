@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de renderizacao dos graficos exportados
+Cada arquivo e guardado em data/processed/render_cache sob o hash das colunas
+que o grafico consome, do tipo de grafico, do estilo e do preset de exportacao.
+Se nada disso mudou, o arquivo e reaproveitado (link ou copia) sem renderizar.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+# Adiciona a raiz do projeto ao path (config.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import config
+
+# Versao da chave (incrementar ao mudar o desenho de qualquer grafico)
+RENDER_CACHE_VERSION = 2
+
+RENDER_CACHE_DIR = os.path.join(config.PROCESSED_DATA_DIR, 'render_cache')
+
+
+def render_settings(export_settings, **extra):
+    """
+    Configuracoes que alteram o arquivo gerado (estilo, paleta, matplotlib e
+    o preset de exportacao: DPI, formato e tamanho)
+    """
+    settings = {
+        'style': config.CHART_STYLE,
+        'palette': config.CHART_PALETTE,
+        'matplotlib': matplotlib.__version__,
+        'export': {name: export_settings[name] for name in ('dpi', 'format', 'size')},
+    }
+    settings.update(extra)
+    return settings
+
+
+# Linhas convertidas por vez no hash (colunas mapeadas nao sao lidas inteiras)
+HASH_BLOCK_ROWS = 1 << 20
+
+
+def _column_bytes(series):
+    """Valores da coluna (Series ou array) em uma representacao binaria estavel, em blocos"""
+    if not isinstance(series, pd.Series):
+        series = pd.Series(series, copy=False)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        for start in range(0, len(series), HASH_BLOCK_ROWS):
+            block = series.iloc[start:start + HASH_BLOCK_ROWS]
+            yield block.to_numpy(dtype='datetime64[ns]').view('int64').tobytes()
+    elif pd.api.types.is_numeric_dtype(series):
+        for start in range(0, len(series), HASH_BLOCK_ROWS):
+            block = series.iloc[start:start + HASH_BLOCK_ROWS]
+            yield block.to_numpy(dtype='float64', na_value=np.nan).tobytes()
+    else:
+        yield '\x1f'.join('' if pd.isna(value) else str(value) for value in series).encode('utf-8')
+
+
+def chart_key(chart, data, settings):
+    """
+    Hash do grafico: tipo, configuracoes e colunas consumidas
+
+    Args:
+        chart (str): Nome do grafico
+        data: Apenas as colunas que o grafico usa - DataFrame ou dicionario
+            nome -> coluna (Series ou array), para nao copiar colunas mapeadas
+        settings (dict): Resultado de render_settings()
+    """
+    names = list(data.columns) if isinstance(data, pd.DataFrame) else list(data)
+    rows = len(data) if isinstance(data, pd.DataFrame) else (len(data[names[0]]) if names else 0)
+    digest = hashlib.blake2b(digest_size=20)
+    header = {'version': RENDER_CACHE_VERSION, 'chart': chart, 'settings': settings,
+              'columns': names, 'rows': rows}
+    digest.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+    for col in names:
+        for block in _column_bytes(data[col]):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_path(key, file_format='png'):
+    return os.path.join(RENDER_CACHE_DIR, key[:2], f'{key}.{file_format}')
+
+
+def lookup(key, file_format='png'):
+    """Arquivo guardado para a chave, ou None"""
+    path = cached_path(key, file_format)
+    return path if os.path.isfile(path) else None
+
+
+def store(key, rendered_file):
+    """Guarda uma copia do arquivo renderizado (falhas de escrita sao ignoradas)"""
+    path = cached_path(key, os.path.splitext(rendered_file)[1][1:].lower())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = path + '.tmp'
+        shutil.copyfile(rendered_file, tmp_file)
+        os.replace(tmp_file, path)
+    except OSError:
+        return None
+    return path
+
+
+def store_bytes(key, content, file_format='png'):
+    """Guarda um arquivo renderizado em memoria (ex.: miniatura PNG); falhas sao ignoradas"""
+    path = cached_path(key, file_format)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_file, path)
+    except OSError:
+        return None
+    return path
+
+
+def materialize(cached_file, target):
+    """
+    Coloca o arquivo do cache no destino: link fisico quando possivel, senao copia
+
+    O destino existente e removido antes, entao o arquivo do cache nunca e
+    sobrescrito por meio de um link.
+    """
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(cached_file, target)
+    except OSError:
+        shutil.copyfile(cached_file, target)
+    return target
+
+
+def clear():
+    """Remove todo o cache de renderizacao"""
+    shutil.rmtree(RENDER_CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Geracao em lote dos relatorios de varios pacientes (execucao noturna)
+Os pacientes de um diretorio, glob ou manifesto sao processados em um pool
+de processos reaproveitados; cada um ganha sua propria pasta de saida.
+Pacientes cujo arquivo e configuracoes nao mudaram desde a ultima execucao
+sao pulados, e um resumo em JSON registra tempos e falhas.
+
+Uso:
+    python src/core/report_farm.py clinica/ --workers 4 --pdf
+    python src/core/report_farm.py --manifesto pacientes.txt --saida relatorios/
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Adiciona a raiz do projeto ao path (config.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import config
+import cohort_loader
+import data_cache
+import measurement_journal
+import render_cache
+from bioimpedance_analyzer import BioimpedanceAnalyzer, CHARTS
+
+# Versao do estado por paciente (incrementar ao mudar o conteudo dos relatorios)
+FARM_VERSION = 2
+
+# Pasta padrao: uma subpasta por paciente
+DEFAULT_OUTPUT_DIR = os.path.join(config.EXPORTS_DIR, 'pacientes')
+
+# Arquivos gravados na pasta de cada paciente
+STATE_FILE = '.relatorio.json'
+LOG_FILE = 'relatorio.log'
+
+# Resumo da execucao, na pasta de saida
+SUMMARY_FILE = 'resumo_execucao.json'
+
+
+def read_manifest(manifest):
+    """
+    Arquivos listados no manifesto: um caminho por linha, relativo a pasta
+    do manifesto (linhas vazias e comentarios com # sao ignorados)
+    """
+    base = os.path.dirname(os.path.abspath(manifest))
+    files = []
+    with open(manifest, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                files.append(os.path.normpath(os.path.join(base, os.path.expanduser(line))))
+    return files
+
+
+def report_settings(export_preset, pdf, html):
+    """Configuracoes que alteram os relatorios gerados"""
+    return {
+        'version': FARM_VERSION,
+        'render': render_cache.RENDER_CACHE_VERSION,
+        'preset': export_preset or config.DEFAULT_EXPORT_PRESET,
+        'pdf': pdf,
+        'html': html,
+    }
+
+
+def _file_state(path):
+    """Tamanho, mtime e hash do conteudo do arquivo (None se nao existir)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': data_cache.file_hash(path)}
+
+
+def source_signature(csv_file):
+    """
+    Identificacao das medicoes do paciente: o CSV e o diario de edicoes e
+    exclusoes ao lado dele (que muda sem alterar o CSV)
+    """
+    return {'csv': _file_state(csv_file),
+            'journal': _file_state(measurement_journal.MeasurementJournal(csv_file).path)}
+
+
+def _same_file(saved, path):
+    """
+    Compara o arquivo com o estado guardado: tamanho e mtime, ou o conteudo
+    se so o mtime mudou (copia ou touch). Atualiza o mtime guardado nesse caso.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return saved is None
+    if saved is None or saved['size'] != stat.st_size:
+        return False
+    if saved['mtime_ns'] != stat.st_mtime_ns:
+        if saved['hash'] != data_cache.file_hash(path):
+            return False
+        saved['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _read_state(output_dir):
+    try:
+        with open(os.path.join(output_dir, STATE_FILE), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(output_dir, state):
+    path = os.path.join(output_dir, STATE_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_unchanged(csv_file, output_dir, settings):
+    """
+    Indica se o relatorio do paciente esta em dia: mesmas configuracoes,
+    saidas presentes e o mesmo arquivo de origem (tamanho e mtime, ou o
+    conteudo, se so o mtime mudou), inclusive o diario de edicoes
+
+    Estados incompletos ou de versoes antigas contam como alterados.
+    """
+    state = _read_state(output_dir)
+    if not isinstance(state, dict) or state.get('settings') != settings:
+        return False
+
+    try:
+        if not all(os.path.exists(os.path.join(output_dir, name)) for name in state['outputs']):
+            return False
+        source = state['source']
+        before = json.dumps(source, sort_keys=True)
+        unchanged = (_same_file(source['csv'], csv_file)
+                     and _same_file(source['journal'], measurement_journal.MeasurementJournal(csv_file).path))
+    except (KeyError, TypeError):
+        return False
+
+    if unchanged and json.dumps(source, sort_keys=True) != before:
+        # So o mtime mudou: guarda o novo para a proxima execucao usar o caminho rapido
+        _write_state(output_dir, state)
+    return unchanged
+
+
+def build_patient_report(csv_file, output_dir, settings, use_cache=True):
+    """
+    Gera o relatorio de um paciente (executado nos processos do pool)
+
+    As mensagens do analisador vao para o relatorio.log da pasta do
+    paciente, para nao misturar a saida dos processos.
+
+    Returns:
+        dict: Arquivos gerados (relativos a output_dir) e tempo gasto
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    signature = source_signature(csv_file)
+
+    with open(os.path.join(output_dir, LOG_FILE), 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        analyzer = BioimpedanceAnalyzer(csv_file, use_cache=use_cache, output_dir=output_dir,
+                                        headless=True, export_preset=settings['preset'])
+        if not analyzer.load_data() or not analyzer.prepare_data():
+            raise RuntimeError(f"Nao foi possivel carregar os dados (detalhes em {LOG_FILE})")
+        analyzer.generate_summary_report()
+
+        outputs = []
+        if settings['pdf']:
+            outputs.append(analyzer.generate_pdf_report())
+        else:
+            analyzer.render_charts()
+            outputs += [analyzer.chart_path(chart) for chart in CHARTS]
+        if settings['html']:
+            outputs.append(analyzer.generate_html_dashboard())
+
+    outputs = [os.path.relpath(path, output_dir) for path in outputs if path and os.path.exists(path)]
+    _write_state(output_dir, {'settings': settings, 'source': signature, 'outputs': outputs})
+    return {'outputs': outputs, 'seconds': time.perf_counter() - start}
+
+
+def _run_task(task):
+    """build_patient_report sem deixar excecoes escaparem do processo"""
+    try:
+        return build_patient_report(*task), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+
+
+def run_farm(files, output_dir=None, workers=None, export_preset=None, pdf=False, html=False,
+             use_cache=True, force=False):
+    """
+    Gera os relatorios de todos os arquivos em um pool de processos
+
+    Args:
+        files (list): CSVs dos pacientes
+        output_dir (str): Pasta de saida (uma subpasta por paciente)
+        workers (int): Processos do pool (padrao: numero de CPUs). Com 1
+            processo, tudo roda no processo atual.
+        export_preset (str): Preset de config.EXPORT_PRESETS
+        pdf (bool): Um PDF por paciente em vez dos graficos separados
+        html (bool): Gera tambem o dashboard HTML interativo
+        use_cache (bool): Usa o cache binario e o de renderizacao
+        force (bool): Regenera mesmo os pacientes inalterados
+
+    Returns:
+        dict: Resumo da execucao (tambem gravado em SUMMARY_FILE)
+    """
+    output_dir = output_dir or DEFAULT_OUTPUT_DIR
+    settings = report_settings(export_preset, pdf, html)
+    started = datetime.now()
+    start = time.perf_counter()
+
+    results = {}
+    tasks = {}
+    order = []  # Pacientes na ordem de entrada, para o resumo
+    sources = set()
+    for csv_file in files:
+        if os.path.abspath(csv_file) in sources:
+            continue  # Mesmo arquivo listado duas vezes (ex.: manifesto e glob)
+        sources.add(os.path.abspath(csv_file))
+        # Arquivos com o mesmo identificador (p.csv e p.csv.gz, ou o mesmo nome
+        # em pastas diferentes) ganham cada um sua pasta, como em load_patients
+        patient = cohort_loader.unique_patient_id(csv_file, order)
+        patient_dir = os.path.join(output_dir, patient)
+        if not os.path.isfile(csv_file):
+            results[patient] = {'source': csv_file, 'status': 'failed',
+                                'error': f"Arquivo nao encontrado: {csv_file}"}
+        elif not force and is_unchanged(csv_file, patient_dir, settings):
+            results[patient] = {'source': csv_file, 'status': 'skipped',
+                                'outputs': _read_state(patient_dir)['outputs']}
+            print(f"⏭️ {patient}: inalterado")
+        else:
+            tasks[patient] = (csv_file, patient_dir, settings, use_cache)
+        order.append(patient)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    if workers == 1:
+        outcomes = ((patient, _run_task(task)) for patient, task in tasks.items())
+        _collect(outcomes, tasks, results)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {patient: executor.submit(_run_task, task) for patient, task in tasks.items()}
+            outcomes = ((patient, _future_result(future)) for patient, future in futures.items())
+            _collect(outcomes, tasks, results)
+
+    counts = {status: sum(1 for result in results.values() if result['status'] == status)
+              for status in ('generated', 'skipped', 'failed')}
+    summary = {
+        'started': started.isoformat(timespec='seconds'),
+        'elapsed': round(time.perf_counter() - start, 3),
+        'workers': workers,
+        'output_dir': os.path.abspath(output_dir),
+        'settings': settings,
+        'counts': counts,
+        'patients': {patient: results[patient] for patient in order},
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, SUMMARY_FILE), 'w', encoding='utf-8') as file:
+        json.dump(summary, file, indent=2, ensure_ascii=False)
+    return summary
+
+
+def _future_result(future):
+    """Resultado de _run_task, inclusive quando o processo do pool morre"""
+    try:
+        return future.result()
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _collect(outcomes, tasks, results):
+    """Registra o resultado de cada paciente, na ordem de envio"""
+    for patient, (result, error) in outcomes:
+        csv_file = tasks[patient][0]
+        if error is None:
+            results[patient] = {'source': csv_file, 'status': 'generated',
+                                'seconds': round(result['seconds'], 3), 'outputs': result['outputs']}
+            print(f"✅ {patient}: {len(result['outputs'])} arquivos em {result['seconds']:.2f} s")
+        else:
+            results[patient] = {'source': csv_file, 'status': 'failed', 'error': error}
+            print(f"❌ {patient}: {error.splitlines()[0]}")
+
+
+def parse_args(argv=None):
+    """Le os argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(description="Geracao em lote dos relatorios dos pacientes")
+    parser.add_argument('origem', nargs='?', metavar='DIRETORIO_OU_GLOB',
+                        help="Diretorio ou glob com um CSV por paciente")
+    parser.add_argument('--manifesto', metavar='ARQUIVO',
+                        help="Arquivo com um CSV de paciente por linha (relativo ao manifesto)")
+    parser.add_argument('--saida', default=None,
+                        help=f"Pasta de saida, com uma subpasta por paciente (padrao: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processos do pool (padrao: numero de CPUs)")
+    parser.add_argument('--preset', choices=list(config.EXPORT_PRESETS), default=None,
+                        help=f"Preset de exportacao dos graficos (padrao: {config.DEFAULT_EXPORT_PRESET})")
+    parser.add_argument('--pdf', action='store_true',
+                        help="Um unico PDF por paciente (resumo + graficos) em vez dos arquivos separados")
+    parser.add_argument('--html', action='store_true',
+                        help="Gera tambem o dashboard interativo em HTML")
+    parser.add_argument('--sem-cache', dest='use_cache', action='store_false',
+                        help="Nao usa o cache binario nem o cache de renderizacao em data/processed")
+    parser.add_argument('--forcar', action='store_true',
+                        help="Regenera todos os pacientes, mesmo os inalterados")
+    args = parser.parse_args(argv)
+    if not args.origem and not args.manifesto:
+        parser.error("informe um diretorio/glob ou --manifesto")
+    return args
+
+
+def main(argv=None):
+    """
+    Funcao principal
+
+    Returns:
+        int: Codigo de saida (1 se algum paciente falhou)
+    """
+    args = parse_args(argv)
+
+    files = []
+    if args.manifesto:
+        files += read_manifest(args.manifesto)
+    if args.origem:
+        files += cohort_loader.find_patient_files(args.origem)
+    if not files:
+        print("❌ Nenhum arquivo de paciente encontrado")
+        return 1
+
+    print(f"🏭 Gerando relatorios de {len(files)} pacientes...")
+    summary = run_farm(files, output_dir=args.saida, workers=args.workers, export_preset=args.preset,
+                       pdf=args.pdf, html=args.html, use_cache=args.use_cache, force=args.forcar)
+
+    counts = summary['counts']
+    print(f"\n📋 {counts['generated']} gerados, {counts['skipped']} inalterados, "
+          f"{counts['failed']} com erro em {summary['elapsed']:.2f} s")
+    print(f"📄 Resumo: {os.path.join(summary['output_dir'], SUMMARY_FILE)}")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura em blocos para arquivos de medicoes muito grandes
+Calcula o resumo de forma incremental e gera series reduzidas para os graficos
+"""
+
+import numpy as np
+import pandas as pd
+
+import compressed_io
+import measurement_schema
+
+# Tamanho padrao dos blocos lidos do CSV
+DEFAULT_CHUNKSIZE = 100_000
+
+# Numero maximo de intervalos da serie reduzida (cada um guarda ate 2 linhas)
+DEFAULT_MAX_POINTS = 2_000
+
+
+class SummaryAccumulator:
+    """
+    Acumulador do resumo: primeira/ultima medicao, minimos, maximos e contagens
+
+    Os acumuladores podem ser combinados com merge(), desde que o outro
+    acumulador cubra linhas posteriores do arquivo.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.minimum = {}
+        self.maximum = {}
+        self.valid = {}
+
+    def update(self, chunk):
+        """Adiciona um bloco de medicoes (ja tipado)"""
+        chunk = chunk.dropna(subset=[measurement_schema.DATE_COLUMN])
+        if len(chunk) == 0:
+            return
+
+        other = SummaryAccumulator()
+        other.count = len(chunk)
+        other.first = chunk.iloc[0]
+        other.last = chunk.iloc[-1]
+
+        for col in chunk.columns:
+            series = chunk[col]
+            if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)):
+                continue
+            valid = int(series.notna().sum())
+            other.valid[col] = valid
+            if valid:
+                other.minimum[col] = series.min()
+                other.maximum[col] = series.max()
+
+        self.merge(other)
+
+    def merge(self, other):
+        """Combina com outro acumulador (de linhas posteriores)"""
+        if other.count == 0:
+            return self
+
+        if self.first is None:
+            self.first = other.first
+        self.last = other.last
+        self.count += other.count
+
+        for col, valid in other.valid.items():
+            self.valid[col] = self.valid.get(col, 0) + valid
+        for col, value in other.minimum.items():
+            self.minimum[col] = min(self.minimum[col], value) if col in self.minimum else value
+        for col, value in other.maximum.items():
+            self.maximum[col] = max(self.maximum[col], value) if col in self.maximum else value
+
+        return self
+
+
+class StreamingDownsampler:
+    """
+    Reducao de series em fluxo por minimo/maximo em intervalos de linhas
+
+    Cada intervalo guarda as linhas reais de menor e maior valor da coluna
+    principal, entao as demais metricas continuam alinhadas. Quando o numero
+    de intervalos passa de max_points, o tamanho do intervalo dobra e as
+    linhas guardadas sao reagrupadas (sem reler o arquivo).
+    """
+
+    def __init__(self, max_points=DEFAULT_MAX_POINTS, value_column='peso'):
+        self.max_points = max_points
+        self.value_column = value_column
+        self.bucket_size = 1
+        self.rows_seen = 0
+        self.first = None
+        self.last = None
+        self._rows = None
+
+    def update(self, chunk):
+        """Adiciona um bloco de medicoes (ja tipado)"""
+        chunk = chunk.dropna(subset=[measurement_schema.DATE_COLUMN]).copy()
+        if len(chunk) == 0:
+            return
+
+        chunk.index = pd.RangeIndex(self.rows_seen, self.rows_seen + len(chunk))
+        chunk['_offset'] = chunk.index
+        self.rows_seen += len(chunk)
+
+        if self.first is None:
+            self.first = chunk.iloc[[0]]
+        self.last = chunk.iloc[[-1]]
+
+        while self.rows_seen / self.bucket_size > self.max_points:
+            self.bucket_size *= 2
+
+        selected = self._select(chunk)
+        self._rows = selected if self._rows is None else self._select(pd.concat([self._rows, selected]))
+
+    def _select(self, rows):
+        """Mantem as linhas de minimo e maximo de cada intervalo"""
+        if self.value_column not in rows.columns:
+            # Sem coluna principal: fica com a primeira linha de cada intervalo
+            buckets = rows['_offset'] // self.bucket_size
+            return rows[~buckets.duplicated()]
+
+        values = rows.dropna(subset=[self.value_column])
+        if len(values) == 0:
+            return values
+
+        groups = values[self.value_column].groupby(values['_offset'].to_numpy() // self.bucket_size)
+        keep = np.union1d(groups.idxmin().to_numpy(), groups.idxmax().to_numpy())
+        return values.loc[keep].sort_values('_offset')
+
+    def to_frame(self):
+        """Serie reduzida, em ordem, incluindo a primeira e a ultima medicao"""
+        if self.first is None:
+            return pd.DataFrame()
+
+        parts = [self.first, self._rows, self.last]
+        frame = pd.concat([part for part in parts if part is not None and len(part)])
+        frame = frame.drop_duplicates(subset='_offset').sort_values('_offset')
+        return frame.drop(columns='_offset').reset_index(drop=True)
+
+
+def iter_chunks(csv_file, chunksize=DEFAULT_CHUNKSIZE, journal=None):
+    """
+    Le o CSV em blocos tipados, sem carregar o arquivo inteiro
+
+    O indice de cada bloco e a posicao da linha no arquivo, entao o diario
+    de alteracoes (se informado) pode ser aplicado bloco a bloco. Arquivos
+    comprimidos sao descomprimidos em fluxo.
+    """
+    entries = journal.entries() if journal is not None else None
+
+    columns = measurement_schema.read_header(csv_file)
+    parse_dates = [measurement_schema.DATE_COLUMN] if measurement_schema.DATE_COLUMN in columns else False
+
+    reader = pd.read_csv(csv_file, chunksize=chunksize, parse_dates=parse_dates,
+                         date_format=measurement_schema.DATE_FORMAT,
+                         compression=compressed_io.read_csv_compression(csv_file))
+    with reader:
+        for chunk in reader:
+            chunk = measurement_schema.coerce_types(chunk)
+            if entries:
+                chunk = journal.apply(chunk, entries)
+            yield chunk
+
+
+def stream_measurements(csv_file, chunksize=DEFAULT_CHUNKSIZE, max_points=DEFAULT_MAX_POINTS,
+                        journal=None):
+    """
+    Percorre o arquivo uma vez calculando resumo e serie reduzida
+
+    Args:
+        csv_file (str): Caminho para o arquivo CSV
+        chunksize (int): Linhas por bloco
+        max_points (int): Numero maximo de intervalos da serie reduzida
+        journal (MeasurementJournal): Diario de alteracoes a aplicar
+
+    Returns:
+        tuple: (SummaryAccumulator, pd.DataFrame com a serie reduzida)
+    """
+    summary = SummaryAccumulator()
+    downsampler = StreamingDownsampler(max_points=max_points)
+
+    for chunk in iter_chunks(csv_file, chunksize, journal):
+        summary.update(chunk)
+        downsampler.update(chunk)
+
+    return summary, downsampler.to_frame()
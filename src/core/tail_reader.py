@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura do final de um CSV de medicoes, de tras para frente
+Le apenas o cabecalho e os ultimos blocos do arquivo, entao o custo nao
+depende do tamanho do historico (os campos nao contem quebras de linha)
+"""
+
+import io
+
+import measurement_schema
+
+# Tamanho dos blocos lidos a partir do final do arquivo
+BLOCK_SIZE = 64 * 1024
+
+# Tamanho dos blocos usados para contar as linhas
+COUNT_BLOCK_SIZE = 1024 * 1024
+
+
+def tail_lines(csv_file, n, block_size=BLOCK_SIZE):
+    """
+    Le o cabecalho e as ultimas n linhas completas do arquivo
+
+    Returns:
+        tuple: (linha de cabecalho em bytes, lista com as ultimas linhas em bytes)
+    """
+    with open(csv_file, 'rb') as file:
+        header = file.readline()
+        header_end = file.tell()
+        position = file.seek(0, io.SEEK_END)
+
+        buffer = b''
+        # n + 1 quebras garantem n linhas completas (a ultima pode nao ter quebra)
+        while position > header_end and buffer.count(b'\n') <= n:
+            size = min(block_size, position - header_end)
+            position -= size
+            file.seek(position)
+            buffer = file.read(size) + buffer
+
+    lines = buffer.split(b'\n')
+    if position > header_end:
+        # A primeira linha do buffer pode estar cortada no meio
+        lines = lines[1:]
+    lines = [line.rstrip(b'\r') for line in lines if line.strip()]
+    return header, lines[-n:] if n else []
+
+
+def read_tail(csv_file, n, block_size=BLOCK_SIZE):
+    """
+    Ultimas n medicoes do CSV, tipadas pelo esquema
+
+    Returns:
+        pd.DataFrame: Ate n linhas, na ordem do arquivo (indice 0..n-1).
+            Um arquivo vazio (sem cabecalho) da um DataFrame vazio com as
+            colunas do esquema.
+    """
+    header, lines = tail_lines(csv_file, n, block_size)
+    if not header.strip():
+        header = ','.join(measurement_schema.FIELD_NAMES).encode('utf-8')
+    content = header.rstrip(b'\r\n') + b'\n' + b''.join(line + b'\n' for line in lines)
+    return measurement_schema.read_measurements(io.BytesIO(content))
+
+
+def count_rows(csv_file, block_size=COUNT_BLOCK_SIZE):
+    """
+    Conta as linhas de dados sem analisar o CSV (apenas quebras de linha)
+    """
+    count = 0
+    last = b'\n'
+    with open(csv_file, 'rb') as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            count += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        count += 1
+    # Desconta o cabecalho
+    return max(0, count - 1)
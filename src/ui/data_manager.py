@@ -11,8 +11,14 @@ from tkinter import messagebox, filedialog
 import pandas as pd
 import csv
 import os
+import sys
 from datetime import datetime, date
 
+# Adiciona o diretorio core ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+
+import compressed_io
+
 class DataManager:
     def __init__(self, parent_gui):
         self.parent = parent_gui
@@ -154,6 +160,15 @@ class DataManager:
         )
         export_button.pack(side="left", padx=10)
         
+        import_button = ctk.CTkButton(
+            action_frame,
+            text="📥 Importar CSV",
+            command=self.import_data,
+            width=120,
+            height=35
+        )
+        import_button.pack(side="left", padx=10)
+        
         clear_all_button = ctk.CTkButton(
             action_frame,
             text="🗑️ Limpar Todos",
@@ -274,13 +289,8 @@ class DataManager:
                     messagebox.showerror("Erro", f"Valor numérico inválido: {field}")
                     return
             
-            # Adiciona ao CSV
-            file_exists = os.path.exists(self.csv_file)
-            with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=data_dict.keys())
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(data_dict)
+            # Adiciona ao armazenamento (CSV ou SQLite)
+            self.parent.store.add(data_dict)
             
             messagebox.showinfo("Sucesso", "Dados adicionados com sucesso!")
             self.clear_fields()
@@ -298,9 +308,9 @@ class DataManager:
         for item in self.data_tree.get_children():
             self.data_tree.delete(item)
         
-        # Carrega os dados
+        # Carrega os dados (iid = chave da linha no armazenamento)
         if self.parent.data is not None:
-            for _, row in self.parent.data.iterrows():
+            for key, row in self.parent.data.iterrows():
                 values = [
                     row['data'].strftime('%Y-%m-%d') if pd.notna(row['data']) else '',
                     f"{row['peso']:.1f}" if pd.notna(row['peso']) else '',
@@ -312,7 +322,7 @@ class DataManager:
                     f"{row.get('Metabolismo', ''):.0f}" if pd.notna(row.get('Metabolismo', '')) else '',
                     f"{row.get('Obesidade/porcento', ''):.1f}" if pd.notna(row.get('Obesidade/porcento', '')) else ''
                 ]
-                self.data_tree.insert('', 'end', values=values)
+                self.data_tree.insert('', 'end', iid=str(key), values=values)
     
     def edit_selected_row(self, event=None):
         """Edita a linha selecionada"""
@@ -440,7 +450,7 @@ class DataManager:
                         return
                 
                 # Atualiza o CSV
-                self.update_csv_row(selection[0], data_dict)
+                self.update_csv_row(int(selection[0]), data_dict)
                 
                 messagebox.showinfo("Sucesso", "Dados editados com sucesso!")
                 edit_window.destroy()
@@ -485,7 +495,7 @@ class DataManager:
                               f"Tem certeza que deseja excluir esta entrada?\n\n{data_str}"):
             try:
                 # Remove a linha do CSV
-                self.remove_csv_row(selection[0])
+                self.remove_csv_row(int(selection[0]))
                 
                 messagebox.showinfo("Sucesso", "Linha excluída com sucesso!")
                 self.refresh_data_table()
@@ -495,7 +505,7 @@ class DataManager:
                 messagebox.showerror("Erro", f"Erro ao excluir linha: {e}")
     
     def export_data(self):
-        """Exporta os dados para CSV"""
+        """Exporta os dados para CSV (comprimido, conforme a extensao escolhida)"""
         if self.parent.data is None:
             messagebox.showwarning("Aviso", "Nenhum dado para exportar")
             return
@@ -503,27 +513,38 @@ class DataManager:
         file_path = filedialog.asksaveasfilename(
             title="Salvar arquivo CSV",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=compressed_io.EXPORT_FILE_TYPES
         )
         
         if file_path:
             try:
-                self.parent.data.to_csv(file_path, index=False, encoding='utf-8')
+                self.parent.store.export_csv(file_path)
                 messagebox.showinfo("Sucesso", f"Dados exportados para: {file_path}")
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao exportar: {e}")
     
+    def import_data(self):
+        """Importa medicoes de um CSV para o armazenamento atual"""
+        file_path = filedialog.askopenfilename(
+            title="Importar arquivo CSV",
+            filetypes=compressed_io.FILE_TYPES
+        )
+        
+        if file_path:
+            try:
+                self.parent.store.import_csv(file_path)
+                messagebox.showinfo("Sucesso", f"Dados importados de: {file_path}")
+                self.parent.load_data()
+                self.refresh_data_table()
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao importar: {e}")
+    
     def clear_all_data(self):
         """Limpa todos os dados"""
         if messagebox.askyesno("Confirmar", "Tem certeza que deseja APAGAR TODOS os dados?\n\nEsta operação não pode ser desfeita!"):
             try:
-                # Cria arquivo vazio com cabeçalho
-                columns = ['data', 'peso', 'imc', 'Gordura/porcento', 'Gordura/KG', 
-                          'Massa Musucular/porcento', 'Massa Muscular/KG', 'Metabolismo', 'Obesidade/porcento']
-                
-                with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(columns)
+                # Mantem apenas o cabeçalho / a tabela vazia
+                self.parent.store.clear()
                 
                 messagebox.showinfo("Sucesso", "Todos os dados foram removidos")
                 self.parent.load_data()
@@ -533,54 +554,15 @@ class DataManager:
                 messagebox.showerror("Erro", f"Erro ao limpar dados: {e}")
     
     def update_csv_row(self, row_index, new_data):
-        """Atualiza uma linha específica no CSV"""
+        """Atualiza uma linha específica (chave da linha no armazenamento)"""
         try:
-            # Lê todos os dados
-            with open(self.csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                rows = list(reader)
-            
-            # Atualiza a linha específica
-            if 0 <= row_index < len(rows):
-                rows[row_index] = new_data
-                
-                # Escreve de volta
-                with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.DictWriter(file, fieldnames=new_data.keys())
-                    writer.writeheader()
-                    writer.writerows(rows)
-            else:
-                raise IndexError("Índice de linha inválido")
-                
+            self.parent.store.update(row_index, new_data)
         except Exception as e:
             raise Exception(f"Erro ao atualizar linha: {e}")
     
     def remove_csv_row(self, row_index):
-        """Remove uma linha específica do CSV"""
+        """Remove uma linha específica (chave da linha no armazenamento)"""
         try:
-            # Lê todos os dados
-            with open(self.csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                rows = list(reader)
-            
-            # Remove a linha específica
-            if 0 <= row_index < len(rows):
-                del rows[row_index]
-                
-                # Escreve de volta
-                if rows:  # Se ainda há dados
-                    with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                        writer = csv.DictWriter(file, fieldnames=rows[0].keys())
-                        writer.writeheader()
-                        writer.writerows(rows)
-                else:  # Se não há mais dados, cria arquivo vazio com cabeçalho
-                    columns = ['data', 'peso', 'imc', 'Gordura/porcento', 'Gordura/KG', 
-                              'Massa Musucular/porcento', 'Massa Muscular/KG', 'Metabolismo', 'Obesidade/porcento']
-                    with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                        writer = csv.writer(file)
-                        writer.writerow(columns)
-            else:
-                raise IndexError("Índice de linha inválido")
-                
+            self.parent.store.remove(row_index)
         except Exception as e:
             raise Exception(f"Erro ao remover linha: {e}")
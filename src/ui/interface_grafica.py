@@ -16,7 +16,14 @@ from tkinter import font
 # Adiciona o diretorio core ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
 
+import compressed_io
+import data_cache
+import measurement_store
+
 class BioimpedanceGUI:
+    # Linhas finais lidas para as metricas rapidas (ultimos pesos e data)
+    QUICK_METRICS_ROWS = 10
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Analisador de Bioimpedancia - Interface Moderna")
@@ -39,6 +46,7 @@ class BioimpedanceGUI:
         
         # Define o arquivo CSV padrao
         self.csv_file = os.path.join(os.path.dirname(__file__), "..", "..", "data", "raw", "dados_peso_exemplo.csv")
+        self.store = measurement_store.open_store(self.csv_file)
         
         self.create_widgets()
         self.load_last_data()
@@ -346,10 +354,9 @@ class BioimpedanceGUI:
     def load_quick_metrics(self, parent):
         """Carrega métricas rápidas dos dados"""
         try:
-            if os.path.exists(self.csv_file):
-                with open(self.csv_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    rows = list(reader)
+            if self.store.exists():
+                # Apenas o final do arquivo (lido de tras para frente)
+                rows = self.store.last_records(self.QUICK_METRICS_ROWS)
                 
                 if rows:
                     # Calcula métricas
@@ -369,8 +376,11 @@ class BioimpedanceGUI:
                                  font=('Segoe UI', 12),
                                  foreground=self.colors['success'] if variacao < 0 else self.colors['danger']).grid(row=1, column=0, sticky=tk.W, pady=5)
                         
-                        ttk.Label(parent, text=f"Total de Registros: {len(rows)}", 
-                                 font=('Segoe UI', 12)).grid(row=2, column=0, sticky=tk.W, pady=5)
+                        # O total le o arquivo inteiro: calculado depois que a janela aparece
+                        total_label = ttk.Label(parent, text="Total de Registros: ...", 
+                                 font=('Segoe UI', 12))
+                        total_label.grid(row=2, column=0, sticky=tk.W, pady=5)
+                        self.root.after_idle(self.load_total_records, total_label)
                         
                         ttk.Label(parent, text=f"Última Atualização: {datas[-1]}", 
                                  font=('Segoe UI', 10),
@@ -384,6 +394,15 @@ class BioimpedanceGUI:
                      font=('Segoe UI', 12),
                      foreground=self.colors['danger']).grid(row=0, column=0, sticky=tk.W, pady=5)
     
+    def load_total_records(self, label):
+        """Preenche o total de registros das metricas rapidas"""
+        try:
+            total = self.store.count()
+        except Exception:
+            total = '-'
+        if label.winfo_exists():
+            label.configure(text=f"Total de Registros: {total}")
+    
     def create_status_bar(self, parent):
         """Cria barra de status simplificada"""
         status_frame = ttk.Frame(parent)
@@ -419,22 +438,21 @@ class BioimpedanceGUI:
         """Seleciona o arquivo CSV"""
         file_path = filedialog.askopenfilename(
             title="Selecionar arquivo CSV",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=compressed_io.FILE_TYPES,
             initialdir="data"
         )
         
         if file_path:
             self.csv_file = file_path
+            self.store = measurement_store.open_store(self.csv_file)
             self.file_label.config(text=file_path)
             self.update_status(f"Arquivo selecionado: {os.path.basename(file_path)}")
     
     def load_last_data(self):
         """Carrega os ultimos dados do arquivo para referencia"""
         try:
-            if os.path.exists(self.csv_file):
-                with open(self.csv_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    rows = list(reader)
+            if self.store.exists():
+                rows = self.store.last_records(1)
                     
                 if rows:
                     last_row = rows[-1]
@@ -514,9 +532,6 @@ class BioimpedanceGUI:
             return
         
         try:
-            # Verifica se o arquivo existe
-            file_exists = os.path.exists(self.csv_file)
-            
             # Prepara os dados
             data = {
                 'data': self.var_data.get(),
@@ -530,17 +545,8 @@ class BioimpedanceGUI:
                 'Obesidade/porcento': self.var_obesidade_pct.get() or ''
             }
             
-            # Escreve no arquivo
-            with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
-                fieldnames = ['data', 'peso', 'imc', 'Gordura/porcento', 'Gordura/KG', 
-                             'Massa Musucular/porcento', 'Massa Muscular/KG', 'Metabolismo', 'Obesidade/porcento']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                
-                # Escreve o cabeçalho se o arquivo não existe
-                if not file_exists:
-                    writer.writeheader()
-                
-                writer.writerow(data)
+            # Grava no armazenamento (CSV ou SQLite)
+            self.store.add(data)
             
             self.update_status(f"Dados salvos com sucesso! Data: {data['data']}, Peso: {data['peso']}kg", "success")
             messagebox.showinfo("Sucesso", "Dados salvos com sucesso!")
@@ -569,14 +575,15 @@ class BioimpedanceGUI:
     def generate_charts(self):
         """Gera os graficos usando o analisador"""
         try:
-            if not os.path.exists(self.csv_file):
+            if not self.store.exists():
                 messagebox.showerror("Erro", "Arquivo CSV não encontrado!")
                 return
             
             # Importa e executa o analisador
             from bioimpedance_analyzer import BioimpedanceAnalyzer
             
-            analyzer = BioimpedanceAnalyzer(self.csv_file)
+            # Modo headless: salva os graficos sem abrir (e bloquear em) janelas
+            analyzer = BioimpedanceAnalyzer(self.csv_file, store=self.store, headless=True)
             analyzer.generate_report()
             
             self.update_status("Graficos gerados com sucesso!")
@@ -589,7 +596,7 @@ class BioimpedanceGUI:
     def view_data(self):
         """Abre uma janela para gerenciar os dados (CRUD)"""
         try:
-            if not os.path.exists(self.csv_file):
+            if not self.store.exists():
                 messagebox.showerror("Erro", "Arquivo CSV não encontrado!")
                 return
             
@@ -658,22 +665,22 @@ class BioimpedanceGUI:
             for item in tree.get_children():
                 tree.delete(item)
             
-            with open(self.csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                columns = reader.fieldnames
-                
-                # Configura as colunas
-                tree['columns'] = columns
-                tree['show'] = 'headings'
-                
-                for col in columns:
-                    tree.heading(col, text=col)
-                    tree.column(col, width=120, minwidth=80)
-                
-                # Adiciona os dados
-                for i, row in enumerate(reader):
-                    values = [row[col] for col in columns]
-                    tree.insert('', tk.END, iid=i, values=values)
+            # Usa os dados tipados do armazenamento (cache no caso do CSV)
+            data = self.store.load_frame()
+            columns = list(data.columns)
+            
+            # Configura as colunas
+            tree['columns'] = columns
+            tree['show'] = 'headings'
+            
+            for col in columns:
+                tree.heading(col, text=col)
+                tree.column(col, width=120, minwidth=80)
+            
+            # Adiciona os dados (iid = chave da linha no armazenamento)
+            for key, row in zip(data.index, data_cache.frame_to_records(data)):
+                values = [row[col] for col in columns]
+                tree.insert('', tk.END, iid=key, values=values)
                     
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar dados: {str(e)}")
@@ -740,23 +747,15 @@ class BioimpedanceGUI:
                     messagebox.showerror("Erro", "\n".join(errors))
                     return
                 
-                # LÃÂª todos os dados
-                with open(self.csv_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    rows = list(reader)
+                # Atualiza a linha selecionada (chave no armazenamento)
+                record = {col: edit_vars[col].get() for col in columns}
+                try:
+                    self.store.update(int(selected[0]), record)
+                    updated = True
+                except IndexError:
+                    updated = False
                 
-                # Atualiza a linha selecionada
-                row_index = int(selected[0])
-                if 0 <= row_index < len(rows):
-                    for col in columns:
-                        rows[row_index][col] = edit_vars[col].get()
-                    
-                    # Salva de volta
-                    with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                        writer = csv.DictWriter(file, fieldnames=columns)
-                        writer.writeheader()
-                        writer.writerows(rows)
-                    
+                if updated:
                     messagebox.showinfo("Sucesso", "Dados atualizados com sucesso!")
                     edit_window.destroy()
                     self.refresh_data_tree(tree, parent_window)
@@ -785,23 +784,14 @@ class BioimpedanceGUI:
         if messagebox.askyesno("Confirmar ExclusÃÂ£o", 
                               f"Tem certeza que deseja excluir esta entrada?\n\n{data_str}"):
             try:
-                # LÃÂª todos os dados
-                with open(self.csv_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    rows = list(reader)
-                    columns = reader.fieldnames
+                # Remove a linha selecionada (chave no armazenamento)
+                try:
+                    self.store.remove(int(selected[0]))
+                    removed = True
+                except IndexError:
+                    removed = False
                 
-                # Remove a linha selecionada
-                row_index = int(selected[0])
-                if 0 <= row_index < len(rows):
-                    del rows[row_index]
-                    
-                    # Salva de volta
-                    with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                        writer = csv.DictWriter(file, fieldnames=columns)
-                        writer.writeheader()
-                        writer.writerows(rows)
-                    
+                if removed:
                     messagebox.showinfo("Sucesso", "Linha excluÃÂ­da com sucesso!")
                     self.refresh_data_tree(tree, parent_window)
                     self.update_status("Linha excluÃÂ­da com sucesso")
@@ -867,13 +857,8 @@ class BioimpedanceGUI:
                 for col in columns:
                     data[col] = add_vars[col].get() or ''
                 
-                # Salva no arquivo
-                file_exists = os.path.exists(self.csv_file)
-                with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
-                    writer = csv.DictWriter(file, fieldnames=columns)
-                    if not file_exists:
-                        writer.writeheader()
-                    writer.writerow(data)
+                # Salva no armazenamento (CSV ou SQLite)
+                self.store.add(data)
                 
                 messagebox.showinfo("Sucesso", "Nova entrada adicionada com sucesso!")
                 add_window.destroy()
@@ -896,7 +881,7 @@ class BioimpedanceGUI:
     
     def clear_all_data(self):
         """Limpa todos os dados do arquivo CSV"""
-        if not os.path.exists(self.csv_file):
+        if not self.store.exists():
             messagebox.showwarning("Aviso", "Arquivo CSV nÃÂ£o encontrado!")
             return
         
@@ -904,13 +889,8 @@ class BioimpedanceGUI:
         if messagebox.askyesno("Confirmar Limpeza", 
                               "Tem certeza que deseja APAGAR TODOS os dados?\n\nEsta operaÃÂ§ÃÂ£o nÃÂ£o pode ser desfeita!"):
             try:
-                # Cria um arquivo vazio com apenas o cabeÃÂ§alho
-                columns = ['data', 'peso', 'imc', 'Gordura/porcento', 'Gordura/KG', 
-                          'Massa Musucular/porcento', 'Massa Muscular/KG', 'Metabolismo', 'Obesidade/porcento']
-                
-                with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
-                    writer = csv.DictWriter(file, fieldnames=columns)
-                    writer.writeheader()
+                # Mantem apenas o cabecalho / a tabela vazia
+                self.store.clear()
                 
                 messagebox.showinfo("Sucesso", "Todos os dados foram removidos!")
                 self.update_status("Arquivo CSV limpo - todos os dados removidos")
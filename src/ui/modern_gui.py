@@ -10,18 +10,33 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 import seaborn as sns
 import sys
 import os
 from datetime import datetime, date
 import numpy as np
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-# Adiciona o diretorio core ao path
+# Adiciona o diretorio core e a raiz do projeto (config.py) ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+import config
 from bioimpedance_analyzer import BioimpedanceAnalyzer
+import chart_export
+import chart_specs
+import cohort_loader
+import compressed_io
+import columnar_archive
+import downsampling
+import html_dashboard
+import render_cache
+import measurement_schema
+import measurement_store
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
@@ -31,6 +46,27 @@ import data_manager
 ctk.set_appearance_mode("light")  # "light" ou "dark"
 ctk.set_default_color_theme("blue")  # "blue", "green", "dark-blue"
 
+# Graficos do seletor: tipo -> (nome dos metodos create_/update_, metricas usadas)
+CHART_VIEWS = {
+    "evolucao_do_peso": ("weight", ['weight']),
+    "composição_corporal": ("composition", ['fat_pct', 'muscle_pct']),
+    "analise_de_imc": ("imc", ['bmi']),
+    "metabolismo": ("metabolism", ['bmr']),
+    "dashboard_completo": ("dashboard", ['weight', 'bmi', 'fat_pct', 'muscle_pct', 'bmr']),
+}
+
+# Rotulos do seletor e das miniaturas, na mesma ordem
+CHART_LABELS = {
+    "evolucao_do_peso": "Evolucao do Peso",
+    "composição_corporal": "Composicao Corporal",
+    "analise_de_imc": "Analise de IMC",
+    "metabolismo": "Metabolismo",
+    "dashboard_completo": "Dashboard Completo",
+}
+
+# Rotulo do seletor -> tipo do grafico
+CHART_TYPES = {label: chart_type for chart_type, label in CHART_LABELS.items()}
+
 class ModernBioimpedanceGUI:
     def __init__(self):
         self.root = ctk.CTk()
@@ -40,9 +76,18 @@ class ModernBioimpedanceGUI:
         
         # Variaveis
         self.data = None
+        self.columns = None  # Metrica -> coluna, resolvido a cada carregamento
         # Caminho para o arquivo de dados (relativo ao diretório do projeto)
         self.csv_file = "data/raw/dados_bioimpedancia.csv"
-        self.current_chart = "weight"
+        self.store = measurement_store.open_store(self.csv_file)
+        self.archive = None  # Arquivo colunar aberto (memmap), se houver
+        self.cohort = None  # Pacientes carregados de uma pasta
+        self.current_patient = None
+        self.current_chart = "evolucao_do_peso"
+        self.chart_views = {}  # Tipo de grafico -> figura, canvas e artistas reutilizados
+        self.thumbnails = {}  # Tipo de grafico -> imagem da miniatura exibida
+        self.thumbnail_generation = 0  # Incrementado a cada troca de dados
+        self.thumbnail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thumbnails')
         self.data_frame = None  # Para a tabela de dados
         
         # Configuracao do estilo
@@ -173,6 +218,22 @@ class ModernBioimpedanceGUI:
         # Métricas rápidas
         self.create_quick_metrics(parent)
         
+        # Miniaturas de todos os graficos (clique abre o grafico completo)
+        thumbnails_frame = ctk.CTkFrame(parent)
+        thumbnails_frame.pack(fill="x", padx=20, pady=10)
+        self.thumbnail_buttons = {}
+        for chart_type, label in CHART_LABELS.items():
+            button = tk.Button(
+                thumbnails_frame,
+                text=label,
+                compound="top",
+                relief="flat",
+                cursor="hand2",
+                command=lambda chart_type=chart_type: self.open_chart(chart_type)
+            )
+            button.pack(side="left", expand=True, padx=5, pady=10)
+            self.thumbnail_buttons[chart_type] = button
+        
         # Botão para gerar gráficos
         generate_button = ctk.CTkButton(
             parent,
@@ -207,8 +268,9 @@ class ModernBioimpedanceGUI:
             frame.pack(side="left", fill="both", expand=True, padx=5, pady=10)
         
         # Peso atual
-        peso_atual = self.data['peso'].iloc[-1]
-        peso_inicial = self.data['peso'].iloc[0]
+        peso_col = self.columns['weight']
+        peso_atual = self.data[peso_col].iloc[-1]
+        peso_inicial = self.data[peso_col].iloc[0]
         peso_mudanca = peso_atual - peso_inicial
         
         ctk.CTkLabel(col1, text="Peso Atual", font=ctk.CTkFont(size=12, weight="bold")).pack(pady=5)
@@ -217,8 +279,9 @@ class ModernBioimpedanceGUI:
                     text_color="green" if peso_mudanca < 0 else "red").pack()
         
         # IMC atual
-        imc_atual = self.data['imc'].iloc[-1]
-        imc_inicial = self.data['imc'].iloc[0]
+        imc_col = self.columns['bmi']
+        imc_atual = self.data[imc_col].iloc[-1]
+        imc_inicial = self.data[imc_col].iloc[0]
         imc_mudanca = imc_atual - imc_inicial
         
         ctk.CTkLabel(col2, text="IMC Atual", font=ctk.CTkFont(size=12, weight="bold")).pack(pady=5)
@@ -235,8 +298,8 @@ class ModernBioimpedanceGUI:
         ctk.CTkLabel(col3, text=f"{periodo_dias} dias", font=ctk.CTkFont(size=12)).pack()
         
         # Metabolismo (se disponível)
-        if 'Metabolismo' in self.data.columns:
-            metab_atual = self.data['Metabolismo'].iloc[-1]
+        if self.columns['bmr']:
+            metab_atual = self.data[self.columns['bmr']].iloc[-1]
             ctk.CTkLabel(col4, text="Metabolismo", font=ctk.CTkFont(size=12, weight="bold")).pack(pady=5)
             ctk.CTkLabel(col4, text=f"{metab_atual:.0f} kcal", font=ctk.CTkFont(size=16, weight="bold")).pack()
             ctk.CTkLabel(col4, text="por dia", font=ctk.CTkFont(size=12)).pack()
@@ -264,6 +327,94 @@ class ModernBioimpedanceGUI:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar gráficos: {e}")
     
+    def open_chart(self, chart_type):
+        """Abre um grafico na aba de graficos (clique na miniatura)"""
+        if self.data is None:
+            messagebox.showwarning("Aviso", "Nenhum dado carregado!")
+            return
+        
+        self.notebook.select(0)
+        self.chart_var.set(CHART_LABELS[chart_type])
+        self.current_chart = chart_type
+        self.generate_chart()
+    
+    def refresh_thumbnails(self):
+        """
+        Gera as miniaturas dos dados atuais em segundo plano
+        
+        Cada miniatura e guardada no cache de renderizacao pelo hash das
+        colunas que o grafico usa, entao so e redesenhada quando os dados
+        mudam. Resultados de dados anteriores sao descartados.
+        """
+        if self.data is None:
+            return
+        
+        self.thumbnail_generation += 1
+        # A especificacao e obtida aqui, no thread da interface
+        snapshot = (self.data, self.columns, self.chart_spec())
+        futures = {
+            chart_type: self.thumbnail_executor.submit(
+                self.render_thumbnail, chart_type, snapshot, self.thumbnail_generation)
+            for chart_type in CHART_VIEWS
+        }
+        self.root.after(100, self.check_thumbnails, futures, self.thumbnail_generation)
+    
+    def render_thumbnail(self, chart_type, snapshot, generation):
+        """
+        PNG da miniatura (executado no thread das miniaturas)
+        
+        Usa apenas uma Figure propria com canvas Agg, sem pyplot nem Tk,
+        e desenha somente a partir do snapshot (nunca de self.data).
+        
+        Returns:
+            bytes: Imagem PNG, ou None se os dados ja foram trocados
+        """
+        data, columns, spec = snapshot
+        if generation != self.thumbnail_generation:
+            return None
+        
+        name, metrics = CHART_VIEWS[chart_type]
+        used = ['data'] + [columns[metric] for metric in metrics if columns[metric]]
+        settings = render_cache.render_settings(
+            {'dpi': config.THUMBNAIL_DPI, 'format': 'png', 'size': config.THUMBNAIL_SIZE},
+            view='miniatura')
+        key = render_cache.chart_key(chart_type, {column: data[column] for column in used}, settings)
+        cached = render_cache.lookup(key)
+        if cached:
+            with open(cached, 'rb') as file:
+                return file.read()
+        
+        fig = Figure(figsize=config.THUMBNAIL_SIZE, dpi=config.THUMBNAIL_DPI, facecolor='white')
+        FigureCanvasAgg(fig)
+        getattr(self, f'create_{name}_chart')(fig, spec)
+        
+        png = chart_export.render_preview(fig, config.THUMBNAIL_DPI)
+        render_cache.store_bytes(key, png)
+        return png
+    
+    def check_thumbnails(self, futures, generation):
+        """Exibe as miniaturas prontas (sem bloquear a interface)"""
+        if generation != self.thumbnail_generation:
+            return
+        
+        pending = {}
+        for chart_type, future in futures.items():
+            if not future.done():
+                pending[chart_type] = future
+                continue
+            try:
+                png = future.result()
+            except Exception as e:
+                print(f"⚠️ Miniatura de '{CHART_LABELS[chart_type]}' indisponivel: {e}")
+                continue
+            if png is not None:
+                image = tk.PhotoImage(data=base64.b64encode(png).decode('ascii'))
+                self.thumbnail_buttons[chart_type].configure(image=image)
+                self.thumbnails[chart_type] = image
+        
+        if pending:
+            self.root.after(100, self.check_thumbnails, pending, generation)
+    
     def create_control_panel(self, parent):
         """Cria o painel de controles"""
         
@@ -284,16 +435,10 @@ class ModernBioimpedanceGUI:
         )
         chart_label.pack(pady=(20, 5))
         
-        self.chart_var = ctk.StringVar(value="Evolucao do Peso")
+        self.chart_var = ctk.StringVar(value=CHART_LABELS[self.current_chart])
         self.chart_selector = ctk.CTkComboBox(
             parent,
-            values=[
-                "Evolucao do Peso",
-                "Composicao Corporal", 
-                "Analise de IMC",
-                "Metabolismo",
-                "Dashboard Completo"
-            ],
+            values=list(CHART_LABELS.values()),
             variable=self.chart_var,
             command=self.on_chart_change,
             width=250,
@@ -312,6 +457,43 @@ class ModernBioimpedanceGUI:
         )
         generate_button.pack(pady=20)
         
+        # Seletor de paciente (pasta com um CSV por paciente)
+        patient_label = ctk.CTkLabel(
+            parent,
+            text="Paciente:",
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        patient_label.pack(pady=(0, 5))
+        
+        self.patient_var = ctk.StringVar(value="")
+        self.patient_selector = ctk.CTkComboBox(
+            parent,
+            values=[],
+            variable=self.patient_var,
+            command=self.on_patient_change,
+            width=250,
+            height=35
+        )
+        self.patient_selector.pack(pady=5)
+        
+        patients_button = ctk.CTkButton(
+            parent,
+            text="📂 Abrir Pasta de Pacientes",
+            command=self.load_patients_dialog,
+            width=250,
+            height=35
+        )
+        patients_button.pack(pady=5)
+        
+        archive_button = ctk.CTkButton(
+            parent,
+            text="🗄️ Abrir Arquivo Colunar",
+            command=self.load_archive_dialog,
+            width=250,
+            height=35
+        )
+        archive_button.pack(pady=5)
+        
         # Informacoes dos dados
         info_frame = ctk.CTkFrame(parent)
         info_frame.pack(fill="x", padx=10, pady=20)
@@ -332,6 +514,19 @@ class ModernBioimpedanceGUI:
         )
         self.info_text.pack(pady=(0, 10), padx=10)
         
+        # Destino da exportacao (presets de config.EXPORT_PRESETS)
+        self.export_presets = {preset['label']: name for name, preset in config.EXPORT_PRESETS.items()}
+        self.export_preset_var = ctk.StringVar(
+            value=config.EXPORT_PRESETS[config.DEFAULT_EXPORT_PRESET]['label'])
+        export_preset_selector = ctk.CTkComboBox(
+            parent,
+            values=list(self.export_presets),
+            variable=self.export_preset_var,
+            width=250,
+            height=35
+        )
+        export_preset_selector.pack(pady=(10, 0))
+        
         # Botoes de acao
         action_frame = ctk.CTkFrame(parent)
         action_frame.pack(fill="x", padx=10, pady=10)
@@ -345,6 +540,15 @@ class ModernBioimpedanceGUI:
         )
         export_button.pack(side="left", padx=5)
         
+        html_button = ctk.CTkButton(
+            action_frame,
+            text="HTML Interativo",
+            command=self.export_html_dashboard,
+            width=120,
+            height=35
+        )
+        html_button.pack(side="left", padx=5)
+        
         refresh_button = ctk.CTkButton(
             action_frame,
             text="Atualizar",
@@ -385,6 +589,7 @@ class ModernBioimpedanceGUI:
         self.ax.axis('off')
         
         self.canvas = FigureCanvasTkAgg(self.fig, self.chart_frame)
+        self.toolbar = None  # Barra de navegacao do grafico exibido
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
     
@@ -414,10 +619,25 @@ class ModernBioimpedanceGUI:
     def load_data(self):
         """Carrega os dados do arquivo CSV"""
         try:
-            if os.path.exists(self.csv_file):
-                self.data = pd.read_csv(self.csv_file)
-                self.data['data'] = pd.to_datetime(self.data['data'])
+            if self.archive is not None:
+                # Reabre (e reconstroi, se o CSV de origem mudou) sem ler as colunas
+                self.archive = columnar_archive.open_archive(self.archive.path)
+                self.data = self.archive.to_frame()
+                self.columns = measurement_schema.resolve_columns(self.data.columns)
+                self.update_info()
+                self.refresh_thumbnails()
+                self.status_label.configure(text=f"Arquivo colunar: {len(self.archive)} medições")
+                return True
+            elif self.store.exists():
+                self.data = self.store.load_frame()
+                if config.COMPACT_FRAMES:
+                    self.data, before, after = measurement_schema.compact_types(self.data)
+                    print(f"🗜️ Modo compacto: {measurement_schema.format_memory(before, after)}")
+                self.columns = measurement_schema.resolve_columns(self.data.columns)
+                if self.current_patient is not None:
+                    self.cohort.frames[self.current_patient] = self.data
                 self.update_info()
+                self.refresh_thumbnails()
                 self.status_label.configure(text=f"Dados carregados: {len(self.data)} medições")
                 
                 # Atualiza as tabelas se existirem
@@ -436,65 +656,208 @@ class ModernBioimpedanceGUI:
         """Abre dialogo para carregar arquivo de dados"""
         file_path = filedialog.askopenfilename(
             title="Selecionar arquivo de dados",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=compressed_io.FILE_TYPES
         )
         if file_path:
             self.csv_file = file_path
+            self.store = measurement_store.open_store(self.csv_file)
+            self.archive = None
+            self.current_patient = None
             if self.load_data():
                 self.generate_chart()
     
+    def load_archive_dialog(self):
+        """Abre um arquivo colunar (.cols) mapeado em memoria"""
+        directory = filedialog.askdirectory(title="Selecionar arquivo colunar (.cols)")
+        if not directory:
+            return
+        
+        if not columnar_archive.is_archive(directory):
+            messagebox.showwarning("Aviso", "A pasta selecionada não é um arquivo colunar")
+            return
+        
+        try:
+            self.archive = columnar_archive.open_archive(directory)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao abrir arquivo colunar: {e}")
+            return
+        
+        # Novas medicoes continuam indo para o CSV de origem
+        if self.archive.source:
+            self.csv_file = self.archive.source
+            self.store = measurement_store.open_store(self.csv_file)
+        self.current_patient = None
+        if self.load_data():
+            self.generate_chart()
+    
+    def load_patients_dialog(self):
+        """Carrega em paralelo todos os pacientes de uma pasta"""
+        directory = filedialog.askdirectory(title="Selecionar pasta de pacientes")
+        if not directory:
+            return
+        
+        try:
+            cohort = cohort_loader.load_patients(directory, compact=config.COMPACT_FRAMES)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao carregar pacientes: {e}")
+            return
+        
+        if len(cohort) == 0:
+            messagebox.showwarning("Aviso", "Nenhum paciente encontrado na pasta selecionada")
+            return
+        
+        if cohort.errors:
+            erros = "\n".join(f"{patient}: {error}" for patient, error in cohort.errors.items())
+            messagebox.showwarning("Aviso", f"Alguns arquivos não puderam ser lidos:\n{erros}")
+        
+        if cohort.renamed:
+            nomes = "\n".join(f"{cohort.files[patient]}: {patient}" for patient in cohort.renamed)
+            messagebox.showwarning("Aviso", f"Pacientes com o mesmo nome foram renomeados:\n{nomes}")
+        
+        self.cohort = cohort
+        patients = cohort.patients()
+        self.patient_selector.configure(values=patients)
+        self.patient_var.set(patients[0])
+        self.on_patient_change(patients[0])
+    
+    def on_patient_change(self, patient):
+        """Callback para mudanca no seletor de paciente"""
+        if self.cohort is None or patient not in self.cohort:
+            return
+        
+        self.current_patient = patient
+        self.archive = None
+        self.csv_file = self.cohort.files[patient]
+        self.store = measurement_store.open_store(self.csv_file)
+        self.data = self.cohort[patient]
+        self.columns = measurement_schema.resolve_columns(self.data.columns)
+        
+        self.update_info()
+        self.refresh_thumbnails()
+        self.data_manager.refresh_data_table()
+        self.generate_chart()
+        self.status_label.configure(
+            text=f"Paciente {patient}: {len(self.data)} medições "
+                 f"({len(self.cohort)} pacientes carregados em {self.cohort.elapsed:.1f} s)")
+    
     def update_info(self):
         """Atualiza as informacoes dos dados"""
         if self.data is not None:
+            peso = self.data[self.columns['weight']]
+            imc = self.data[self.columns['bmi']]
             info_text = f"""Total de medições: {len(self.data)}
 Periodo: {self.data['data'].min().strftime('%d/%m/%Y')} - {self.data['data'].max().strftime('%d/%m/%Y')}
 
-Peso atual: {self.data['peso'].iloc[-1]:.1f} kg
-IMC atual: {self.data['imc'].iloc[-1]:.1f}
+Peso atual: {peso.iloc[-1]:.1f} kg
+IMC atual: {imc.iloc[-1]:.1f}
 
-Mudanca no peso: {self.data['peso'].iloc[-1] - self.data['peso'].iloc[0]:+.1f} kg
-Mudanca no IMC: {self.data['imc'].iloc[-1] - self.data['imc'].iloc[0]:+.1f}"""
+Mudanca no peso: {peso.iloc[-1] - peso.iloc[0]:+.1f} kg
+Mudanca no IMC: {imc.iloc[-1] - imc.iloc[0]:+.1f}"""
             
             self.info_text.delete("1.0", "end")
             self.info_text.insert("1.0", info_text)
     
     def on_chart_change(self, choice):
         """Callback para mudanca no seletor de grafico"""
-        self.current_chart = choice.lower().replace(" ", "_")
+        self.current_chart = CHART_TYPES[choice]
         self.generate_chart()
     
     def generate_chart(self):
-        """Gera o grafico selecionado"""
+        """
+        Exibe o grafico selecionado
+        
+        Cada tipo de grafico tem figura, canvas e artistas proprios, criados
+        uma vez. Trocar de grafico so alterna o canvas exibido; dados novos
+        atualizam as linhas existentes (set_data/relim/autoscale_view) e o
+        redesenho e agendado com draw_idle.
+        
+        A barra de navegacao de cada grafico faz zoom e arraste; as linhas
+        reamostram o trecho visivel a cada mudanca (downsampling.VisibleRange).
+        """
         if self.data is None:
             messagebox.showwarning("Aviso", "Nenhum dado carregado!")
             return
         
-        # Limpa o grafico anterior
-        self.fig.clear()
-        
         chart_type = self.current_chart
+        if chart_type not in CHART_VIEWS:
+            return
+        name, metrics = CHART_VIEWS[chart_type]
+        # Colunas usadas: se mudarem (outro paciente/arquivo), a figura e remontada
+        signature = tuple(self.columns[metric] for metric in metrics)
+        
+        view = self.chart_views.get(chart_type)
+        if view is None:
+            # Mesmo tamanho do canvas atual (todos ficam no mesmo painel)
+            fig = Figure(figsize=self.fig.get_size_inches(), dpi=self.fig.dpi, facecolor='white')
+            canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+            toolbar = NavigationToolbar2Tk(canvas, self.chart_frame, pack_toolbar=False)
+            view = {'fig': fig, 'canvas': canvas, 'toolbar': toolbar, 'signature': None}
+            self.chart_views[chart_type] = view
+        
+        self.show_chart_view(view)
+        
+        if view['signature'] != signature:
+            view['fig'].clear()
+            view['artists'] = getattr(self, f'create_{name}_chart')()
+            view['signature'] = signature
+        elif view['data'] is not self.data or view['archive'] is not self.archive:
+            getattr(self, f'update_{name}_chart')(view['artists'])
+        else:
+            # Mesmos dados: o canvas ja esta desenhado
+            self.status_label.configure(text=f"Grafico '{self.chart_var.get()}' exibido")
+            return
         
-        if chart_type == "evolucao_do_peso":
-            self.create_weight_chart()
-        elif chart_type == "composição_corporal":
-            self.create_composition_chart()
-        elif chart_type == "analise_de_imc":
-            self.create_imc_chart()
-        elif chart_type == "metabolismo":
-            self.create_metabolism_chart()
-        elif chart_type == "dashboard_completo":
-            self.create_dashboard_chart()
-        
-        # Atualiza o canvas
-        self.canvas.draw()
+        view['data'], view['archive'] = self.data, self.archive
+        # Zoom anterior nao vale para os novos dados: a vista inicial passa a ser a atual
+        view['toolbar'].update()
+        view['toolbar'].push_current()
+        view['canvas'].draw_idle()
         self.status_label.configure(text=f"Grafico '{self.chart_var.get()}' gerado com sucesso")
     
-    def create_weight_chart(self):
+    def show_chart_view(self, view):
+        """Exibe o canvas (e a barra de navegacao) de um grafico e oculta o anterior, sem redesenhar"""
+        if view['canvas'] is not self.canvas:
+            self.canvas.get_tk_widget().pack_forget()
+            if self.toolbar is not None:
+                self.toolbar.pack_forget()
+            view['toolbar'].pack(side="bottom", fill="x")
+            view['canvas'].get_tk_widget().pack(fill="both", expand=True)
+        self.fig, self.canvas, self.toolbar = view['fig'], view['canvas'], view['toolbar']
+    
+    def _update_axes(self, ax):
+        """Recalcula os limites do eixo apos set_data (desfazendo o zoom)"""
+        downsampling.reset_view(ax)
+    
+    def chart_spec(self):
+        """
+        Series preparadas dos dados atuais (datas e valores validos e
+        estatisticas), compartilhadas com o analisador para o mesmo conjunto
+        de dados
+        """
+        return chart_specs.dataset_spec(self.data, self.columns, self.archive)
+    
+    def series(self, metric):
+        """Serie preparada da metrica nos dados atuais"""
+        return self.chart_spec().series(metric)
+    
+    def weight_stats_text(self, peso):
+        """Texto de estatisticas do grafico de peso"""
+        stats_text = f'Peso inicial: {peso.first:.1f} kg\n'
+        stats_text += f'Peso atual: {peso.last:.1f} kg\n'
+        stats_text += f'Mudanca: {peso.change:+.1f} kg'
+        return stats_text
+    
+    def create_weight_chart(self, fig=None, spec=None):
         """Cria grafico de evolucao do peso"""
-        ax = self.fig.add_subplot(111)
+        if fig is None:
+            fig = self.fig
+        if spec is None:
+            spec = self.chart_spec()
+        ax = fig.add_subplot(111)
+        peso = spec.series('weight')
         
-        ax.plot(self.data['data'], self.data['peso'], 
-               marker='o', linewidth=3, markersize=8, color='#2E86AB')
+        line, = downsampling.plot_series(ax, peso.dates, peso.values, 
+               marker='o', linewidth=3, markersize=8, color='#2E86AB', level_of_detail=True)
         
         ax.set_title('Evolucao do Peso Corporal', fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel('Data', fontsize=12)
@@ -505,56 +868,54 @@ Mudanca no IMC: {self.data['imc'].iloc[-1] - self.data['imc'].iloc[0]:+.1f}"""
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
         # Adiciona estatisticas
-        min_weight = self.data['peso'].min()
-        max_weight = self.data['peso'].max()
-        current_weight = self.data['peso'].iloc[-1]
-        first_weight = self.data['peso'].iloc[0]
-        change = current_weight - first_weight
-        
-        stats_text = f'Peso inicial: {first_weight:.1f} kg\n'
-        stats_text += f'Peso atual: {current_weight:.1f} kg\n'
-        stats_text += f'Mudanca: {change:+.1f} kg'
-        
-        ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, 
+        stats = ax.text(0.02, 0.98, self.weight_stats_text(peso), transform=ax.transAxes, 
                 verticalalignment='top', fontsize=10,
                 bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
         
-        self.fig.tight_layout()
+        fig.tight_layout()
+        return {'line': line, 'stats': stats}
+    
+    def update_weight_chart(self, artists):
+        """Atualiza o grafico de peso com os dados atuais"""
+        peso = self.series('weight')
+        downsampling.update_series(artists['line'], peso.dates, peso.values)
+        artists['stats'].set_text(self.weight_stats_text(peso))
+        self._update_axes(artists['line'].axes)
     
-    def create_composition_chart(self):
+    def create_composition_chart(self, fig=None, spec=None):
         """Cria grafico de composição corporal"""
-        # Encontra as colunas de gordura e massa muscular
-        fat_col = None
-        muscle_col = None
-        
-        for col in self.data.columns:
-            if 'Gordura' in col and ('%' in col or 'porcento' in col):
-                fat_col = col
-            if 'Massa' in col and ('%' in col or 'porcento' in col):
-                muscle_col = col
+        if fig is None:
+            fig = self.fig
+        if spec is None:
+            spec = self.chart_spec()
+        # Colunas de gordura e massa muscular (resolvidas no carregamento)
+        fat_col = spec.columns['fat_pct']
+        muscle_col = spec.columns['muscle_pct']
         
         if not fat_col or not muscle_col:
-            ax = self.fig.add_subplot(111)
+            ax = fig.add_subplot(111)
             ax.text(0.5, 0.5, 'Colunas de composição corporal não encontradas', 
                    ha='center', va='center', fontsize=14)
             ax.axis('off')
-            return
+            return {}
         
         # Cria subplots
-        ax1 = self.fig.add_subplot(211)
-        ax2 = self.fig.add_subplot(212)
+        ax1 = fig.add_subplot(211)
+        ax2 = fig.add_subplot(212)
         
         # Grafico de gordura
-        ax1.plot(self.data['data'], self.data[fat_col], 
-                marker='o', linewidth=3, markersize=6, color='#ff6b6b', label='Gordura %')
+        fat = spec.series('fat_pct')
+        fat_line, = downsampling.plot_series(ax1, fat.dates, fat.values, 
+                marker='o', linewidth=3, markersize=6, color='#ff6b6b', label='Gordura %', level_of_detail=True)
         ax1.set_title('Percentual de Gordura Corporal', fontsize=14, fontweight='bold')
         ax1.set_ylabel('Gordura (%)', fontsize=12)
         ax1.grid(True, alpha=0.3)
         ax1.legend()
         
         # Grafico de massa muscular
-        ax2.plot(self.data['data'], self.data[muscle_col], 
-                marker='o', linewidth=3, markersize=6, color='#4ecdc4', label='Massa Muscular %')
+        muscle = spec.series('muscle_pct')
+        muscle_line, = downsampling.plot_series(ax2, muscle.dates, muscle.values, 
+                marker='o', linewidth=3, markersize=6, color='#4ecdc4', label='Massa Muscular %', level_of_detail=True)
         ax2.set_title('Percentual de Massa Muscular', fontsize=14, fontweight='bold')
         ax2.set_xlabel('Data', fontsize=12)
         ax2.set_ylabel('Massa Muscular (%)', fontsize=12)
@@ -565,20 +926,40 @@ Mudanca no IMC: {self.data['imc'].iloc[-1] - self.data['imc'].iloc[0]:+.1f}"""
         for ax in [ax1, ax2]:
             plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
-        self.fig.suptitle('Composicao Corporal', fontsize=16, fontweight='bold')
-        self.fig.tight_layout()
+        fig.suptitle('Composicao Corporal', fontsize=16, fontweight='bold')
+        fig.tight_layout()
+        return {'fat_pct': fat_line, 'muscle_pct': muscle_line}
     
-    def create_imc_chart(self):
+    def update_metric_lines(self, artists):
+        """Atualiza linhas indexadas pela metrica (fat_pct, bmi, ...) com os dados atuais"""
+        axes = []
+        for metric, line in artists.items():
+            series = self.series(metric)
+            downsampling.update_series(line, series.dates, series.values)
+            if line.axes not in axes:
+                axes.append(line.axes)
+        for ax in axes:
+            self._update_axes(ax)
+    
+    def update_composition_chart(self, artists):
+        """Atualiza o grafico de composicao corporal"""
+        self.update_metric_lines(artists)
+    
+    def create_imc_chart(self, fig=None, spec=None):
         """Cria grafico de analise de IMC"""
-        ax = self.fig.add_subplot(111)
+        if fig is None:
+            fig = self.fig
+        if spec is None:
+            spec = self.chart_spec()
+        ax = fig.add_subplot(111)
         
-        ax.plot(self.data['data'], self.data['imc'], 
-               marker='o', linewidth=3, markersize=8, color='#ffa726')
+        imc = spec.series('bmi')
+        line, = downsampling.plot_series(ax, imc.dates, imc.values, 
+               marker='o', linewidth=3, markersize=8, color='#ffa726', level_of_detail=True)
         
         # Adiciona linhas de referencia do IMC
-        ax.axhline(y=18.5, color='green', linestyle='--', alpha=0.7, label='Abaixo do peso')
-        ax.axhline(y=25, color='orange', linestyle='--', alpha=0.7, label='Peso normal')
-        ax.axhline(y=30, color='red', linestyle='--', alpha=0.7, label='Sobrepeso')
+        for value, label, color in chart_specs.BMI_BANDS:
+            ax.axhline(y=value, color=color, linestyle='--', alpha=0.7, label=label)
         
         ax.set_title('Analise do Indice de Massa Corporal (IMC)', fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel('Data', fontsize=12)
@@ -589,21 +970,31 @@ Mudanca no IMC: {self.data['imc'].iloc[-1] - self.data['imc'].iloc[0]:+.1f}"""
         # Rotaciona as datas
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
-        self.fig.tight_layout()
+        fig.tight_layout()
+        return {'bmi': line}
     
-    def create_metabolism_chart(self):
+    def update_imc_chart(self, artists):
+        """Atualiza o grafico de IMC"""
+        self.update_metric_lines(artists)
+    
+    def create_metabolism_chart(self, fig=None, spec=None):
         """Cria grafico de analise de metabolismo"""
-        if 'Metabolismo' not in self.data.columns:
-            ax = self.fig.add_subplot(111)
+        if fig is None:
+            fig = self.fig
+        if spec is None:
+            spec = self.chart_spec()
+        if not spec.columns['bmr']:
+            ax = fig.add_subplot(111)
             ax.text(0.5, 0.5, 'Coluna de metabolismo não encontrada', 
                    ha='center', va='center', fontsize=14)
             ax.axis('off')
-            return
+            return {}
         
-        ax = self.fig.add_subplot(111)
+        ax = fig.add_subplot(111)
         
-        ax.plot(self.data['data'], self.data['Metabolismo'], 
-               marker='o', linewidth=3, markersize=8, color='#ff9800')
+        metab = spec.series('bmr')
+        line, = downsampling.plot_series(ax, metab.dates, metab.values, 
+               marker='o', linewidth=3, markersize=8, color='#ff9800', level_of_detail=True)
         
         ax.set_title('Evolucao do Metabolismo Basal', fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel('Data', fontsize=12)
@@ -613,50 +1004,59 @@ Mudanca no IMC: {self.data['imc'].iloc[-1] - self.data['imc'].iloc[0]:+.1f}"""
         # Rotaciona as datas
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
-        self.fig.tight_layout()
+        fig.tight_layout()
+        return {'bmr': line}
     
-    def create_dashboard_chart(self):
+    def update_metabolism_chart(self, artists):
+        """Atualiza o grafico de metabolismo"""
+        self.update_metric_lines(artists)
+    
+    def chart_xy(self, spec, metric):
+        """Datas e valores da serie preparada (para plot_series)"""
+        series = spec.series(metric)
+        return series.dates, series.values
+    
+    def create_dashboard_chart(self, fig=None, spec=None):
         """Cria dashboard completo"""
-        # Encontra as colunas necessarias
-        fat_col = None
-        muscle_col = None
-        
-        for col in self.data.columns:
-            if 'Gordura' in col and ('%' in col or 'porcento' in col):
-                fat_col = col
-            if 'Massa' in col and ('%' in col or 'porcento' in col):
-                muscle_col = col
+        if fig is None:
+            fig = self.fig
+        if spec is None:
+            spec = self.chart_spec()
+        # Colunas necessarias (resolvidas no carregamento)
+        fat_col = spec.columns['fat_pct']
+        muscle_col = spec.columns['muscle_pct']
+        artists = {}
         
         # Cria subplots 2x2
-        ax1 = self.fig.add_subplot(221)
-        ax2 = self.fig.add_subplot(222)
-        ax3 = self.fig.add_subplot(223)
-        ax4 = self.fig.add_subplot(224)
+        ax1 = fig.add_subplot(221)
+        ax2 = fig.add_subplot(222)
+        ax3 = fig.add_subplot(223)
+        ax4 = fig.add_subplot(224)
         
         # Peso
-        ax1.plot(self.data['data'], self.data['peso'], marker='o', linewidth=2, markersize=4, color='#2E86AB')
+        artists['weight'], = downsampling.plot_series(ax1, *self.chart_xy(spec, 'weight'), marker='o', linewidth=2, markersize=4, color='#2E86AB', level_of_detail=True)
         ax1.set_title('Evolucao do Peso', fontweight='bold')
         ax1.set_ylabel('Peso (kg)')
         ax1.grid(True, alpha=0.3)
         
         # IMC
-        ax2.plot(self.data['data'], self.data['imc'], marker='o', linewidth=2, markersize=4, color='#ffa726')
+        artists['bmi'], = downsampling.plot_series(ax2, *self.chart_xy(spec, 'bmi'), marker='o', linewidth=2, markersize=4, color='#ffa726', level_of_detail=True)
         ax2.set_title('IMC', fontweight='bold')
         ax2.set_ylabel('IMC')
         ax2.grid(True, alpha=0.3)
         
         # Composicao corporal
         if fat_col and muscle_col:
-            ax3.plot(self.data['data'], self.data[fat_col], marker='o', linewidth=2, markersize=4, color='#ff6b6b', label='Gordura %')
-            ax3.plot(self.data['data'], self.data[muscle_col], marker='o', linewidth=2, markersize=4, color='#4ecdc4', label='Massa Muscular %')
+            artists['fat_pct'], = downsampling.plot_series(ax3, *self.chart_xy(spec, 'fat_pct'), marker='o', linewidth=2, markersize=4, color='#ff6b6b', label='Gordura %', level_of_detail=True)
+            artists['muscle_pct'], = downsampling.plot_series(ax3, *self.chart_xy(spec, 'muscle_pct'), marker='o', linewidth=2, markersize=4, color='#4ecdc4', label='Massa Muscular %', level_of_detail=True)
             ax3.set_title('Composicao Corporal', fontweight='bold')
             ax3.set_ylabel('Percentual (%)')
             ax3.legend()
             ax3.grid(True, alpha=0.3)
         
         # Metabolismo
-        if 'Metabolismo' in self.data.columns:
-            ax4.plot(self.data['data'], self.data['Metabolismo'], marker='o', linewidth=2, markersize=4, color='#ff9800')
+        if spec.columns['bmr']:
+            artists['bmr'], = downsampling.plot_series(ax4, *self.chart_xy(spec, 'bmr'), marker='o', linewidth=2, markersize=4, color='#ff9800', level_of_detail=True)
             ax4.set_title('Metabolismo', fontweight='bold')
             ax4.set_ylabel('kcal/dia')
             ax4.grid(True, alpha=0.3)
@@ -665,20 +1065,95 @@ Mudanca no IMC: {self.data['imc'].iloc[-1] - self.data['imc'].iloc[0]:+.1f}"""
         for ax in [ax1, ax2, ax3, ax4]:
             plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
         
-        self.fig.suptitle('Dashboard Completo de Composicao Corporal', fontsize=16, fontweight='bold')
-        self.fig.tight_layout()
+        fig.suptitle('Dashboard Completo de Composicao Corporal', fontsize=16, fontweight='bold')
+        fig.tight_layout()
+        return artists
+    
+    def update_dashboard_chart(self, artists):
+        """Atualiza o dashboard completo"""
+        self.update_metric_lines(artists)
     
     def export_chart(self):
-        """Exporta o grafico atual"""
+        """
+        Exporta o grafico atual com o preset escolhido
+        
+        Uma previa em baixa resolucao aparece na hora; o arquivo final e
+        renderizado em segundo plano a partir de uma copia da figura.
+        """
         if hasattr(self, 'fig'):
+            preset = self.export_presets.get(self.export_preset_var.get(), config.DEFAULT_EXPORT_PRESET)
+            settings = config.EXPORT_PRESETS[preset]
             file_path = filedialog.asksaveasfilename(
                 title="Salvar grafico",
-                defaultextension=".png",
-                filetypes=[("PNG files", "*.png"), ("PDF files", "*.pdf"), ("All files", "*.*")]
+                defaultextension=f".{settings['format']}",
+                filetypes=[("PNG files", "*.png"), ("PDF files", "*.pdf"), ("SVG files", "*.svg"), ("All files", "*.*")]
             )
-            if file_path:
-                self.fig.savefig(file_path, dpi=300, bbox_inches='tight')
-                messagebox.showinfo("Sucesso", f"Grafico salvo em: {file_path}")
+            if not file_path:
+                return
+            
+            try:
+                preview = chart_export.render_preview(self.fig)
+                future = chart_export.export_in_background(self.fig, file_path, preset)
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao exportar grafico: {e}")
+                return
+            
+            window = self.show_export_preview(preview, file_path)
+            self.status_label.configure(
+                text=f"Exportando ({settings['label']}, {settings['dpi']} DPI)...")
+            self.root.after(100, self.check_export, future, window)
+    
+    def show_export_preview(self, preview, file_path):
+        """Janela com a previa da exportacao em andamento"""
+        window = ctk.CTkToplevel(self.root)
+        window.title("Previa da exportacao")
+        window.transient(self.root)
+        
+        window.image = tk.PhotoImage(data=base64.b64encode(preview).decode('ascii'))
+        tk.Label(window, image=window.image).pack(padx=10, pady=10)
+        
+        window.status = ctk.CTkLabel(window, text=f"Gerando arquivo final: {os.path.basename(file_path)}...")
+        window.status.pack(pady=(0, 10))
+        return window
+    
+    def check_export(self, future, window):
+        """Acompanha a exportacao em segundo plano (sem bloquear a interface)"""
+        if not future.done():
+            self.root.after(100, self.check_export, future, window)
+            return
+        
+        try:
+            path = future.result()
+        except Exception as e:
+            self.status_label.configure(text="Erro na exportacao")
+            messagebox.showerror("Erro", f"Erro ao exportar grafico: {e}")
+            return
+        
+        self.status_label.configure(text=f"Grafico salvo em: {path}")
+        if window.winfo_exists():
+            window.status.configure(text=f"Grafico salvo em: {path}")
+    
+    def export_html_dashboard(self):
+        """Exporta o dashboard completo como um unico arquivo HTML interativo"""
+        if self.data is None:
+            messagebox.showwarning("Aviso", "Nenhum dado carregado!")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Salvar dashboard interativo",
+            defaultextension=".html",
+            filetypes=[("HTML files", "*.html"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        try:
+            path = html_dashboard.write_dashboard(self.data, self.columns, file_path, archive=self.archive)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao exportar dashboard: {e}")
+            return
+        
+        self.status_label.configure(text=f"Dashboard interativo salvo em: {path}")
     
     def refresh_data(self):
         """Atualiza os dados e regenera o grafico"""
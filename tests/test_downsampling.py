@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do nivel de detalhe (VisibleRange) dos graficos interativos
+"""
+
+import os
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Adiciona o diretorio core ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'core'))
+
+import downsampling
+
+
+def hourly_series(start, hours, level=80.0):
+    dates = np.datetime64(start) + np.arange(hours).astype('timedelta64[h]')
+    values = level + np.sin(np.arange(hours) / 24.0)
+    return dates, values
+
+
+def zoomed_line(dates, values, days=2):
+    fig = Figure(figsize=(10, 6), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    line, = downsampling.plot_series(ax, dates, values, level_of_detail=True)
+    start = mdates.date2num(dates[len(dates) // 2])
+    ax.set_xlim(start, start + days)
+    return ax, line
+
+
+def test_zoom_resamples_visible_range_with_full_detail():
+    dates, values = hourly_series('2020-01-01', 50000)
+    ax, line = zoomed_line(dates, values)
+
+    # 2 dias de medicoes horarias (mais um vizinho de cada lado), com marcadores
+    assert 46 <= len(line.get_xdata()) <= 52
+    assert line.get_marker() == 'o'
+
+
+def test_reload_while_zoomed_shows_new_series_in_full():
+    dates, values = hourly_series('2020-01-01', 50000)
+    ax, line = zoomed_line(dates, values)
+    width = downsampling.axis_width_pixels(ax)
+
+    new_dates, new_values = hourly_series('2021-06-01', 80000, level=70.0)
+    downsampling.update_series(line, new_dates, new_values)
+    downsampling.reset_view(ax)
+
+    lo, hi = ax.get_xlim()
+    assert lo <= mdates.date2num(new_dates[0]) and hi >= mdates.date2num(new_dates[-1])
+    assert ax.get_autoscalex_on()
+    # Serie nova inteira reduzida para a largura do eixo
+    shown = line.get_xdata()
+    assert len(shown) <= width
+    assert shown[0] == new_dates[0] and shown[-1] == new_dates[-1]
+
+    # Um novo zoom reamostra a serie nova, nao a antiga
+    start = mdates.date2num(new_dates[1000])
+    ax.set_xlim(start, start + 2)
+    assert np.all(np.asarray(line.get_ydata()) < 75)
+    assert 46 <= len(line.get_xdata()) <= 52
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes do diario de edicoes/exclusoes do CSV e da sua compactacao
+"""
+
+import os
+import sys
+
+# Adiciona o diretorio core ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'core'))
+
+import measurement_schema
+import measurement_store
+
+
+def record(day, peso):
+    """Registro de texto como os formularios das interfaces produzem"""
+    values = {name: '1.0' for name in measurement_schema.FIELD_NAMES}
+    values[measurement_schema.DATE_COLUMN] = f"2025-01-{day:02d}"
+    values['peso'] = f"{peso:.1f}"
+    return values
+
+
+def write_csv(path, pesos):
+    store = measurement_store.CsvMeasurementStore(str(path), use_cache=False)
+    for day, peso in enumerate(pesos, start=1):
+        store.add(record(day, peso))
+
+
+def pesos(store):
+    return store.load_frame()['peso'].tolist()
+
+
+def test_edits_go_to_the_journal_and_survive_reopening(tmp_path):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [80, 81, 82, 83, 84])
+    original = csv_file.read_bytes()
+
+    store = measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False)
+    store.load_frame()
+    store.update(1, record(2, 99))
+    store.remove(3)
+    store.add(record(6, 85))
+
+    assert pesos(store) == [80, 99, 82, 84, 85]
+    assert store.load_frame().index.tolist() == [0, 1, 2, 4, 5]
+    # O CSV base so recebe a linha anexada; o resto fica no diario
+    assert csv_file.read_bytes().startswith(original)
+    assert store.journal.exists()
+
+    reopened = measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False)
+    assert pesos(reopened) == [80, 99, 82, 84, 85]
+    assert reopened.count() == 5
+
+
+def test_compact_rewrites_the_base_and_renumbers_keys(tmp_path):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [80, 81, 82, 83, 84])
+    store = measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False)
+    store.load_frame()
+    store.update(1, record(2, 99))
+    store.remove(3)
+
+    store.compact()
+
+    assert not store.journal.exists()
+    assert pesos(store) == [80, 99, 82, 84]
+    assert store.load_frame().index.tolist() == [0, 1, 2, 3]
+    reopened = measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False)
+    assert pesos(reopened) == [80, 99, 82, 84]
+
+
+def test_changes_made_during_compaction_are_remapped(tmp_path):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [80, 81, 82, 83, 84])
+    store = measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False)
+    store.load_frame()
+    store.remove(0)
+    store.update(2, record(3, 90))
+
+    # Gera o novo base sem troca-lo, como a thread de compactacao faz
+    store._compact_worker()
+
+    # Alteracoes com as chaves antigas, antes da troca dos arquivos
+    store.update(4, record(5, 77))
+    store.remove(1)
+    store.add(record(6, 85))
+    store.update(5, record(6, 86))
+
+    assert pesos(store) == [90, 83, 77, 86]
+    # A exclusao pendente (velha 1 -> nova 0) continua no diario
+    assert store.load_frame().index.tolist() == [1, 2, 3, 4]
+    assert not os.path.exists(str(csv_file) + '.compact.tmp')
+    # Entradas pendentes com as chaves do novo base: velha 1 -> 0, 4 -> 3, 5 -> 4
+    keys = sorted(entry['key'] for entry in store.journal.entries())
+    assert keys == [0, 3, 4]
+
+    reopened = measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False)
+    assert pesos(reopened) == [90, 83, 77, 86]
+
+
+def test_large_journal_is_compacted_in_the_background(tmp_path):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [80, 81, 82])
+    store = measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False, compact_bytes=1)
+    store.load_frame()
+
+    store.update(0, record(1, 70))
+    store._wait_compaction()
+
+    assert pesos(store) == [70, 81, 82]
+    assert not store.journal.exists()
+    assert pesos(measurement_store.CsvMeasurementStore(str(csv_file), use_cache=False)) == [70, 81, 82]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da releitura incremental do CSV (CsvMeasurementStore.load_frame)
+"""
+
+import os
+import sys
+
+# Adiciona o diretorio core ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'core'))
+
+import data_cache
+import measurement_schema
+import measurement_store
+
+HEADER = ','.join(measurement_schema.FIELD_NAMES) + '\n'
+
+
+def line(day, peso):
+    values = [f"2025-01-{day:02d}", f"{peso:.1f}"] + ['1.0'] * (len(measurement_schema.FIELD_NAMES) - 2)
+    return ','.join(values) + '\n'
+
+
+def write_csv(path, pesos, mode='w'):
+    with open(path, mode, encoding='utf-8', newline='') as file:
+        if mode == 'w':
+            file.write(HEADER)
+        for day, peso in pesos:
+            file.write(line(day, peso))
+
+
+def open_store(path, monkeypatch):
+    """Armazenamento sem cache que conta as leituras completas do arquivo"""
+    full_loads = []
+    load_measurements = data_cache.load_measurements
+
+    def counting(csv_file, use_cache=True):
+        full_loads.append(csv_file)
+        return load_measurements(csv_file, use_cache)
+
+    monkeypatch.setattr(data_cache, 'load_measurements', counting)
+    store = measurement_store.CsvMeasurementStore(str(path), use_cache=False)
+    store.load_frame()
+    return store, full_loads
+
+
+def pesos(store):
+    return store.load_frame()['peso'].tolist()
+
+
+def test_appended_rows_are_read_incrementally(tmp_path, monkeypatch):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [(1, 80), (2, 81)])
+    store, full_loads = open_store(csv_file, monkeypatch)
+
+    write_csv(csv_file, [(3, 82), (4, 83)], mode='a')
+
+    assert pesos(store) == [80, 81, 82, 83]
+    assert store.load_frame().index.tolist() == [0, 1, 2, 3]
+    assert len(full_loads) == 1
+
+
+def test_partial_trailing_line_waits_for_the_newline(tmp_path, monkeypatch):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [(1, 80), (2, 81)])
+    store, full_loads = open_store(csv_file, monkeypatch)
+
+    partial = line(3, 82)
+    with open(csv_file, 'a', encoding='utf-8', newline='') as file:
+        file.write(partial[:12])
+    assert pesos(store) == [80, 81]
+
+    with open(csv_file, 'a', encoding='utf-8', newline='') as file:
+        file.write(partial[12:])
+    assert pesos(store) == [80, 81, 82]
+    assert len(full_loads) == 1
+
+
+def test_same_size_rewrite_triggers_a_full_reload(tmp_path, monkeypatch):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [(1, 80), (2, 81)])
+    store, full_loads = open_store(csv_file, monkeypatch)
+    size = os.path.getsize(csv_file)
+    mtime_ns = os.stat(csv_file).st_mtime_ns
+
+    write_csv(csv_file, [(1, 70), (2, 71)])
+    os.utime(csv_file, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    assert os.path.getsize(csv_file) == size
+
+    assert pesos(store) == [70, 71]
+    assert len(full_loads) == 2
+
+
+def test_larger_rewrite_triggers_a_full_reload(tmp_path, monkeypatch):
+    csv_file = tmp_path / 'p.csv'
+    write_csv(csv_file, [(1, 80), (2, 81)])
+    store, full_loads = open_store(csv_file, monkeypatch)
+
+    write_csv(csv_file, [(1, 70), (2, 71), (3, 72)])
+
+    assert pesos(store) == [70, 71, 72]
+    assert len(full_loads) == 2
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da geracao em lote dos relatorios (report_farm)
+"""
+
+import gzip
+import os
+import shutil
+import sys
+
+import matplotlib
+matplotlib.use('Agg')
+
+# Adiciona o diretorio core ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'core'))
+
+import cohort_loader
+import report_farm
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'dados_bioimpedancia.csv')
+
+
+def test_duplicate_patient_ids_get_their_own_folders(tmp_path):
+    source = tmp_path / 'clinica'
+    source.mkdir()
+    shutil.copy(DATA_FILE, source / 'p3.csv')
+    with open(DATA_FILE, 'rb') as file, gzip.open(source / 'p3.csv.gz', 'wb') as compressed:
+        compressed.write(file.read())
+    files = cohort_loader.find_patient_files(str(source))
+    output_dir = tmp_path / 'saida'
+
+    summary = report_farm.run_farm(files, str(output_dir), workers=1, use_cache=False)
+
+    assert summary['counts'] == {'generated': 2, 'skipped': 0, 'failed': 0}
+    assert list(summary['patients']) == ['p3', 'p3 (p3.csv.gz)']
+    for patient, result in summary['patients'].items():
+        assert os.path.exists(output_dir / patient / report_farm.STATE_FILE)
+        assert result['outputs']
+
+    # Cada arquivo tem seu proprio estado: a segunda execucao pula os dois
+    summary = report_farm.run_farm(files, str(output_dir), workers=1, use_cache=False)
+    assert summary['counts'] == {'generated': 0, 'skipped': 2, 'failed': 0}
+    assert summary['patients']['p3 (p3.csv.gz)']['source'] == files[1]
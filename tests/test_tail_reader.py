@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testes da leitura do final do CSV de tras para frente (tail_reader)
+"""
+
+import os
+import sys
+
+# Adiciona o diretorio core ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'core'))
+
+import measurement_schema
+import tail_reader
+
+HEADER = ','.join(measurement_schema.FIELD_NAMES)
+
+
+def row(day, peso):
+    return ','.join([f"2025-01-{day:02d}", f"{peso:.1f}"] + ['1.0'] * (len(measurement_schema.FIELD_NAMES) - 2))
+
+
+def write_lines(path, lines, newline='\n', final_newline=True):
+    content = newline.join(lines) + (newline if final_newline else '')
+    path.write_bytes(content.encode('utf-8'))
+    return str(path)
+
+
+def test_crlf_file(tmp_path):
+    csv_file = write_lines(tmp_path / 'p.csv', [HEADER] + [row(day, 80 + day) for day in range(1, 6)],
+                           newline='\r\n')
+
+    data = tail_reader.read_tail(csv_file, 2)
+
+    assert data['peso'].tolist() == [84, 85]
+    assert list(data.columns) == measurement_schema.FIELD_NAMES
+    assert str(data['data'].iloc[-1].date()) == '2025-01-05'
+    assert tail_reader.count_rows(csv_file) == 5
+
+
+def test_missing_final_newline(tmp_path):
+    csv_file = write_lines(tmp_path / 'p.csv', [HEADER] + [row(day, 80 + day) for day in range(1, 6)],
+                           final_newline=False)
+
+    assert tail_reader.read_tail(csv_file, 3)['peso'].tolist() == [83, 84, 85]
+    assert tail_reader.read_tail(csv_file, 10)['peso'].tolist() == [81, 82, 83, 84, 85]
+    assert tail_reader.count_rows(csv_file) == 5
+
+
+def test_empty_file_and_header_only(tmp_path):
+    empty = tmp_path / 'vazio.csv'
+    empty.write_bytes(b'')
+    header_only = write_lines(tmp_path / 'cabecalho.csv', [HEADER])
+
+    for csv_file in (str(empty), header_only):
+        data = tail_reader.read_tail(csv_file, 5)
+        assert len(data) == 0
+        assert list(data.columns) == measurement_schema.FIELD_NAMES
+        assert tail_reader.count_rows(csv_file) == 0
+
+
+def test_tail_across_block_boundaries(tmp_path):
+    lines = [row(day, 60 + day) for day in range(1, 29)]
+    for newline in ('\n', '\r\n'):
+        csv_file = write_lines(tmp_path / 'p.csv', [HEADER] + lines, newline=newline)
+        # Blocos menores que uma linha e que nao dividem o arquivo em partes iguais
+        for block_size in (7, len(lines[0]) + 1, 100, 1 << 16):
+            data = tail_reader.read_tail(csv_file, 4, block_size=block_size)
+            assert data['peso'].tolist() == [85, 86, 87, 88]
+            assert tail_reader.read_tail(csv_file, 28, block_size=block_size)['peso'].tolist() == \
+                [60 + day for day in range(1, 29)]
+            assert tail_reader.count_rows(csv_file, block_size=block_size) == 28